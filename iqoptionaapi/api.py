@@ -21,6 +21,8 @@ from iqoptionaapi.http.buyback import Buyback
 from iqoptionaapi.http.changebalance import Changebalance
 from iqoptionaapi.http.events import Events
 from iqoptionaapi.ws.client import WebsocketClient
+from iqoptionaapi.ws.writer import WebsocketWriter
+from iqoptionaapi.ws.callbacks import CallbackExecutor
 from iqoptionaapi.ws.chanels.get_balances import *
 
 from iqoptionaapi.ws.chanels.ssid import Ssid
@@ -64,6 +66,8 @@ from iqoptionaapi.ws.objects.profile import Profile
 from iqoptionaapi.ws.objects.candles import Candles
 from iqoptionaapi.ws.objects.listinfodata import ListInfoData
 from iqoptionaapi.ws.objects.betinfo import Game_betinfo_data
+from iqoptionaapi.ws.objects.candle_ring import RealtimeCandles
+from iqoptionaapi.ws.objects.bounded_dict import BoundedDict, MAX_SIZE, MAX_AGE
 import iqoptionaapi.global_value as global_value
 from collections import defaultdict
 
@@ -77,12 +81,15 @@ def nested_dict(n, type):
 requests.packages.urllib3.disable_warnings()  # pylint: disable=no-member
 
 
+WAIT_RECHECK = 1.0  # max seconds between predicate checks in wait_until
+
+
 class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
-    socket_option_opened = {}
-    socket_option_closed = {}
+    socket_option_opened = BoundedDict(name="socket_option_opened")
+    socket_option_closed = BoundedDict(name="socket_option_closed")
     timesync = TimeSync()
     profile = Profile()
-    candles = {}
+    candles = BoundedDict(name="candles")  # request_id -> Candles
     listinfodata = ListInfoData()
     api_option_init_all_result = []
     api_option_init_all_result_v2 = []
@@ -94,15 +101,15 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
     instrument_quites_generated_timestamp = nested_dict(2, dict)
     strike_list = None
     leaderboard_deals_client = None
-    order_async = nested_dict(2, dict)
-    order_binary = {}
+    order_async = BoundedDict(default_factory=lambda: nested_dict(1, dict), name="order_async")
+    order_binary = BoundedDict(name="order_binary")
     game_betinfo = Game_betinfo_data()
     instruments = None
     financial_information = None
     buy_id = None
     buy_order_id = None
     traders_mood = {}  # get hight(put) %
-    technical_indicators = {}
+    technical_indicators = BoundedDict(name="technical_indicators")
     order_data = None
     positions = None
     position = None
@@ -114,10 +121,10 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
     close_position_data = None
     overnight_fee = None
     # ---for real time
-    digital_option_placed_id = {}
+    digital_option_placed_id = BoundedDict(name="digital_option_placed_id")
     live_deal_data = nested_dict(3, deque)
     subscribe_commission_changed_data = nested_dict(2, dict)
-    real_time_candles = nested_dict(3, dict)
+    real_time_candles = RealtimeCandles()  # active -> {size: CandleRing}
     real_time_candles_maxdict_table = nested_dict(2, dict)
     candle_generated_check = nested_dict(2, dict)
     candle_generated_all_size_check = nested_dict(1, dict)
@@ -140,13 +147,15 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
 
 
     #nova função dos payouts da digital
-    payouts_digital = {}
+    payouts_digital = BoundedDict(name="payouts_digital")
     #novas funções dos alertas
     alerta = None
     alertas = None
-    alertas_tocados = []
+    alertas_tocados = deque(maxlen=MAX_SIZE)
     #nova função que puxa todos os realtimes
     all_realtime_candles = {}
+    candle_generated_cb = None  # callback(active_name, msg) for every candle-generated message
+    callback_executor = CallbackExecutor()  # runs the user callbacks, ordered per asset
     #novas funções do forex
     buy_forex_id = None
     positions_forex= None
@@ -155,7 +164,7 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
     cancel_order_forex = None
     leverage_forex = None
     #nova função compra digital
-    orders = {}
+    orders = BoundedDict(name="orders")
     
 
 
@@ -183,6 +192,50 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
         self.__active_account_type = None
         self.mutex = threading.Lock()
         self.request_id = 0
+        self.response_condition = threading.Condition()
+        self.message_handlers = []  # extra (name, handler) pairs registered on each new WebsocketClient
+        self.writer = WebsocketWriter(self)  # owns websocket.send; coalescing: self.writer.coalesce = True
+
+    send_timeout = 10  # seconds send_websocket_request(wait=True) waits for the writer thread
+    timesync_timeout = 5  # seconds connect waits for the first timeSync message
+
+    # request/order keyed maps filled by the websocket handlers (see BoundedDict)
+    RESULT_MAPS = ("candles", "orders", "order_async", "order_binary", "socket_option_opened",
+                   "socket_option_closed", "technical_indicators", "digital_option_placed_id",
+                   "payouts_digital")
+
+    def set_result_map_limits(self, max_size=MAX_SIZE, max_age=MAX_AGE):
+        """Size / idle-time (seconds) limits of every result map; None disables a limit."""
+        for name in self.RESULT_MAPS:
+            result_map = getattr(self, name)
+            result_map.max_size = max_size
+            result_map.max_age = max_age
+            result_map.expire()
+
+    def result_map_stats(self):
+        """Entries and evictions (by size / by age) of every result map."""
+        return [getattr(self, name).stats() for name in self.RESULT_MAPS]
+
+    def notify_response(self):
+        """Wake up every thread blocked in wait_until (called by the websocket thread after each message)."""
+        with self.response_condition:
+            self.response_condition.notify_all()
+
+    def wait_until(self, predicate, timeout=None):
+        """Block without spinning until predicate() is true.
+
+        The predicate is re-evaluated each time a websocket message has been handled
+        (and at least every WAIT_RECHECK seconds). Returns False if timeout (seconds)
+        expires first; timeout=None waits forever.
+        """
+        end = None if timeout is None else time.time() + timeout
+        with self.response_condition:
+            while not predicate():
+                remaining = WAIT_RECHECK if end is None else min(WAIT_RECHECK, end - time.time())
+                if remaining <= 0:
+                    return False
+                self.response_condition.wait(remaining)
+        return True
 
     def prepare_http_url(self, resource):
         return "/".join((self.https_url, resource.url))
@@ -232,16 +285,19 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
     def websocket(self):
         return self.websocket_client.wss
 
-    def send_websocket_request(self, name, msg, request_id="", no_force_send=True):
-        logger = logging.getLogger(__name__)
+    def send_websocket_request(self, name, msg, request_id="", no_force_send=True, wait=True):
+        """Queue a frame for the writer thread.
+
+        no_force_send=False (heartbeats) puts the frame ahead of the queued ones.
+        With wait=True the call returns once the frame was written and re-raises
+        any send error (concurrent.futures.TimeoutError after send_timeout seconds);
+        wait=False returns right after queueing.
+        """
         data = json.dumps(dict(name=name, request_id=str(request_id), msg=msg))
 
-        while (global_value.ssl_Mutual_exclusion or global_value.ssl_Mutual_exclusion_write) and no_force_send:
-            pass
-        global_value.ssl_Mutual_exclusion_write = True
-        self.websocket.send(data)
-        logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
+        sent = self.writer.submit(data, priority=not no_force_send)
+        if wait:
+            sent.result(timeout=self.send_timeout)
 
         return str(request_id)
 
@@ -675,8 +731,6 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
             return True
 
     def connect(self):
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
         try:
             self.close()
         except:
@@ -718,12 +772,8 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
             self.session.cookies, {"ssid": global_value.SSID})
 
         self.timesync.server_timestamp = None
-        while True:
-            try:
-                if self.timesync.server_timestamp != None:
-                    break
-            except:
-                pass
+        if not self.timesync.wait_synced(self.timesync_timeout):
+            return False, "timeSync timeout"
         return True, None
 
     def connect2fa(self, sms_code):
@@ -738,6 +788,7 @@ class Iqoptionaapi(object):  # pylint: disable=too-many-instance-attributes
         return True, None
 
     def close(self):
+        self.writer.stop()
         self.websocket.close()
         self.websocket_thread.join()
 
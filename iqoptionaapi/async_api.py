@@ -0,0 +1,278 @@
+"""Module for the asyncio IQ Option client.
+
+Runs the websocket on the event loop (``websockets`` package) instead of a
+``WebSocketApp.run_forever`` thread, while reusing the same channel classes
+(``iqoptionaapi.ws.chanels``) to build outgoing frames and the same received
+handlers (``WebsocketClient`` dispatch table) to process incoming ones.
+Callers await futures resolved by the reader task, so any number of concurrent
+requests and subscriptions share one connection without a thread per waiter.
+
+    async with AsyncIQ_Option(email, password) as iq:
+        candles = await iq.get_candles("EURUSD", 60, 100, time.time())
+        async for candle in iq.stream_candles("EURUSD", 60):
+            ...
+"""
+import asyncio
+import itertools
+import json
+import logging
+import ssl
+from collections import defaultdict
+
+import websockets
+
+import iqoptionaapi.constants as OP_code
+import iqoptionaapi.global_value as global_value
+from iqoptionaapi.api import Iqoptionaapi
+from iqoptionaapi.ws.client import WebsocketClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncApiAdapter(Iqoptionaapi):
+    """Iqoptionaapi whose outgoing frames go to the asyncio client instead of the writer thread.
+
+    Channels (``api.getcandles(...)``, ``api.buyv3(...)``) and the received handlers
+    use it exactly like the threaded Iqoptionaapi.
+    """
+
+    def __init__(self, client, username, password, proxies=None):
+        super(AsyncApiAdapter, self).__init__(username, password, proxies)
+        self.client = client
+
+    def send_websocket_request(self, name, msg, request_id="", no_force_send=True, wait=True):
+        data = json.dumps(dict(name=name, request_id=str(request_id), msg=msg))
+        self.client.enqueue(data, priority=not no_force_send)
+        return str(request_id)
+
+
+class AsyncIQ_Option(object):
+
+    def __init__(self, email, password, request_timeout=10, stream_maxsize=1000):
+        self.email = email
+        self.password = password
+        self.request_timeout = request_timeout
+        self.stream_maxsize = stream_maxsize  # candles kept per stream consumer (oldest dropped)
+        self.SESSION_HEADER = {
+            "User-Agent": r"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/66.0.3359.139 Safari/537.36"}
+        self.SESSION_COOKIE = {}
+        self.api = None
+        self.dispatcher = None
+        self.websocket = None
+        self.loop = None
+        self.tasks = []
+        self.outgoing = None
+        self.counter = itertools.count()
+        self.request_ids = itertools.count(1)
+        self.pending = {}  # (response name, request_id) -> future
+        self.name_waiters = defaultdict(list)  # message name -> futures for the next such message
+        self.candle_streams = defaultdict(list)  # (active_id, size) -> consumer queues
+        self.watched = set()
+
+    async def __aenter__(self):
+        check, reason = await self.connect()
+        if not check:
+            raise ConnectionError(reason)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def set_session(self, header, cookie):
+        self.SESSION_HEADER = header
+        self.SESSION_COOKIE = cookie
+
+    # _________________________CONNECTION_____________________
+
+    async def connect(self):
+        await self.close()
+        self.loop = asyncio.get_running_loop()
+        self.outgoing = asyncio.PriorityQueue()
+        self.api = AsyncApiAdapter(self, self.email, self.password)
+        self.api.set_session(headers=self.SESSION_HEADER, cookies=self.SESSION_COOKIE)
+        self.dispatcher = WebsocketClient(self.api)
+        self.api.websocket_client = self.dispatcher
+        self.watched = set()
+
+        if global_value.SSID is None:
+            check, reason = await self.get_ssid()
+            if not check:
+                return False, reason
+
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        try:
+            self.websocket = await websockets.connect(self.api.wss_url, ssl=context, max_size=None)
+        except Exception as e:  # pylint: disable=broad-except
+            return False, str(e)
+        self.tasks = [asyncio.ensure_future(self._read()), asyncio.ensure_future(self._write())]
+
+        profile = await self.send_ssid()
+        if profile["msg"] == False:
+            # stored ssid expired: log in again
+            check, reason = await self.get_ssid()
+            if not check:
+                return False, reason
+            profile = await self.send_ssid()
+            if profile["msg"] == False:
+                return False, "ssid rejected"
+        return True, None
+
+    async def get_ssid(self):
+        # the HTTP login is blocking (requests): run it off the event loop
+        response = await asyncio.get_running_loop().run_in_executor(None, self.api.get_ssid)
+        try:
+            global_value.SSID = response.cookies["ssid"]
+        except Exception:  # pylint: disable=broad-except
+            return False, getattr(response, "text", str(response))
+        return True, None
+
+    async def send_ssid(self):
+        profile = self._expect("profile")
+        synced = self._expect("timeSync")
+        self.api.ssid(global_value.SSID)  # pylint: disable=not-callable
+        message = await asyncio.wait_for(profile, self.request_timeout)
+        if message["msg"] != False:
+            await asyncio.wait_for(synced, self.request_timeout)
+        return message
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        if self.websocket is not None:
+            await self.websocket.close()
+            self.websocket = None
+
+    def check_connect(self):
+        return self.websocket is not None and bool(self.tasks) and not self.tasks[0].done()
+
+    # _________________________FRAMES_____________________
+
+    def enqueue(self, data, priority=False):
+        """Queue an outgoing frame (safe from any thread); heartbeats use priority=True."""
+        item = (0 if priority else 1, next(self.counter), data)
+        self.loop.call_soon_threadsafe(self.outgoing.put_nowait, item)
+
+    async def _write(self):
+        while True:
+            _, _, data = await self.outgoing.get()
+            try:
+                await self.websocket.send(data)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error("websocket send failed: {}".format(e))
+                return
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(data)
+
+    async def _read(self):
+        try:
+            async for frame in self.websocket:
+                # same handlers as the threaded client, plus the resolvers registered by _watch;
+                # a failing handler drops its frame, not the connection
+                try:
+                    self.dispatcher.on_message(None, frame)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("error handling frame: {}".format(frame[:200]))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("websocket closed: {}".format(e))
+        finally:
+            error = ConnectionError("websocket connection closed")
+            for future in list(self.pending.values()) + [f for fs in self.name_waiters.values() for f in fs]:
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+            self.name_waiters.clear()
+
+    def _watch(self, name, handler=None):
+        handler = handler or self._resolve
+        if (name, handler) not in self.watched:
+            self.watched.add((name, handler))
+            self.dispatcher.register_handler(name, handler)
+
+    def _resolve(self, api, message):
+        name = message.get("name")
+        future = self.pending.pop((name, str(message.get("request_id"))), None)
+        if future is not None and not future.done():
+            future.set_result(message)
+        for future in self.name_waiters.pop(name, ()):
+            if not future.done():
+                future.set_result(message)
+
+    def _expect(self, name):
+        """Future for the next message with this name."""
+        self._watch(name)
+        future = self.loop.create_future()
+        self.name_waiters[name].append(future)
+        return future
+
+    async def _request(self, name, send, timeout=None):
+        """Call send() (which sends a frame and returns its request_id) and await the `name` response to it."""
+        self._watch(name)
+        request_id = str(send())
+        future = self.loop.create_future()
+        self.pending[(name, request_id)] = future
+        try:
+            return await asyncio.wait_for(future, timeout or self.request_timeout)
+        finally:
+            self.pending.pop((name, request_id), None)
+
+    # _________________________CANDLES_____________________
+
+    async def get_candles(self, ACTIVES, interval, count, endtime, timeout=None):
+        active_id = OP_code.ACTIVES[ACTIVES]
+        message = await self._request(
+            "candles", lambda: self.api.getcandles(active_id, interval, count, endtime), timeout)
+        self.api.candles.pop(message["request_id"], None)  # also stored by the shared handler
+        return message["msg"]["candles"]
+
+    async def stream_candles(self, ACTIVE, size):
+        """Yield every candle-generated update of ACTIVE/size until the consumer stops iterating.
+
+        Each consumer gets its own queue (stream_maxsize, oldest dropped when full);
+        the subscription is sent once per (active, size) and removed with the last consumer
+        (wrap in contextlib.aclosing to unsubscribe as soon as the loop breaks).
+        """
+        active_id = OP_code.ACTIVES[ACTIVE]
+        key = (active_id, int(size))
+        consumer = asyncio.Queue(self.stream_maxsize)
+        self._watch("candle-generated", self._on_candle_generated)
+        self.candle_streams[key].append(consumer)
+        if len(self.candle_streams[key]) == 1:
+            self.api.subscribe(active_id, size)
+        try:
+            while True:
+                yield await consumer.get()
+        finally:
+            self.candle_streams[key].remove(consumer)
+            if not self.candle_streams[key]:
+                del self.candle_streams[key]
+                if self.check_connect():
+                    self.api.unsubscribe(active_id, size)
+
+    def _on_candle_generated(self, api, message):
+        msg = message["msg"]
+        for consumer in self.candle_streams.get((msg["active_id"], int(msg["size"])), ()):
+            if consumer.full():
+                consumer.get_nowait()
+            consumer.put_nowait(msg)
+
+    # _________________________BUY_____________________
+
+    async def buy(self, price, ACTIVES, ACTION, expirations, timeout=None):
+        req_id = str(next(self.request_ids))
+
+        def send():
+            self.api.buyv3(float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
+            return req_id
+
+        try:
+            message = await self._request("option", send, timeout)
+        except asyncio.TimeoutError:
+            logger.error('**warning** buy late {} sec'.format(timeout or self.request_timeout))
+            return False, None
+        self.api.buy_multi_option.pop(req_id, None)  # also stored by the shared handler
+        if "message" in message["msg"]:
+            return False, message["msg"]["message"]
+        return True, message["msg"]["id"]
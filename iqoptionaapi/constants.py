@@ -1,3 +1,5 @@
+import threading
+
 ACTIVES = {
     # Forex Pairs
     "EURUSD": 1,
@@ -617,4 +619,56 @@ ACTIVES = {
     "NFLX/AMZN-OTC": 2090,
     "GER30/UK100-OTC": 2093,
     "META/GOOGLE-OTC": 2094
-}
\ No newline at end of file
+}
+
+# Reverse index active_id -> name, kept in sync with ACTIVES.
+# When several names share an id, the first one registered wins
+# (same result as the old list(ACTIVES.keys())[list(ACTIVES.values()).index(id)]).
+# ACTIVES_NAMES keeps every name of an id so set_active can update a single
+# entry without iterating ACTIVES while other threads read it.
+ACTIVES_NAME = {}
+ACTIVES_NAMES = {}
+_actives_lock = threading.Lock()
+
+
+def rebuild_actives_index():
+    names = {}
+    for name, active_id in list(ACTIVES.items()):
+        names.setdefault(active_id, []).append(name)
+    global ACTIVES_NAME, ACTIVES_NAMES
+    ACTIVES_NAMES = names
+    ACTIVES_NAME = {active_id: ids[0] for active_id, ids in names.items()}
+
+
+def set_actives(actives):
+    global ACTIVES
+    with _actives_lock:
+        ACTIVES = actives
+        rebuild_actives_index()
+
+
+def set_active(name, active_id):
+    with _actives_lock:
+        old_id = ACTIVES.get(name)
+        ACTIVES[name] = active_id
+        if old_id == active_id:
+            return
+        if old_id is not None:
+            # the name moved to another id: the next name of the old id takes over
+            others = [n for n in ACTIVES_NAMES.get(old_id, ()) if n != name]
+            if others:
+                ACTIVES_NAMES[old_id] = others
+                ACTIVES_NAME[old_id] = others[0]
+            else:
+                ACTIVES_NAMES.pop(old_id, None)
+                ACTIVES_NAME.pop(old_id, None)
+        ACTIVES_NAMES[active_id] = ACTIVES_NAMES.get(active_id, []) + [name]
+        ACTIVES_NAME.setdefault(active_id, name)
+
+
+def active_name(active_id):
+    """Asset name for an active_id in O(1); raises KeyError if the id is unknown."""
+    return ACTIVES_NAME[active_id]
+
+
+rebuild_actives_index()
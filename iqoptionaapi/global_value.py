@@ -1,6 +1,7 @@
 #python
 check_websocket_if_connect=None
 # try fix ssl.SSLEOFError: EOF occurred in violation of protocol (_ssl.c:2361)
+# no longer used: every send goes through the single writer thread (ws/writer.py)
 ssl_Mutual_exclusion=False#mutex read write
 #if false websocket can sent self.websocket.send(data)
 #else can not sent self.websocket.send(data)
@@ -1,5 +1,6 @@
 # python
 from iqoptionaapi.api import Iqoptionaapi
+from iqoptionaapi.ws.callbacks import CallbackExecutor
 import iqoptionaapi.constants as OP_code
 import iqoptionaapi.country_id as Country
 import threading
@@ -38,6 +39,8 @@ class IQ_Option:
         self.subscribe_candle_all_size = []
         self.subscribe_mood = []
         self.subscribe_indicators = []
+        self.response_timeout = None  # seconds to wait for a websocket response (None = forever)
+        self.message_handlers = []  # (name, handler) registered by the user, kept across reconnects
         # for digit
         self.get_digital_spot_profit_after_sale_data = nested_dict(2, int)
         self.get_realtime_strike_list_temp_data = {}
@@ -78,6 +81,18 @@ class IQ_Option:
     def connect_2fa(self, sms_code):
         return self.connect(sms_code=sms_code)
 
+    def _wait_while(self, condition, timeout=None):
+        """Block (without spinning) while condition() is true; woken by each websocket message.
+        Raises TimeoutError after timeout seconds (default self.response_timeout, None = forever)."""
+        if timeout is None:
+            timeout = self.response_timeout
+        if not self.api.wait_until(lambda: not condition(), timeout):
+            raise TimeoutError('no websocket response after {} sec'.format(timeout))
+
+    def _buy_answered(self, req_id):
+        option = self.api.buy_multi_option.get(req_id) or {}
+        return "message" in option or (self.api.result != None and option.get("id") != None)
+
     def check_connect(self):
         if not global_value.check_websocket_if_connect:
             return False
@@ -97,7 +112,7 @@ class IQ_Option:
         dicc = {}
         for lis in sorted(OP_code.ACTIVES.items(), key=operator.itemgetter(1)):
             dicc[lis[0]] = lis[1]
-        OP_code.ACTIVES = dicc
+        OP_code.set_actives(dicc)
 
     def get_name_by_activeId(self, activeId):
         info = self.get_financial_information(activeId)
@@ -109,8 +124,7 @@ class IQ_Option:
     def get_financial_information(self, activeId):
         self.api.financial_information = None
         self.api.get_financial_information(activeId)
-        while self.api.financial_information == None:
-            pass
+        self._wait_while(lambda: self.api.financial_information == None)
         return self.api.financial_information
 
     def get_leader_board(self, country, from_position, to_position, near_traders_count, user_country_id=0, near_traders_country_count=0, top_country_count=0, top_count=0, top_type=2):
@@ -120,8 +134,7 @@ class IQ_Option:
         self.api.Get_Leader_Board(country_id, user_country_id, from_position, to_position,
                                   near_traders_country_count, near_traders_count, top_country_count, top_count, top_type)
 
-        while self.api.leaderboard_deals_client == None:
-            pass
+        self._wait_while(lambda: self.api.leaderboard_deals_client == None)
         return self.api.leaderboard_deals_client
 
     def get_instruments(self, type):
@@ -131,9 +144,7 @@ class IQ_Option:
         while self.api.instruments == None:
             try:
                 self.api.get_instruments(type)
-                start = time.time()
-                while self.api.instruments == None and time.time() - start < 10:
-                    pass
+                self.api.wait_until(lambda: self.api.instruments != None, 10)
             except:
                 logging.error('**error** api.get_instruments need reconnect')
                 self.connect()
@@ -142,7 +153,7 @@ class IQ_Option:
     def instruments_input_to_ACTIVES(self, type):
         instruments = self.get_instruments(type)
         for ins in instruments["instruments"]:
-            OP_code.ACTIVES[ins["id"]] = ins["active_id"]
+            OP_code.set_active(ins["id"], ins["active_id"])
 
     def instruments_input_all_in_ACTIVES(self):
         self.instruments_input_to_ACTIVES("crypto")
@@ -153,8 +164,8 @@ class IQ_Option:
         init_info = self.get_all_init()
         for dirr in (["binary", "turbo"]):
             for i in init_info["result"][dirr]["actives"]:
-                OP_code.ACTIVES[(init_info["result"][dirr]
-                                 ["actives"][i]["name"]).split(".")[1]] = int(i)
+                OP_code.set_active((init_info["result"][dirr]
+                                    ["actives"][i]["name"]).split(".")[1], int(i))
 
     def get_all_init(self):
 
@@ -168,16 +179,8 @@ class IQ_Option:
                     logging.error('**error** get_all_init need reconnect')
                     self.connect()
                     time.sleep(5)
-            start = time.time()
-            while True:
-                if time.time() - start > 30:
-                    logging.error('**warning** get_all_init late 30 sec')
-                    break
-                try:
-                    if self.api.api_option_init_all_result != None:
-                        break
-                except:
-                    pass
+            if not self.api.wait_until(lambda: self.api.api_option_init_all_result != None, 30):
+                logging.error('**warning** get_all_init late 30 sec')
             try:
                 if self.api.api_option_init_all_result["isSuccessful"] == True:
                     return self.api.api_option_init_all_result
@@ -191,11 +194,9 @@ class IQ_Option:
             self.connect()
 
         self.api.get_api_option_init_all_v2()
-        start_t = time.time()
-        while self.api.api_option_init_all_result_v2 == None:
-            if time.time() - start_t >= 30:
-                logging.error('**warning** get_all_init_v2 late 30 sec')
-                return None
+        if not self.api.wait_until(lambda: self.api.api_option_init_all_result_v2 != None, 30):
+            logging.error('**warning** get_all_init_v2 late 30 sec')
+            return None
         return self.api.api_option_init_all_result_v2
 
     def __get_binary_open(self):
@@ -218,7 +219,7 @@ class IQ_Option:
                             self.OPEN_TIME[option][name]["open"] = active["enabled"]
         
                         # update actives opcode       
-                        OP_code.ACTIVES[name] = int(actives_id)    
+                        OP_code.set_active(name, int(actives_id))
 
     def __get_digital_open(self):
         # for digital options
@@ -236,7 +237,7 @@ class IQ_Option:
          
             # update digital actives opcode
             active_id_valor = digital['active_id']
-            OP_code.ACTIVES[name] = active_id_valor
+            OP_code.set_active(name, active_id_valor)
 
     def __get_blitz_open(self):
         # for digital options
@@ -268,7 +269,7 @@ class IQ_Option:
 
                 # update digital actives opcode
                 active_id_valor = detail['active_id']
-                OP_code.ACTIVES[name] = active_id_valor
+                OP_code.set_active(name, active_id_valor)
 
 
     def get_all_open_time(self):
@@ -284,7 +285,7 @@ class IQ_Option:
         binary.join(), digital.join(), other.join()
         
         # ordenate updated actives opcode
-        OP_code.ACTIVES = dict(sorted(OP_code.ACTIVES.items(), key=operator.itemgetter(1)))
+        OP_code.set_actives(dict(sorted(OP_code.ACTIVES.items(), key=operator.itemgetter(1))))
 
         return self.OPEN_TIME
 
@@ -324,8 +325,7 @@ class IQ_Option:
 
 
     def get_profile_ansyc(self):
-        while self.api.profile.msg == None:
-            pass
+        self._wait_while(lambda: self.api.profile.msg == None)
         return self.api.profile.msg
 
     def get_currency(self):
@@ -348,8 +348,7 @@ class IQ_Option:
     def get_balances(self):
         self.api.balances_raw = None
         self.api.get_balances()
-        while self.api.balances_raw == None:
-            pass
+        self._wait_while(lambda: self.api.balances_raw == None)
         return self.api.balances_raw
 
     def get_balance_mode(self):
@@ -368,8 +367,7 @@ class IQ_Option:
     def reset_practice_balance(self):
         self.api.training_balance_reset_request = None
         self.api.reset_training_balance()
-        while self.api.training_balance_reset_request == None:
-            pass
+        self._wait_while(lambda: self.api.training_balance_reset_request == None)
         return self.api.training_balance_reset_request
 
     def position_change_all(self, Main_Name, user_balance_id):
@@ -433,16 +431,11 @@ class IQ_Option:
         while True:
             try:
                 request_id = self.api.getcandles(OP_code.ACTIVES[ACTIVES], interval, count, endtime)
-                # Adiciona um pequeno atraso para evitar busy-waiting
-                start_time = time.time()
-                while self.check_connect and request_id not in self.api.candles:
-                    if time.time() - start_time > 10:  # Tempo limite de 10 segundos
-                        #raise TimeoutError('Erro API, Tempo limite aguardando candles')
-                        self.connect()
-                        break
-                    time.sleep(0.1) 
-                if request_id in self.api.candles:
+                # Espera a resposta sem busy-waiting (tempo limite de 10 segundos)
+                if self.api.wait_until(lambda: request_id in self.api.candles, 10):
                     break
+                #raise TimeoutError('Erro API, Tempo limite aguardando candles')
+                self.connect()
                     
             except TimeoutError as te:
                 logging.error(te)
@@ -455,6 +448,58 @@ class IQ_Option:
         return self.api.candles.pop(request_id).candles_data
      
 
+    def get_candles_pipelined(self, ACTIVES, interval, ranges, max_in_flight=8, max_rate=10, timeout=10, retries=3):
+        """Fetch several candle ranges keeping up to max_in_flight get-candles requests open.
+
+        ranges is a list of (count, endtime) tuples. Responses are matched by request_id
+        and returned in the same order as ranges (one list of candles per range).
+        max_rate limits how many requests are sent per second.
+        """
+        if ACTIVES not in OP_code.ACTIVES:
+            print('Asset {} not found in constants'.format(ACTIVES))
+            return None
+
+        active_id = OP_code.ACTIVES[ACTIVES]
+        results = [None] * len(ranges)
+        attempts = [0] * len(ranges)
+        pending = {}  # request_id -> (range index, send time)
+        to_send = deque(range(len(ranges)))
+        min_gap = 1.0 / max_rate if max_rate else 0
+        last_send = 0
+
+        while to_send or pending:
+            # keep the pipeline full, respecting the rate limit
+            while to_send and len(pending) < max_in_flight:
+                wait = last_send + min_gap - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                idx = to_send.popleft()
+                count, endtime = ranges[idx]
+                attempts[idx] += 1
+                request_id = self.api.getcandles(active_id, interval, count, endtime)
+                last_send = time.time()
+                pending[request_id] = (idx, last_send)
+
+            # collect whatever arrived and resend the requests that timed out
+            now = time.time()
+            for request_id, (idx, sent) in list(pending.items()):
+                if request_id in self.api.candles:
+                    del pending[request_id]
+                    results[idx] = self.api.candles.pop(request_id).candles_data
+                elif now - sent > timeout:
+                    del pending[request_id]
+                    if attempts[idx] >= retries:
+                        raise TimeoutError('get_candles_pipelined: no answer for range {}'.format(ranges[idx]))
+                    logging.error('get_candles_pipelined: timeout on range {}, resending'.format(ranges[idx]))
+                    if not self.check_connect():
+                        self.connect()
+                    to_send.append(idx)
+
+            if pending:
+                self.api.wait_until(lambda: any(r in self.api.candles for r in pending), 0.1)
+
+        return results
+
     def start_candles_stream(self, ACTIVE, size, maxdict):
 
         if size == "all":
@@ -471,6 +516,31 @@ class IQ_Option:
             logging.error(
                 '**error** start_candles_stream please input right size')
 
+    def register_message_handler(self, name, handler):
+        """Call handler(api, message) for every websocket message with this name (e.g. "candle-generated").
+        Registrations survive reconnects."""
+        self.message_handlers.append((name, handler))
+        if getattr(self, "api", None) is not None and self.api.websocket_client is not None:
+            self.api.websocket_client.register_handler(name, handler)
+
+    def unregister_message_handler(self, name, handler):
+        if (name, handler) in self.message_handlers:
+            self.message_handlers.remove((name, handler))
+        if getattr(self, "api", None) is not None and self.api.websocket_client is not None:
+            self.api.websocket_client.unregister_handler(name, handler)
+
+    def set_candle_generated_callback(self, callback):
+        """callback(active_name, msg) is called (on the callback executor, in order per asset)
+        for every candle-generated message (the open candle, several times per candle).
+        Pass None to remove it."""
+        self.api.candle_generated_cb = callback
+
+    def set_callback_executor(self, workers=4, maxsize=1000, policy="drop_oldest"):
+        """Pool used for the live-deal and candle-generated callbacks.
+        policy for a full queue: "drop_oldest", "drop_new" or "block"."""
+        Iqoptionaapi.callback_executor.shutdown()
+        Iqoptionaapi.callback_executor = CallbackExecutor(workers, maxsize, policy)
+
     def stop_candles_stream(self, ACTIVE, size):
         if size == "all":
             self.stop_candles_all_size_stream(ACTIVE)
@@ -499,6 +569,10 @@ class IQ_Option:
             logging.error(
                 '**error** get_realtime_candles() please input right "size"')
 
+    def get_realtime_arrays(self, ACTIVE, size, n=None):
+        """Zero-copy numpy views (from/id/at/open/close/min/max/volume/ask/bid) of the last n streamed candles."""
+        return self.api.real_time_candles.ring(str(ACTIVE), int(size)).arrays(n)
+
     def get_all_realtime_candles(self):
         return self.api.real_time_candles
     
@@ -506,9 +580,9 @@ class IQ_Option:
     def full_realtime_get_candle(self, ACTIVE, size, maxdict):
         candles = self.get_candles(
             ACTIVE, size, maxdict, self.api.timesync.server_timestamp)
+        ring = self.api.real_time_candles.ring(str(ACTIVE), int(size), maxdict)
         for can in candles:
-            self.api.real_time_candles[str(
-                ACTIVE)][int(size)][can["from"]] = can
+            ring.add(can)
 
 
     def start_candles_one_stream(self, ACTIVE, size):
@@ -637,27 +711,20 @@ class IQ_Option:
     def get_technical_indicators(self, ACTIVES):
         request_id = self.api.get_Technical_indicators(
             OP_code.ACTIVES[ACTIVES])
-        while self.api.technical_indicators.get(request_id) == None:
-            pass
+        self._wait_while(lambda: self.api.technical_indicators.get(request_id) == None)
         return self.api.technical_indicators[request_id]
 
 
 
     def check_binary_order(self, order_id):
-        while order_id not in self.api.order_binary:
-            pass
+        self._wait_while(lambda: order_id not in self.api.order_binary)
         your_order = self.api.order_binary[order_id]
         del self.api.order_binary[order_id]
         return your_order
 
     def check_win(self, id_number):
-        while True:
-            try:
-                listinfodata_dict = self.api.listinfodata.get(id_number)
-                if listinfodata_dict["game_state"] == 1:
-                    break
-            except:
-                pass
+        self._wait_while(lambda: self.api.listinfodata.listinfodata_dict.get(id_number, {}).get("game_state") != 1)
+        listinfodata_dict = self.api.listinfodata.get(id_number)
         self.api.listinfodata.delete(id_number)
         return listinfodata_dict["win"]
 
@@ -675,12 +742,7 @@ class IQ_Option:
             time.sleep(polling_time)
 
     def check_win_v4(self, id_number):
-        while True:
-            try:
-                if self.api.socket_option_closed[id_number] != None:
-                    break
-            except:
-                pass
+        self._wait_while(lambda: self.api.socket_option_closed.get(id_number) == None)
         x = self.api.socket_option_closed[id_number]
         return x['msg']['win'], (0 if x['msg']['win'] == 'equal' else float(x['msg']['sum']) * -1 if x['msg']['win'] == 'loose' else float(x['msg']['win_amount']) - float(x['msg']['sum']))
 
@@ -696,20 +758,18 @@ class IQ_Option:
     def get_betinfo(self, id_number):
         while True:
             self.api.game_betinfo.isSuccessful = None
-            start = time.time()
             try:
                 self.api.get_betinfo(id_number)
             except:
                 logging.error(
                     '**error** def get_betinfo  self.api.get_betinfo reconnect')
                 self.connect()
-            while self.api.game_betinfo.isSuccessful == None:
-                if time.time() - start > 10:
-                    logging.error(
-                        '**error** get_betinfo time out need reconnect')
-                    self.connect()
-                    self.api.get_betinfo(id_number)
-                    time.sleep(self.suspend * 10)
+            while not self.api.wait_until(lambda: self.api.game_betinfo.isSuccessful != None, 10):
+                logging.error(
+                    '**error** get_betinfo time out need reconnect')
+                self.connect()
+                self.api.get_betinfo(id_number)
+                time.sleep(self.suspend * 10)
             if self.api.game_betinfo.isSuccessful == True:
                 return self.api.game_betinfo.isSuccessful, self.api.game_betinfo.dict
             else:
@@ -719,16 +779,14 @@ class IQ_Option:
     def get_optioninfo(self, limit):
         self.api.api_game_getoptions_result = None
         self.api.get_options(limit)
-        while self.api.api_game_getoptions_result == None:
-            pass
+        self._wait_while(lambda: self.api.api_game_getoptions_result == None)
 
         return self.api.api_game_getoptions_result
 
     def get_optioninfo_v2(self, limit):
         self.api.get_options_v2_data = None
         self.api.get_options_v2(limit, "binary,turbo")
-        while self.api.get_options_v2_data == None:
-            pass
+        self._wait_while(lambda: self.api.get_options_v2_data == None)
 
         return self.api.get_options_v2_data
 
@@ -740,8 +798,7 @@ class IQ_Option:
             for idx in range(buy_len):
                 self.api.buyv3(
                     price[idx], OP_code.ACTIVES[ACTIVES[idx]], ACTION[idx], expirations[idx], idx)
-            while len(self.api.buy_multi_option) < buy_len:
-                pass
+            self._wait_while(lambda: len(self.api.buy_multi_option) < buy_len)
             buy_id = []
             for key in sorted(self.api.buy_multi_option.keys()):
                 try:
@@ -772,24 +829,14 @@ class IQ_Option:
             pass
         self.api.buyv3_by_raw_expired(
             price, OP_code.ACTIVES[active], direction, option, expired, request_id=req_id)
-        start_t = time.time()
-        id = None
         self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    logging.error(
-                        '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
+        if not self.api.wait_until(lambda: self._buy_answered(req_id), 5):
+            logging.error('**warning** buy late 5 sec')
+            return False, None
+        if "message" in self.api.buy_multi_option[req_id]:
+            logging.error(
+                '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
+            return False, self.api.buy_multi_option[req_id]["message"]
 
         return self.api.result, self.api.buy_multi_option[req_id]["id"]
 
@@ -804,67 +851,50 @@ class IQ_Option:
             pass
         self.api.buyv3(
             float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
-        start_t = time.time()
-        id = None
         self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
+        if not self.api.wait_until(lambda: self._buy_answered(req_id), 5):
+            logging.error('**warning** buy late 5 sec')
+            return False, None
+        if "message" in self.api.buy_multi_option[req_id]:
+            return False, self.api.buy_multi_option[req_id]["message"]
 
         return self.api.result, self.api.buy_multi_option[req_id]["id"]
     
     def sell_option(self, options_ids):
         self.api.sell_option(options_ids)
         self.api.sold_options_respond = None
-        while self.api.sold_options_respond == None:
-            pass
+        self._wait_while(lambda: self.api.sold_options_respond == None)
         return self.api.sold_options_respond
 
     def sell_digital_option(self, options_ids):
         self.api.sell_digital_option(options_ids)
         self.api.sold_digital_options_respond = None
-        while self.api.sold_digital_options_respond == None:
-            pass
+        self._wait_while(lambda: self.api.sold_digital_options_respond == None)
         return self.api.sold_digital_options_respond
 
     def sell_blitz_option(self, options_ids):
         self.api.sell_blitz_option(options_ids)
         self.api.sold_blitz_options_respond = None
-        while self.api.sold_blitz_options_respond == None:
-            pass
+        self._wait_while(lambda: self.api.sold_blitz_options_respond == None)
         return self.api.sold_blitz_options_respond
     
     def get_digital_underlying_list_data(self):
         self.api.underlying_list_data = None
         self.api.get_digital_underlying()
-        start_t = time.time()
-        while self.api.underlying_list_data == None:
-            if time.time() - start_t >= 30:
-                logging.error(
-                    '**warning** get_digital_underlying_list_data late 30 sec')
-                return None
+        if not self.api.wait_until(lambda: self.api.underlying_list_data != None, 30):
+            logging.error(
+                '**warning** get_digital_underlying_list_data late 30 sec')
+            return None
 
         return self.api.underlying_list_data
 
     def get_blitz_underlying_list_data(self):
         self.api.underlying_list_data = None
         self.api.get_blitz_underlying()
-        start_t = time.time()
-        while self.api.underlying_list_data == None:
-            if time.time() - start_t >= 30:
-                logging.error(
-                    '**warning** get_blitz_underlying_list_data late 30 sec')
-                return None
+        if not self.api.wait_until(lambda: self.api.underlying_list_data != None, 30):
+            logging.error(
+                '**warning** get_blitz_underlying_list_data late 30 sec')
+            return None
 
         return self.api.underlying_list_data
     
@@ -872,8 +902,7 @@ class IQ_Option:
         self.api.strike_list = None
         self.api.get_strike_list(ACTIVES, duration)
         ans = {}
-        while self.api.strike_list == None:
-            pass
+        self._wait_while(lambda: self.api.strike_list == None)
         try:
             for data in self.api.strike_list["msg"]["strike"]:
                 temp = {}
@@ -895,16 +924,11 @@ class IQ_Option:
             ACTIVE, expiration_period)
 
     def get_instrument_quites_generated_data(self, ACTIVE, duration):
-        while self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60] == {}:
-            pass
+        self._wait_while(lambda: self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60] == {})
         return self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60]
 
     def get_realtime_strike_list(self, ACTIVE, duration):
-        while True:
-            if not self.api.instrument_quites_generated_data[ACTIVE][duration * 60]:
-                pass
-            else:
-                break
+        self._wait_while(lambda: not self.api.instrument_quites_generated_data[ACTIVE][duration * 60])
         ans = {}
         now_timestamp = self.api.instrument_quites_generated_timestamp[ACTIVE][duration * 60]
 
@@ -976,8 +1000,7 @@ class IQ_Option:
 
         request_id = self.api.place_digital_option(instrument_id, amount)
 
-        while self.api.digital_option_placed_id.get(request_id) == None:
-            pass
+        self._wait_while(lambda: self.api.digital_option_placed_id.get(request_id) == None)
         digital_order_id = self.api.digital_option_placed_id.get(request_id)
         if isinstance(digital_order_id, int):
             return True, digital_order_id
@@ -1018,8 +1041,7 @@ class IQ_Option:
 
         request_id = self.api.place_blitz_option(instrument_id, amount)
 
-        while self.api.blitz_option_placed_id.get(request_id) == None:
-            pass
+        self._wait_while(lambda: self.api.blitz_option_placed_id.get(request_id) == None)
         blitz_order_id = self.api.blitz_option_placed_id.get(request_id)
         if isinstance(blitz_order_id, int):
             return True, blitz_order_id
@@ -1074,8 +1096,7 @@ class IQ_Option:
 
         request_id = self.api.place_blitz_option(instrument_id, amount)
 
-        while self.api.blitz_option_placed_id.get(request_id) == None:
-            pass
+        self._wait_while(lambda: self.api.blitz_option_placed_id.get(request_id) == None)
         blitz_order_id = self.api.blitz_option_placed_id.get(request_id)
         if isinstance(blitz_order_id, int):
             return True, blitz_order_id
@@ -1090,8 +1111,7 @@ class IQ_Option:
                     return row["price"]["bid"]
             return None
 
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(position_id)["position-changed"] == {})
         
     def get_blitz_spot_profit_after_sale(self, position_id):
         def get_instrument_id_to_bid(data, instrument_id):
@@ -1100,8 +1120,7 @@ class IQ_Option:
                     return row["price"]["bid"]
             return None
 
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(position_id)["position-changed"] == {})
     
         # ___________________/*position*/_________________
         position = self.get_async_order(position_id)["position-changed"]["msg"]
@@ -1194,8 +1213,7 @@ class IQ_Option:
                     return row["price"]["bid"]
             return None
 
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(position_id)["position-changed"] == {})
         # ___________________/*position*/_________________
         position = self.get_async_order(position_id)["position-changed"]["msg"]
         # doEURUSD201911040628PT1MPSPT
@@ -1283,22 +1301,18 @@ class IQ_Option:
     def buy_digital(self, amount, instrument_id):
         self.api.digital_option_placed_id = None
         self.api.place_digital_option(instrument_id, amount)
-        start_t = time.time()
-        while self.api.digital_option_placed_id == None:
-            if time.time() - start_t > 30:
-                logging.error('buy_digital loss digital_option_placed_id')
-                return False, None
+        if not self.api.wait_until(lambda: self.api.digital_option_placed_id != None, 30):
+            logging.error('buy_digital loss digital_option_placed_id')
+            return False, None
         return True, self.api.digital_option_placed_id
 
     def close_digital_option(self, position_id):
         self.api.result = None
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(position_id)["position-changed"] == {})
         position_changed = self.get_async_order(
             position_id)["position-changed"]["msg"]
         self.api.close_digital_option(position_changed["external_id"])
-        while self.api.result == None:
-            pass
+        self._wait_while(lambda: self.api.result == None)
         return self.api.result
 
     def check_win_digital(self, buy_order_id, polling_time):
@@ -1314,8 +1328,7 @@ class IQ_Option:
 
     def check_win_digital_v2(self, buy_order_id):
 
-        while self.get_async_order(buy_order_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(buy_order_id)["position-changed"] == {})
         order_data = self.get_async_order(
             buy_order_id)["position-changed"]["msg"]
         if order_data != None:
@@ -1332,22 +1345,18 @@ class IQ_Option:
     def buy_blitz(self, amount, instrument_id):
         self.api.blitz_option_placed_id = None
         self.api.place_blitz_option(instrument_id, amount)
-        start_t = time.time()
-        while self.api.blitz_option_placed_id == None:
-            if time.time() - start_t > 30:
-                logging.error('buy_blitz loss blitz_option_placed_id')
-                return False, None
+        if not self.api.wait_until(lambda: self.api.blitz_option_placed_id != None, 30):
+            logging.error('buy_blitz loss blitz_option_placed_id')
+            return False, None
         return True, self.api.blitz_option_placed_id
 
     def close_blitz_option(self, position_id):
         self.api.result = None
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(position_id)["position-changed"] == {})
         position_changed = self.get_async_order(
             position_id)["position-changed"]["msg"]
         self.api.close_blitz_option(position_changed["external_id"])
-        while self.api.result == None:
-            pass
+        self._wait_while(lambda: self.api.result == None)
         return self.api.result
     
     def check_win_blitz(self, buy_order_id, polling_time):
@@ -1363,8 +1372,7 @@ class IQ_Option:
 
     def check_win_blitz_v2(self, buy_order_id):
 
-        while self.get_async_order(buy_order_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(buy_order_id)["position-changed"] == {})
         order_data = self.get_async_order(
             buy_order_id)["position-changed"]["msg"]
         if order_data != None:
@@ -1399,8 +1407,7 @@ class IQ_Option:
             use_token_for_commission=use_token_for_commission
         )
 
-        while self.api.buy_order_id == None:
-            pass
+        self._wait_while(lambda: self.api.buy_order_id == None)
         check, data = self.get_order(self.api.buy_order_id)
         while data["status"] == "pending_new":
             check, data = self.get_order(self.api.buy_order_id)
@@ -1418,8 +1425,7 @@ class IQ_Option:
     def change_auto_margin_call(self, ID_Name, ID, auto_margin_call):
         self.api.auto_margin_call_changed_respond = None
         self.api.change_auto_margin_call(ID_Name, ID, auto_margin_call)
-        while self.api.auto_margin_call_changed_respond == None:
-            pass
+        self._wait_while(lambda: self.api.auto_margin_call_changed_respond == None)
         if self.api.auto_margin_call_changed_respond["status"] == 2000:
             return True, self.api.auto_margin_call_changed_respond
         else:
@@ -1448,8 +1454,7 @@ class IQ_Option:
                 use_trail_stop=use_trail_stop)
             self.change_auto_margin_call(
                 ID_Name=ID_Name, ID=ID, auto_margin_call=auto_margin_call)
-            while self.api.tpsl_changed_respond == None:
-                pass
+            self._wait_while(lambda: self.api.tpsl_changed_respond == None)
             if self.api.tpsl_changed_respond["status"] == 2000:
                 return True, self.api.tpsl_changed_respond["msg"]
             else:
@@ -1466,8 +1471,7 @@ class IQ_Option:
 
         self.api.order_data = None
         self.api.get_order(buy_order_id)
-        while self.api.order_data == None:
-            pass
+        self._wait_while(lambda: self.api.order_data == None)
         if self.api.order_data["status"] == 2000:
             return True, self.api.order_data["msg"]
         else:
@@ -1476,8 +1480,7 @@ class IQ_Option:
     def get_pending(self, instrument_type):
         self.api.deferred_orders = None
         self.api.get_pending(instrument_type)
-        while self.api.deferred_orders == None:
-            pass
+        self._wait_while(lambda: self.api.deferred_orders == None)
         if self.api.deferred_orders["status"] == 2000:
             return True, self.api.deferred_orders["msg"]
         else:
@@ -1487,8 +1490,7 @@ class IQ_Option:
     def get_positions(self, instrument_type):
         self.api.positions = None
         self.api.get_positions(instrument_type)
-        while self.api.positions == None:
-            pass
+        self._wait_while(lambda: self.api.positions == None)
         if self.api.positions["status"] == 2000:
             return True, self.api.positions["msg"]
         else:
@@ -1499,8 +1501,7 @@ class IQ_Option:
         check, order_data = self.get_order(buy_order_id)
         position_id = order_data["position_id"]
         self.api.get_position(position_id)
-        while self.api.position == None:
-            pass
+        self._wait_while(lambda: self.api.position == None)
         if self.api.position["status"] == 2000:
             return True, self.api.position["msg"]
         else:
@@ -1511,44 +1512,37 @@ class IQ_Option:
     def get_digital_position_by_position_id(self, position_id):
         self.api.position = None
         self.api.get_digital_position(position_id)
-        while self.api.position == None:
-            pass
+        self._wait_while(lambda: self.api.position == None)
         return self.api.position
 
     def get_digital_position(self, order_id):
         self.api.position = None
-        while self.get_async_order(order_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(order_id)["position-changed"] == {})
         position_id = self.get_async_order(
             order_id)["position-changed"]["msg"]["external_id"]
         self.api.get_digital_position(position_id)
-        while self.api.position == None:
-            pass
+        self._wait_while(lambda: self.api.position == None)
         return self.api.position
 
     def get_blitz_position_by_position_id(self, position_id):
         self.api.position = None
         self.api.get_blitz_position(position_id)
-        while self.api.position == None:
-            pass
+        self._wait_while(lambda: self.api.position == None)
         return self.api.position
 
     def get_blitz_position(self, order_id):
         self.api.position = None
-        while self.get_async_order(order_id)["position-changed"] == {}:
-            pass
+        self._wait_while(lambda: self.get_async_order(order_id)["position-changed"] == {})
         position_id = self.get_async_order(
             order_id)["position-changed"]["msg"]["external_id"]
         self.api.get_blitz_position(position_id)
-        while self.api.position == None:
-            pass
+        self._wait_while(lambda: self.api.position == None)
         return self.api.position
     
     def get_position_history(self, instrument_type):
         self.api.position_history = None
         self.api.get_position_history(instrument_type)
-        while self.api.position_history == None:
-            pass
+        self._wait_while(lambda: self.api.position_history == None)
 
         if self.api.position_history["status"] == 2000:
             return True, self.api.position_history["msg"]
@@ -1560,8 +1554,7 @@ class IQ_Option:
         self.api.position_history_v2 = None
         self.api.get_position_history_v2(
             instrument_type, limit, offset, start, end)
-        while self.api.position_history_v2 == None:
-            pass
+        self._wait_while(lambda: self.api.position_history_v2 == None)
 
         if self.api.position_history_v2["status"] == 2000:
             return True, self.api.position_history_v2["msg"]
@@ -1575,8 +1568,7 @@ class IQ_Option:
         else:
             self.api.get_available_leverages(
                 instrument_type, OP_code.ACTIVES[actives])
-        while self.api.available_leverages == None:
-            pass
+        self._wait_while(lambda: self.api.available_leverages == None)
         if self.api.available_leverages["status"] == 2000:
             return True, self.api.available_leverages["msg"]
         else:
@@ -1585,8 +1577,7 @@ class IQ_Option:
     def cancel_order(self, buy_order_id):
         self.api.order_canceled = None
         self.api.cancel_order(buy_order_id)
-        while self.api.order_canceled == None:
-            pass
+        self._wait_while(lambda: self.api.order_canceled == None)
         if self.api.order_canceled["status"] == 2000:
             return True
         else:
@@ -1597,8 +1588,7 @@ class IQ_Option:
         if data["position_id"] != None:
             self.api.close_position_data = None
             self.api.close_position(data["position_id"])
-            while self.api.close_position_data == None:
-                pass
+            self._wait_while(lambda: self.api.close_position_data == None)
             if self.api.close_position_data["status"] == 2000:
                 return True
             else:
@@ -1607,12 +1597,10 @@ class IQ_Option:
             return False
 
     def close_position_v2(self, position_id):
-        while self.get_async_order(position_id) == None:
-            pass
+        self._wait_while(lambda: self.get_async_order(position_id) == None)
         position_changed = self.get_async_order(position_id)
         self.api.close_position(position_changed["id"])
-        while self.api.close_position_data == None:
-            pass
+        self._wait_while(lambda: self.api.close_position_data == None)
         if self.api.close_position_data["status"] == 2000:
             return True
         else:
@@ -1621,8 +1609,7 @@ class IQ_Option:
     def get_overnight_fee(self, instrument_type, active):
         self.api.overnight_fee = None
         self.api.get_overnight_fee(instrument_type, OP_code.ACTIVES[active])
-        while self.api.overnight_fee == None:
-            pass
+        self._wait_while(lambda: self.api.overnight_fee == None)
         if self.api.overnight_fee["status"] == 2000:
             return True, self.api.overnight_fee["msg"]
         else:
@@ -1637,7 +1624,7 @@ class IQ_Option:
     # -----------------------------------------------------------------
 
     def opcode_to_name(self, opcode):
-        return list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(opcode)]
+        return OP_code.active_name(opcode)
 
     def subscribe_live_deal(self, name, active, _type, buffersize):
         active_id = OP_code.ACTIVES[active]
@@ -1670,8 +1657,7 @@ class IQ_Option:
     def get_user_profile_client(self, user_id):
         self.api.user_profile_client = None
         self.api.Get_User_Profile_Client(user_id)
-        while self.api.user_profile_client == None:
-            pass
+        self._wait_while(lambda: self.api.user_profile_client == None)
 
         return self.api.user_profile_client
 
@@ -1704,10 +1690,7 @@ class IQ_Option:
 
         self.api.subscribe_digital_price_splitter(asset_id)
 
-        start = time.time()
-        while self.api.digital_payout is None:
-            if seconds and int(time.time() - start) > seconds:
-                break
+        self.api.wait_until(lambda: self.api.digital_payout is not None, seconds or None)
 
         self.api.unsubscribe_digital_price_splitter(asset_id)
 
@@ -1719,10 +1702,7 @@ class IQ_Option:
 
         self.api.subscribe_blitz_price_splitter(asset_id)
 
-        start = time.time()
-        while self.api.blitz_payout is None:
-            if seconds and int(time.time() - start) > seconds:
-                break
+        self.api.wait_until(lambda: self.api.blitz_payout is not None, seconds or None)
 
         self.api.unsubscribe_blitz_price_splitter(asset_id)
 
@@ -1766,8 +1746,7 @@ class IQ_Option:
         logger.info(instrument_id)
         request_id = self.api.place_digital_option_v2(instrument_id, active_id, amount)
 
-        while self.api.digital_option_placed_id.get(request_id) is None:
-            pass
+        self._wait_while(lambda: self.api.digital_option_placed_id.get(request_id) is None)
 
         digital_order_id = self.api.digital_option_placed_id.get(request_id)
         if isinstance(digital_order_id, int):
@@ -1810,8 +1789,7 @@ class IQ_Option:
             logger.info(instrument_id)
             request_id = self.api.place_blitz_option_v2(instrument_id, active_id, amount)
 
-            while self.api.blitz_option_placed_id.get(request_id) is None:
-                pass
+            self._wait_while(lambda: self.api.blitz_option_placed_id.get(request_id) is None)
 
             blitz_order_id = self.api.blitz_option_placed_id.get(request_id)
             if isinstance(blitz_order_id, int):
@@ -1842,26 +1820,23 @@ class IQ_Option:
 
         self.api.send_websocket_request(name = "subscribeMessage", msg = data)
 
-        start = time.time()
-
-        while self.api.payouts_digital[asset_id] is None:
-            if int(time.time() - start) > 10:
-                #print('AVISO! Não consegui puxar o payout da digital, sua internet pode estar lenta demais.\n')
-                name = "unsubscribeMessage"
-                data = {
-                    "name": "price-splitter.client-price-generated",
-                    "version": "1.0",
-                    "params": {
-                        "routingFilters": {
-                            "instrument_type": "digital-option",
-                            "asset_id": int(asset_id)
-                        }
+        if not self.api.wait_until(lambda: self.api.payouts_digital[asset_id] is not None, 10):
+            #print('AVISO! Não consegui puxar o payout da digital, sua internet pode estar lenta demais.\n')
+            name = "unsubscribeMessage"
+            data = {
+                "name": "price-splitter.client-price-generated",
+                "version": "1.0",
+                "params": {
+                    "routingFilters": {
+                        "instrument_type": "digital-option",
+                        "asset_id": int(asset_id)
                     }
                 }
+            }
+
+            self.api.send_websocket_request(name, msg=data)
+            return 0
 
-                self.api.send_websocket_request(name, msg=data)
-                return 0
-            
         name = "unsubscribeMessage"
         data = {
             "name": "price-splitter.client-price-generated",
@@ -1899,9 +1874,7 @@ class IQ_Option:
         }
         self.api.send_websocket_request(name, data)
 
-        while self.api.alerta == None:
-            time.sleep(0.01)
-            pass   
+        self._wait_while(lambda: self.api.alerta == None)
         return self.api.alerta
     
     def get_alerta(self):
@@ -1917,13 +1890,11 @@ class IQ_Option:
         }
         self.api.send_websocket_request(name, data)
 
-        while self.api.alertas == None:
-            time.sleep(0.01)
-            pass            
+        self._wait_while(lambda: self.api.alertas == None)
 
         if self.api.alertas != []:
             for i in self.api.alertas:
-                i['par'] = list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(i['asset_id'])]
+                i['par'] = OP_code.active_name(i['asset_id'])
 
         return self.api.alertas
 
@@ -1938,13 +1909,11 @@ class IQ_Option:
         }
         self.api.send_websocket_request(name, data)   
 
-        while self.api.alerta == None:
-            time.sleep(0.01)
-            pass            
+        self._wait_while(lambda: self.api.alerta == None)
         return self.api.alerta
     
     def alertas_realtime(self):
-        return self.api.alertas_tocados
+        return list(self.api.alertas_tocados)
     
     def start_candles_stream_v2(self,ativo,size):
 
@@ -1976,9 +1945,7 @@ class IQ_Option:
         "body": {}
         }
         self.api.send_websocket_request(name, data)
-        while self.api.leverage_forex == None:
-            time.sleep(0.3)
-            pass
+        self._wait_while(lambda: self.api.leverage_forex == None)
             
         leverage =  self.api.leverage_forex
 
@@ -2025,9 +1992,7 @@ class IQ_Option:
         
         self.api.buy_order_forex(leverage,par,direcao,valor_entrada,preco_entrada,win,lose)
 
-        while self.api.buy_forex_id == None:
-            time.sleep(0.3)
-            pass
+        self._wait_while(lambda: self.api.buy_forex_id == None)
 
         if self.api.buy_forex_id["status"] == 2000:
             return True, self.api.buy_forex_id["msg"]["id"]
@@ -2078,8 +2043,7 @@ class IQ_Option:
         
         self.api.send_websocket_request(name, data)
 
-        while self.api.buy_order_id == None:
-            pass
+        self._wait_while(lambda: self.api.buy_order_id == None)
         check, data = self.get_order(self.api.buy_order_id)
         while data["status"] == "pending_new":
             check, data = self.get_order(self.api.buy_order_id)
@@ -2108,9 +2072,7 @@ class IQ_Option:
         }
         self.apisend_websocket_request(name, data)
 
-        while self.api.cancel_order_forex == None:
-            time.sleep(0.3)
-            pass
+        self._wait_while(lambda: self.api.cancel_order_forex == None)
 
         if self.api.cancel_order_forex["status"] == 2000:
             return True, self.api.cancel_order_forex["msg"]
@@ -2137,9 +2099,7 @@ class IQ_Option:
             }
         self.api.send_websocket_request(name, data)
 
-        while self.api.fechadas_forex == None:
-            time.sleep(0.5)
-            pass
+        self._wait_while(lambda: self.api.fechadas_forex == None)
 
         if self.api.fechadas_forex["status"] == 2000:
             return True, self.api.fechadas_forex["msg"]
@@ -2165,9 +2125,7 @@ class IQ_Option:
             }
         self.api.send_websocket_request(name, data)
 
-        while self.api.positions_forex== None:
-            time.sleep(0.5)
-            pass
+        self._wait_while(lambda: self.api.positions_forex== None)
   
         if self.api.positions_forex["status"] == 2000:
             return True, self.api.positions_forex["msg"]
@@ -2188,9 +2146,7 @@ class IQ_Option:
             }
         self.api.send_websocket_request(name, data)
 
-        while self.api.pendentes_forex== None:
-            time.sleep(0.5)
-            pass
+        self._wait_while(lambda: self.api.pendentes_forex== None)
   
         if self.api.pendentes_forex["status"] == 2000:
             return True, self.api.pendentes_forex["msg"]
@@ -2205,6 +2161,7 @@ class IQ_Option:
             # logging.error('**warning** self.api.close() fail')
 
         self.api = Iqoptionaapi(self.email, self.password)
+        self.api.message_handlers = self.message_handlers
         check = None
 
         # 2FA--
@@ -2225,8 +2182,7 @@ class IQ_Option:
             self.re_subscribe_stream()
 
             # ---------for async get name: "position-changed", microserviceName
-            while global_value.balance_id == None:
-                pass
+            self._wait_while(lambda: global_value.balance_id == None)
 
             self.position_change_all(
                 "subscribeMessage", global_value.balance_id)
@@ -2319,18 +2275,9 @@ class IQ_Option:
         req_id = str(randint(0, 100000))
         self.api.send_websocket_request(name, data, req_id)
 
-        start = time.time()
-        while True:
-            time.sleep(0.1)
-            if time.time() - start <= 5:
-                try:
-                    message =self.api.orders[str(req_id)]
-                    break
-                except Exception as err:
-                    # print(err)
-                    pass
-            else:
-                return False, None
+        if not self.api.wait_until(lambda: str(req_id) in self.api.orders, 5):
+            return False, None
+        message = self.api.orders[str(req_id)]
         try:
             return True, message['id']
         except:
@@ -2371,18 +2318,9 @@ class IQ_Option:
         time.sleep(1)
         self.q.get()
         
-        start = time.time()
-        while True:
-            time.sleep(0.1)
-            if time.time() - start <= 5:
-                try:
-                    message = self.api.orders[str(req_id)]
-                    break
-                except Exception as err:
-                    # print(err)
-                    pass
-            else:
-                return False, None
+        if not self.api.wait_until(lambda: str(req_id) in self.api.orders, 5):
+            return False, None
+        message = self.api.orders[str(req_id)]
 
         try:
 
@@ -0,0 +1,91 @@
+"""Module for the IQ Option callback executor."""
+import logging
+import queue
+import threading
+
+POLICIES = ("drop_oldest", "drop_new", "block")
+
+
+class CallbackExecutor(object):
+    """Runs user callbacks (live deals, candle-generated, ...) on a fixed pool of threads.
+
+    Callbacks submitted with the same key (the asset) always go to the same worker,
+    so they run in the order their messages arrived. Each worker has a bounded queue;
+    when it is full the policy decides what happens:
+
+    - "drop_oldest": discard the oldest queued callback (freshest data wins);
+    - "drop_new": discard the new one;
+    - "block": wait for room, applying backpressure to the websocket thread.
+
+    :param workers: Number of worker threads (started on the first submit).
+    :param maxsize: Queued callbacks per worker.
+    :param policy: One of POLICIES.
+    """
+
+    def __init__(self, workers=4, maxsize=1000, policy="drop_oldest"):
+        if policy not in POLICIES:
+            raise ValueError("policy must be one of {}".format(POLICIES))
+        self.policy = policy
+        self.queues = [queue.Queue(maxsize) for _ in range(workers)]
+        self.threads = []
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        with self.lock:
+            if not self.threads:
+                for i, jobs in enumerate(self.queues):
+                    thread = threading.Thread(target=self.run, args=(jobs,), name="iqoption-callback-{}".format(i))
+                    thread.daemon = True
+                    thread.start()
+                    self.threads.append(thread)
+
+    def submit(self, key, callback, args=(), kwargs=None):
+        """Queue callback(*args, **kwargs) behind the earlier callbacks of the same key.
+        Returns False if the call was dropped."""
+        if not self.threads:
+            self.start()
+        jobs = self.queues[hash(key) % len(self.queues)]
+        job = (callback, args, kwargs or {})
+        if self.policy == "block":
+            jobs.put(job)
+        else:
+            try:
+                jobs.put_nowait(job)
+            except queue.Full:
+                self.dropped += 1
+                if self.policy == "drop_new":
+                    return False
+                try:
+                    jobs.get_nowait()
+                    jobs.put_nowait(job)
+                except (queue.Empty, queue.Full):
+                    return False
+        self.submitted += 1
+        return True
+
+    def run(self, jobs):
+        logger = logging.getLogger(__name__)
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            callback, args, kwargs = job
+            try:
+                callback(*args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-except
+                self.failed += 1
+                logger.error("callback {} failed: {}".format(getattr(callback, "__name__", callback), e))
+
+    def shutdown(self):
+        """Stop the workers once the callbacks already queued have run."""
+        with self.lock:
+            for jobs in self.queues:
+                jobs.put(None)
+            self.threads = []
+
+    def stats(self):
+        return {"submitted": self.submitted, "dropped": self.dropped, "failed": self.failed,
+                "pending": sum(jobs.qsize() for jobs in self.queues), "policy": self.policy}
@@ -3,14 +3,12 @@ import logging
 import websocket
 import iqoptionaapi.constants as OP_code
 import iqoptionaapi.global_value as global_value
-from threading import Thread
 from iqoptionaapi.ws.received.technical_indicators import technical_indicators
 from iqoptionaapi.ws.received.time_sync import time_sync
 from iqoptionaapi.ws.received.heartbeat import heartbeat
 from iqoptionaapi.ws.received.balances import balances
 from iqoptionaapi.ws.received.profile import profile
 from iqoptionaapi.ws.received.balance_changed import balance_changed
-from iqoptionaapi.ws.received.candles import candles
 from iqoptionaapi.ws.received.buy_complete import buy_complete
 from iqoptionaapi.ws.received.option import option
 from iqoptionaapi.ws.received.position_history import position_history
@@ -58,10 +56,40 @@ from iqoptionaapi.ws.received.user_profile_client import user_profile_client
 from iqoptionaapi.ws.received.leaderboard_userinfo_deals_client import leaderboard_userinfo_deals_client
 from iqoptionaapi.ws.received.client_price_generated import client_price_generated
 from iqoptionaapi.ws.received.users_availability import users_availability
+from iqoptionaapi.ws.objects.bounded_dict import BoundedDict
 
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json otherwise
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+NAME_PREFIX = '{"name":"'  # server frames start with the message name
+
+
+def json_loads(frame):
+    """Decode a frame with orjson when installed, falling back to the stdlib json."""
+    if orjson is not None:
+        try:
+            return orjson.loads(frame)
+        except orjson.JSONDecodeError:  # e.g. integers beyond 64 bits
+            pass
+    return json.loads(frame)
 
-class WebsocketClient(object):
 
+def peek_name(frame):
+    """Message name read from the raw frame without decoding it (None if not at the start)."""
+    if isinstance(frame, str) and frame.startswith(NAME_PREFIX):
+        end = frame.find('"', len(NAME_PREFIX))
+        if end > 0:
+            return frame[len(NAME_PREFIX):end]
+    return None
+
+
+class WebsocketClient(object):
+    decode = staticmethod(json_loads)  # pluggable: any callable str -> dict
+    skip_unhandled = True  # drop frames with no registered handler before decoding them
 
     def __init__(self, api):
 
@@ -70,181 +98,192 @@ class WebsocketClient(object):
             self.api.wss_url, on_message=self.on_message,
             on_error=self.on_error, on_close=self.on_close,
             on_open=self.on_open)
+        self.handlers = {}
+        self._register_default_handlers()
+        for name, handler in getattr(self.api, "message_handlers", []):
+            self.register_handler(name, handler)
 
     def dict_queue_add(self, dict, maxdict, key1, key2, key3, value):
-        if key3 in dict[key1][key2]:
-            dict[key1][key2][key3] = value
-        else:
-            while True:
-                try:
-                    dic_size = len(dict[key1][key2])
-                except:
-                    dic_size = 0
-                if dic_size < maxdict:
-                    dict[key1][key2][key3] = value
-                    break
-                else:
-                    # del mini key
-                    del dict[key1][key2][sorted(
-                        dict[key1][key2].keys(), reverse=False)[0]]
+        """Store candle `value` (from=key3) in the key1/key2 ring buffer of at most maxdict candles: O(1)."""
+        dict.ring(key1, key2, maxdict).add(value)
 
     def api_dict_clean(self, obj):
-        if len(obj) > 5000:
+        # the result maps are BoundedDict (size/age limits of their own); plain dicts keep the old cap
+        if isinstance(obj, BoundedDict):
+            obj.expire()
+        elif len(obj) > 5000:
             for k in obj.keys():
                 del obj[k]
                 break
 
+    def _register_default_handlers(self):
+        """Name -> handler table for the ws/received modules and the inline handlers below.
+        Handlers are called as handler(api, message), in registration order."""
+        register = self.register_handler
+        register("technical-indicators", lambda api, message: technical_indicators(api, message, self.api_dict_clean))
+        register("timeSync", time_sync)
+        register("heartbeat", heartbeat)
+        register("balances", balances)
+        register("profile", profile)
+        register("balance-changed", balance_changed)
+        register("buyComplete", buy_complete)
+        register("option", option)
+        register("position-history", position_history)
+        register("listInfoData", list_info_data)
+        register("candle-generated", lambda api, message: candle_generated_realtime(api, message, self.dict_queue_add))
+        register("candles-generated", lambda api, message: candle_generated_v2(api, message, self.dict_queue_add))
+        register("commission-changed", commission_changed)
+        register("socket-option-opened", socket_option_opened)
+        register("api_option_init_all_result", api_option_init_all_result)
+        register("initialization-data", initialization_data)
+        register("underlying-list", underlying_list)
+        register("instruments", instruments)
+        register("financial-information", financial_information)
+        register("position-changed", position_changed)
+        register("option-opened", option_opened)
+        register("option-closed", option_closed)
+        register("top-assets-updated", top_assets_updated)
+        register("strike-list", strike_list)
+        register("api_game_betinfo_result", api_game_betinfo_result)
+        register("traders-mood-changed", traders_mood_changed)
+        # ------for forex&cfd&crypto..
+        register("order-placed-temp", order_placed_temp)
+        register("order", order)
+        register("position", position)
+        register("positions", positions)
+        register("deferred-orders", deferred_orders)
+        register("history-positions", history_positions)
+        register("available-leverages", available_leverages)
+        register("order-canceled", order_canceled)
+        register("position-closed", position_closed)
+        register("overnight-fee", overnight_fee)
+        register("api_game_getoptions_result", api_game_getoptions_result)
+        register("sold-options", sold_options)
+        register("tpsl-changed", tpsl_changed)
+        register("auto-margin-call-changed", auto_margin_call_changed)
+        register("digital-option-placed", lambda api, message: digital_option_placed(api, message, self.api_dict_clean))
+        register("result", result)
+        register("instrument-quotes-generated", instrument_quotes_generated)
+        register("training-balance-reset", training_balance_reset)
+        register("socket-option-closed", socket_option_closed)
+        register("live-deal-binary-option-placed", live_deal_binary_option_placed)
+        register("live-deal-digital-option", live_deal_digital_option)
+        register("leaderboard-deals-client", leaderboard_deals_client)
+        register("live-deal", live_deal)
+        register("user-profile-client", user_profile_client)
+        register("leaderboard-userinfo-deals-client", leaderboard_userinfo_deals_client)
+        register("users-availability", users_availability)
+        register("client-price-generated", client_price_generated)
+
+        register("client-price-generated", self._on_client_price_generated)
+        register("alert", self._on_alert)
+        register("alert-triggered", self._on_alert_triggered)
+        register("alerts", self._on_alerts)
+        register("candle-generated", self._on_candle_generated)
+        register("stop-order-placed", self._store("buy_forex_id"))
+        register("pending-order-canceled", self._store("cancel_order_forex"))
+        register("positions", self._store("positions_forex"))
+        register("history-positions", self._store("fechadas_forex"))
+        register("orders", self._store("pendentes_forex"))
+        register("underlying-list", self._store("leverage_forex"))
+        register("candles", self._on_candles)
+        register("digital-option-placed", self._on_order_placed)
+        register("option", self._on_order_placed)
+
+    def register_handler(self, name, handler):
+        """Call handler(api, message) for every incoming message with this name."""
+        # copy-on-write: the reader thread may be iterating the current list
+        self.handlers[name] = self.handlers.get(name, []) + [handler]
+
+    def unregister_handler(self, name, handler):
+        """Remove a handler added with register_handler; returns False if it was not registered."""
+        handlers = self.handlers.get(name, [])
+        if handler not in handlers:
+            return False
+        handlers = list(handlers)
+        handlers.remove(handler)
+        if handlers:
+            self.handlers[name] = handlers
+        else:
+            self.handlers.pop(name, None)
+        return True
+
+    @staticmethod
+    def _store(attribute):
+        # handler that keeps the whole message in api.<attribute>
+        def handler(api, message):
+            setattr(api, attribute, message)
+        return handler
+
+    @staticmethod
+    def _on_client_price_generated(api, message):
+        ask_price = [d for d in message["msg"]["prices"] if d['strike'] == 'SPT'][0]['call']['ask']
+        pay = int(((100-ask_price)*100)/ask_price)
+        api.payouts_digital[message["msg"]["asset_id"]] = {}
+        api.payouts_digital[message["msg"]["asset_id"]]['hora']= time.time()
+        api.payouts_digital[message["msg"]["asset_id"]]['pay']= pay
+
+    @staticmethod
+    def _on_alert(api, message):
+        try:
+            api.alerta = message['msg']
+        except:
+            pass
+
+    @staticmethod
+    def _on_alert_triggered(api, message):
+        try:
+            api.alertas_tocados.append(message["msg"])
+        except:
+            pass
+
+    @staticmethod
+    def _on_alerts(api, message):
+        try:
+            api.alertas = message['msg']['records']
+        except:
+            pass
+
+    @staticmethod
+    def _on_candle_generated(api, message):
+        try:
+            active_name = OP_code.active_name(message["msg"]["active_id"])
+            api.all_realtime_candles[active_name] = message["msg"]
+        except:
+            return
+        if api.candle_generated_cb is not None:
+            api.callback_executor.submit(active_name, api.candle_generated_cb, (active_name, message["msg"]))
+
+    @staticmethod
+    def _on_candles(api, message):
+        try:
+            api.addcandles(message["request_id"], message["msg"]["candles"])
+        except:
+            pass
+
+    @staticmethod
+    def _on_order_placed(api, message):
+        request_id = message['request_id']
+        api.orders[request_id] = message['msg']
+
     def on_message(self,wss, message):  # pylint: disable=unused-argument
         """Method to process websocket messages."""
-        global_value.ssl_Mutual_exclusion = True
-        logger = logging.getLogger(__name__)
-        logger.debug(message)
-
-        message = json.loads(str(message))
-
-
-        technical_indicators(self.api, message, self.api_dict_clean)
-        time_sync(self.api, message)
-        heartbeat(self.api, message)
-        balances(self.api, message)
-        profile(self.api, message)
-        balance_changed(self.api, message)
-        #candles(self.api, message)
-        buy_complete(self.api, message)
-        option(self.api, message)
-        position_history(self.api, message)
-        list_info_data(self.api, message)
-        #candle_generated_realtime(self.api, message, self.dict_queue_add)
-        #candle_generated_v2(self.api, message, self.dict_queue_add)
-        commission_changed(self.api, message)
-        socket_option_opened(self.api, message)
-        api_option_init_all_result(self.api, message)
-        initialization_data(self.api, message)
-        underlying_list(self.api, message)
-        instruments(self.api, message)
-        financial_information(self.api, message)
-        position_changed(self.api, message)
-        option_opened(self.api, message)
-        option_closed(self.api, message)
-        top_assets_updated(self.api, message)
-        strike_list(self.api, message)
-        api_game_betinfo_result(self.api, message)
-        traders_mood_changed(self.api, message)
-         # ------for forex&cfd&crypto..
-        order_placed_temp(self.api, message)
-        order(self.api, message)
-        position(self.api, message)
-        positions(self.api, message)
-        order_placed_temp(self.api, message)
-        deferred_orders(self.api, message)
-        history_positions(self.api, message)
-        available_leverages(self.api, message)
-        order_canceled(self.api, message)
-        position_closed(self.api, message)
-        overnight_fee(self.api, message)
-        api_game_getoptions_result(self.api, message)
-        sold_options(self.api, message)
-        tpsl_changed(self.api, message)
-        auto_margin_call_changed(self.api, message)
-        digital_option_placed(self.api, message, self.api_dict_clean)
-        result(self.api, message)
-        instrument_quotes_generated(self.api, message)
-        training_balance_reset(self.api, message)
-        socket_option_closed(self.api, message)
-        live_deal_binary_option_placed(self.api, message)
-        live_deal_digital_option(self.api, message)
-        leaderboard_deals_client(self.api, message)
-        live_deal(self.api, message)
-        user_profile_client(self.api, message)
-        leaderboard_userinfo_deals_client(self.api, message)
-        users_availability(self.api, message)
-        client_price_generated(self.api, message)
-        
-        if message['name'] == 'client-price-generated':
-            ask_price = [d for d in message["msg"]["prices"] if d['strike'] == 'SPT'][0]['call']['ask']
-            pay = int(((100-ask_price)*100)/ask_price)
-            self.api.payouts_digital[message["msg"]["asset_id"]] = {}
-            self.api.payouts_digital[message["msg"]["asset_id"]]['hora']= time.time()
-            self.api.payouts_digital[message["msg"]["asset_id"]]['pay']= pay
-
-        if message["name"] == "alert":
-            try:
-                self.api.alerta = message['msg']
-            except:
-                pass
-                
-        if message["name"] == "alert-triggered":
-            try:
-                self.api.alertas_tocados.append(message["msg"])
-            except:
-                pass
-            
-        if message["name"] == "alerts":
-            try:
-                self.api.alertas = message['msg']['records']
-            except:
-                pass
-
-        if message["name"] == "candle-generated":
-            try:
-                active_name = list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
-                self.api.all_realtime_candles[active_name] = message["msg"]
-            except:
-                pass
-
-
-        if message["name"] == "stop-order-placed":
-            try:
-                self.api.buy_forex_id = message
-            except:
-                pass
-
-        if message["name"] == "pending-order-canceled":
-            try:
-                self.api.cancel_order_forex = message
-            except:
-                pass
-
-        if message["name"] == "positions":
-            try:
-                self.api.positions_forex= message
-            except:
-                pass
-
-        if message["name"] == "history-positions":
-            try:
-                self.api.fechadas_forex = message
-            except:
-                pass
-
-        if message["name"] == "orders":
-            try:
-                self.api.pendentes_forex = message
-            except:
-                pass
-
-        if message["name"] == "underlying-list":
-
-            try:
-                self.api.leverage_forex = message
-            except:
-                pass
-
-        if message['name'] == 'candles':
-            try:
-                self.api.addcandles(message["request_id"], message["msg"]["candles"])
-            except:
-                pass
-        if message['name'] == 'digital-option-placed':
-            request_id = message['request_id']
-            self.api.orders[request_id] = message['msg']
-
-        if message['name'] == 'option':
-            request_id = message['request_id']
-            self.api.orders[request_id] = message['msg']
-
-
-        global_value.ssl_Mutual_exclusion = False
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(message)
+
+        if self.skip_unhandled:
+            name = peek_name(message)
+            if name is not None and name not in self.handlers:
+                return
+
+        message = self.decode(message)
+
+        # one dict lookup per message instead of asking every handler
+        for handler in self.handlers.get(message.get("name"), ()):
+            handler(self.api, message)
+
+        # wake up callers waiting for a response in IQ_Option (api.wait_until)
+        self.api.notify_response()
 
     @staticmethod
     def on_error(wss, error):  # pylint: disable=unused-argument
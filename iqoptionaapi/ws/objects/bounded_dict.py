@@ -0,0 +1,101 @@
+"""Module for the bounded result maps (request_id / order id -> response)."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+MAX_SIZE = 5000  # entries kept per map
+MAX_AGE = 6 * 3600  # seconds an entry may stay unused (None = no age limit)
+
+
+class BoundedDict(MutableMapping):
+    """Thread-safe dict with LRU and idle-time (TTL) eviction.
+
+    Writes and reads refresh an entry; when the map holds more than max_size
+    entries, or an entry was not used for max_age seconds, the least recently
+    used ones are dropped. Evictions are counted in `evicted` (by reason).
+
+    :param max_size: Maximum number of entries (None = unbounded).
+    :param max_age: Maximum idle time in seconds (None = no age limit).
+    :param default_factory: Like defaultdict: value created for a missing key.
+    """
+
+    def __init__(self, max_size=MAX_SIZE, max_age=MAX_AGE, default_factory=None, name=None):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.default_factory = default_factory
+        self.name = name
+        self.data = OrderedDict()  # key -> (last use, value), least recently used first
+        self.lock = threading.Lock()
+        self.evicted = {"size": 0, "age": 0}
+
+    def __getitem__(self, key):
+        with self.lock:
+            try:
+                _, value = self.data[key]
+            except KeyError:
+                if self.default_factory is None:
+                    raise
+                value = self.default_factory()
+            self.data[key] = (time.monotonic(), value)
+            self.data.move_to_end(key)
+            self._evict()
+            return value
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic(), value)
+            self.data.move_to_end(key)
+            self._evict()
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.data))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return "BoundedDict({!r})".format({k: v for k, (_, v) in list(self.data.items())})
+
+    def get(self, key, default=None):
+        # no LRU refresh: used by the wait_until predicates polling for a response
+        try:
+            return self.data[key][1]
+        except KeyError:
+            return default
+
+    def expire(self):
+        """Drop the entries idle for more than max_age seconds."""
+        with self.lock:
+            self._evict()
+
+    def _evict(self):
+        size, age = 0, 0
+        if self.max_age is not None:
+            limit = time.monotonic() - self.max_age
+            while self.data and next(iter(self.data.values()))[0] < limit:
+                self.data.popitem(last=False)
+                age += 1
+        if self.max_size is not None:
+            while len(self.data) > self.max_size:
+                self.data.popitem(last=False)
+                size += 1
+        if size or age:
+            self.evicted["size"] += size
+            self.evicted["age"] += age
+            logging.getLogger(__name__).debug(
+                "%s: evicted %d by size, %d by age", self.name, size, age)
+
+    def stats(self):
+        return {"name": self.name, "entries": len(self.data), "max_size": self.max_size,
+                "max_age": self.max_age, "evicted_size": self.evicted["size"],
+                "evicted_age": self.evicted["age"]}
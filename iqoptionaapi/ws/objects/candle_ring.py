@@ -0,0 +1,121 @@
+"""Module for the real-time candle ring buffers."""
+from collections.abc import Mapping
+
+import numpy as np
+
+DEFAULT_CAPACITY = 1000  # candles kept when no maxdict was set for the stream
+PRICES = ("open", "close", "min", "max", "volume", "ask", "bid")  # float64 columns, NaN = not sent
+STAMPS = ("id", "at")  # int64 columns, -1 = not sent (get_candles candles carry no `at`)
+
+
+class CandleRing(Mapping):
+    """Fixed-capacity columnar buffer of the last candles of one (active, size) stream.
+
+    Every value is written twice (at i and i + capacity), so the last n candles are
+    always one contiguous slice and view() hands out numpy views without copying.
+    Appending a new candle and updating the open one in place are O(1).
+
+    It is also a read-only mapping from -> candle dict, like the dicts that
+    get_realtime_candles used to return.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, size=None):
+        self.capacity = int(capacity)
+        self.size = size
+        self.times = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.prices = np.full((len(PRICES), 2 * self.capacity), np.nan)
+        self.stamps = np.full((len(STAMPS), 2 * self.capacity), -1, dtype=np.int64)
+        self.pos = -1  # slot of the newest candle
+        self.count = 0  # candles stored (<= capacity)
+
+    def add(self, candle):
+        """Append a candle, or update it in place if its `from` is already stored."""
+        start = int(candle["from"])
+        if self.count and start <= self.times[self.pos]:
+            i = self.pos if start == self.times[self.pos] else self._find(start)
+            if i is None:
+                return  # late message for a candle no longer (or never) in the buffer
+        else:
+            self.pos = (self.pos + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            i = self.pos
+        values = [candle.get(name, np.nan) for name in PRICES]
+        stamps = [candle.get(name, -1) for name in STAMPS]
+        for j in (i, i + self.capacity):
+            self.times[j] = start
+            self.prices[:, j] = values
+            self.stamps[:, j] = stamps
+
+    def _find(self, start):
+        times = self.view("from")
+        k = int(np.searchsorted(times, start))
+        if k < len(times) and times[k] == start:
+            return (self.pos - (len(times) - 1 - k)) % self.capacity
+        return None
+
+    def _window(self, n=None):
+        n = self.count if n is None else min(n, self.count)
+        end = self.pos + self.capacity + 1
+        return end - n, end
+
+    def view(self, field, n=None):
+        """Zero-copy array of the last n (default: all stored) values of field, oldest first."""
+        start, end = self._window(n)
+        if field == "from":
+            return self.times[start:end]
+        if field in STAMPS:
+            return self.stamps[STAMPS.index(field), start:end]
+        return self.prices[PRICES.index(field), start:end]
+
+    def arrays(self, n=None):
+        """Zero-copy views of every column for the last n candles."""
+        start, end = self._window(n)
+        columns = {"from": self.times[start:end]}
+        for j, name in enumerate(PRICES):
+            columns[name] = self.prices[j, start:end]
+        for j, name in enumerate(STAMPS):
+            columns[name] = self.stamps[j, start:end]
+        return columns
+
+    # Mapping interface (from -> candle dict)
+    def __getitem__(self, start):
+        i = self._find(int(start))
+        if i is None:
+            raise KeyError(start)
+        candle = {"from": int(self.times[i])}
+        if self.size is not None:
+            candle["to"] = candle["from"] + int(self.size)
+        for j, name in enumerate(STAMPS):
+            if self.stamps[j, i] != -1:
+                candle[name] = int(self.stamps[j, i])
+        for j, name in enumerate(PRICES):
+            if not np.isnan(self.prices[j, i]):
+                candle[name] = float(self.prices[j, i])
+        return candle
+
+    def __iter__(self):
+        return iter(self.view("from").tolist())
+
+    def __len__(self):
+        return self.count
+
+
+class RealtimeCandles(dict):
+    """active -> {size: CandleRing} store of the candle-generated streams."""
+
+    def __missing__(self, active):
+        return self.setdefault(active, {})
+
+    def ring(self, active, size, capacity=None):
+        """Ring buffer of the stream, created (or resized, keeping the newest candles) when needed."""
+        if not isinstance(capacity, int) or capacity <= 0:
+            capacity = None  # maxdict not set for this stream
+        rings = self[active]
+        ring = rings.get(size)
+        if ring is None or (capacity is not None and ring.capacity != capacity):
+            new = CandleRing(capacity or DEFAULT_CAPACITY, size)
+            if ring is not None:
+                for start in ring:
+                    new.add(ring[start])
+            rings[size] = ring = new
+        return ring
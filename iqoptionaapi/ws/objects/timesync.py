@@ -1,30 +1,64 @@
 
 import time
 import datetime
+import threading
+from collections import deque
 
 from iqoptionaapi.ws.objects.base import Base
 
+SAMPLES = 30  # timeSync messages used for the offset estimate
+
 
 class TimeSync(Base):
+    """Server clock estimated from the timeSync messages.
+
+    Each message gives offset = server time - time.monotonic() at reception.
+    Network delay only makes a sample late (smaller offset), so the estimate is
+    the largest offset among the last SAMPLES messages; reads interpolate with
+    the local monotonic clock and never block.
+    """
+
     def __init__(self):
         super(TimeSync, self).__init__()
         self.__name = "timeSync"
-        self.__server_timestamp = time.time()
+        self.__offset = time.time() - time.monotonic()  # local clock until the first timeSync
+        self.__samples = deque(maxlen=SAMPLES)
+        self.__synced = threading.Event()
         self.__expiration_time = 1
 
     @property
     def server_timestamp(self):
-
-        while self.__server_timestamp==None:
-            time.sleep(0.2)
-            pass
-
-        return self.__server_timestamp / 1000
+        """Estimated server time in seconds (local clock if no timeSync was received yet)."""
+        return self.__offset + time.monotonic()
 
     @server_timestamp.setter
     def server_timestamp(self, timestamp):
-        """Method to set server timestamp."""
-        self.__server_timestamp = timestamp
+        """Record a timeSync sample (milliseconds); None marks the clock as not synced (reconnect)."""
+        if timestamp is None:
+            self.__synced.clear()
+            return
+        self.__samples.append(timestamp / 1000 - time.monotonic())
+        self.__offset = max(self.__samples)
+        self.__synced.set()
+
+    @property
+    def synced(self):
+        return self.__synced.is_set()
+
+    def wait_synced(self, timeout=None):
+        """Block until a timeSync message arrives; False if timeout (seconds) expires first."""
+        return self.__synced.wait(timeout)
+
+    def stats(self):
+        """Offset to the local wall clock and the delay spread of the recent samples (seconds)."""
+        samples = list(self.__samples)
+        return {
+            "synced": self.synced,
+            "samples": len(samples),
+            "offset": self.__offset + time.monotonic() - time.time(),
+            "last_delay": self.__offset - samples[-1] if samples else None,
+            "jitter": max(samples) - min(samples) if samples else None,
+        }
 
     @property
     def server_datetime(self):
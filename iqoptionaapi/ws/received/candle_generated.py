@@ -4,8 +4,7 @@ import iqoptionaapi.global_value as global_value
 
 def candle_generated_realtime(api, message, dict_queue_add):
     if message["name"] == "candle-generated":
-        Active_name = list(OP_code.ACTIVES.keys())[list(
-            OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
+        Active_name = OP_code.active_name(message["msg"]["active_id"])
 
         active = str(Active_name)
         size = int(message["msg"]["size"])
@@ -2,8 +2,7 @@ import iqoptionaapi.constants as OP_code
 
 def candle_generated_v2(api, message, dict_queue_add):
     if message["name"] == "candles-generated":
-        Active_name = list(OP_code.ACTIVES.keys())[list(
-                OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
+        Active_name = OP_code.active_name(message["msg"]["active_id"])
         active = str(Active_name)
         for k, v in message["msg"]["candles"].items():
             v["active_id"] = message["msg"]["active_id"]
@@ -1,13 +1,11 @@
 
 import iqoptionaapi.constants as OP_code
-from threading import Thread
 
 def live_deal(api, message): 
     if message["name"] == "live-deal":
         # name = message["name"]
         active_id = message["msg"]["instrument_active_id"]
-        active = list(OP_code.ACTIVES.keys())[
-            list(OP_code.ACTIVES.values()).index(active_id)]
+        active = OP_code.active_name(active_id)
         _type = message["msg"]["instrument_type"]
         try:
             # api.live_deal_data[name][active][_type].appendleft(
@@ -17,9 +15,7 @@ def live_deal(api, message):
                     "active": active,
                     **message["msg"]
                 }
-                livedeal = Thread(target=api.live_deal_cb,
-                                kwargs=(cb_data))
-                livedeal.daemon = True
-                livedeal.start()
+                # pooled worker per asset (ordered), instead of a new Thread per deal
+                api.callback_executor.submit(active, api.live_deal_cb, kwargs=cb_data)
         except:
             pass
\ No newline at end of file
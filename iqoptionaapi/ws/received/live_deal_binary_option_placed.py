@@ -1,13 +1,11 @@
 
 import iqoptionaapi.constants as OP_code
-from threading import Thread
 
 def live_deal_binary_option_placed(api, message):
     if message["name"] == "live-deal-binary-option-placed":
         # name = message["name"]
         active_id = message["msg"]["active_id"]
-        active = list(OP_code.ACTIVES.keys())[
-            list(OP_code.ACTIVES.values()).index(active_id)]
+        active = OP_code.active_name(active_id)
         _type = message["msg"]["option_type"]
         try:
             # self.api.live_deal_data[name][active][_type].appendleft(
@@ -17,9 +15,7 @@ def live_deal_binary_option_placed(api, message):
                     "active": active,
                     **message["msg"]
                 }
-                realbinary = Thread(target=api.binary_live_deal_cb,
-                                    kwargs=(cb_data))
-                realbinary.daemon = True
-                realbinary.start()
+                # pooled worker per asset (ordered), instead of a new Thread per deal
+                api.callback_executor.submit(active, api.binary_live_deal_cb, kwargs=cb_data)
         except:
             pass
\ No newline at end of file
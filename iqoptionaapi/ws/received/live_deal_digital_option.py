@@ -1,13 +1,11 @@
 
 import iqoptionaapi.constants as OP_code
-from threading import Thread
 
 def live_deal_digital_option(api, message):
     if message["name"] == "live-deal-digital-option":
         # name = message["name"]
         active_id = message["msg"]["instrument_active_id"]
-        active = list(OP_code.ACTIVES.keys())[
-            list(OP_code.ACTIVES.values()).index(active_id)]
+        active = OP_code.active_name(active_id)
         _type = message["msg"]["expiration_type"]
         try:
             # self.api.live_deal_data[name][active][_type].appendleft(
@@ -17,9 +15,7 @@ def live_deal_digital_option(api, message):
                     "active": active,
                     **message["msg"]
                 }
-                realdigital = Thread(target=api.digital_live_deal_cb,
-                                        kwargs=(cb_data))
-                realdigital.daemon = True
-                realdigital.start()
+                # pooled worker per asset (ordered), instead of a new Thread per deal
+                api.callback_executor.submit(active, api.digital_live_deal_cb, kwargs=cb_data)
         except:
             pass
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""Module for the IQ Option websocket outgoing queue."""
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class WebsocketWriter(object):
+    """Single thread that owns websocket.send.
+
+    Any thread can submit frames; they are sent one at a time in submission order
+    (priority frames such as heartbeats jump the queue), so the SSL socket never
+    sees concurrent writes and senders never spin.
+
+    :param api: The instance of :class:`Iqoptionaapi`.
+    :param max_batch: Frames taken from the queue per wake-up.
+    :param coalesce: Send identical frames queued in the same batch only once.
+    """
+
+    def __init__(self, api, max_batch=64, coalesce=False):
+        self.api = api
+        self.max_batch = max_batch
+        self.coalesce = coalesce
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()  # keeps FIFO order inside each priority
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread (done on the first submit)."""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="iqoption-writer")
+                self.thread.daemon = True
+                self.thread.start()
+
+    def submit(self, data, priority=False):
+        """Queue a frame; the returned Future resolves once it was sent (or holds the send error)."""
+        if self.thread is None:
+            self.start()
+        future = Future()
+        self.queue.put((0 if priority else 1, next(self.counter), data, future))
+        return future
+
+    def stop(self, timeout=5):
+        """Stop the writer thread and fail the frames still queued.
+
+        The next submit starts a new thread, so the writer can be reused after a reconnect.
+        """
+        with self.lock:
+            thread, self.thread = self.thread, None
+            if thread is not None:
+                # sentinel ahead of every frame
+                self.queue.put((-1, next(self.counter), None, None))
+                thread.join(timeout)
+            error = ConnectionError("websocket writer stopped")
+            while True:
+                try:
+                    _, _, data, future = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if future is not None:
+                    future.set_exception(error)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item[3] is None:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[3] is None:
+                    self.queue.put(item)  # stop after this batch
+                    break
+                batch.append(item)
+            self.send_batch(batch)
+
+    def send_batch(self, batch):
+        logger = logging.getLogger(__name__)
+        frames = {}
+        for _, seq, data, future in batch:
+            key = data if self.coalesce else seq
+            if key in frames:
+                frames[key][1].append(future)
+            else:
+                frames[key] = (data, [future])
+
+        for data, futures in frames.values():
+            try:
+                self.api.websocket.send(data)
+            except Exception as e:  # pylint: disable=broad-except
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            logger.debug(data)
+            for future in futures:
+                future.set_result(None)
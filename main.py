@@ -11,8 +11,15 @@ PARAMS = {
     "PAR": "ETHUSD",
     "TIMEFRAME": 300,   # em segundos (M5 = 300, M1 = 60, M15 = 900)
     "DIAS": 30,         # dias de histórico para coletar
+    "FORMATO": "parquet",  # armazenamento das etapas: "parquet" (colunar, tipado) ou "csv"
+    "INCREMENTAL": True,   # extrai e transforma só os candles que faltam nos arquivos existentes
     "SEQ_LEN": 288,     # tamanho da sequência (lookback)
     "TEST_SIZE": 0.15,  # % para teste
+    "MODO_DADOS": "materializado",  # "materializado" (X completo em .npy) ou "janelas" (janelas sob demanda)
+    "NORMALIZACAO": "janela",  # "janela" (min-max/z-score por janela) ou "global" (estatísticas do treino, x_scaler)
+    "MMAP": False,      # abre os dados preparados com memory-map no treino
+    "CACHE_MAX_GB": 5,  # tamanho máximo dos artefatos em cache (transformados/preparados)
+    "CACHE_MAX_DIAS": 30,  # artefatos sem uso há mais tempo que isso são removidos
     "MODELO": {
         "unidades_lstm_camada1": 128,
         "unidades_lstm_camada2": 64,
@@ -34,8 +41,17 @@ sys.path.append("/content/indicador-preditivo")
 
 from scripts.extrair_dados import extrair_dados
 from scripts.transformar_dados import transformar_dados
-from scripts.preparar_dados_LSTM import preparar_dados
+from scripts.preparar_dados_LSTM import preparar_dados, definir_features
 from scripts.treinar_modelo_LSTM import treinar_modelo
+from scripts.exportar_modelo import exportar_modelo
+from scripts.armazenamento import colunas_tabela
+from scripts.cache_artefatos import CacheArtefatos
+
+# Módulos auxiliares que também entram na chave do cache (leitura/escrita das tabelas e
+# consumo dos dados preparados): mudou o código, os artefatos são recalculados
+CODIGO_ARMAZENAMENTO = colunas_tabela.__code__.co_filename
+CODIGO_DATASET = os.path.join(os.path.dirname(CODIGO_ARMAZENAMENTO), "dataset_LSTM.py")
+CODIGO_NORMALIZACAO = os.path.join(os.path.dirname(CODIGO_ARMAZENAMENTO), "normalizacao_LSTM.py")
 
 # ------------------------
 # EXECUÇÃO DO PIPELINE
@@ -43,42 +59,93 @@ from scripts.treinar_modelo_LSTM import treinar_modelo
 def main():
     print("\n=== Indicador Preditivo - Pipeline Completo ===")
 
+    # Cache das etapas: mesma entrada + mesmos parâmetros = reaproveita os artefatos
+    cache = CacheArtefatos(
+        PARAMS["ROOT"],
+        max_bytes=int(PARAMS["CACHE_MAX_GB"] * 1024 ** 3),
+        max_idade_dias=PARAMS["CACHE_MAX_DIAS"]
+    )
+
     # Etapa 1: Extração de dados
-    raw_path = extrair_dados(
+    _, raw_path = extrair_dados(
         par=PARAMS["PAR"],
         timeframe=PARAMS["TIMEFRAME"],
         dias=PARAMS["DIAS"],
-        root=PARAMS["ROOT"]
+        root=PARAMS["ROOT"],
+        formato=PARAMS["FORMATO"],
+        incremental=PARAMS["INCREMENTAL"]
     )
     print(f"[OK] Dados brutos salvos em: {raw_path}")
 
     # Etapa 2: Transformação e features
-    transformed_path = transformar_dados(
-        raw_path=raw_path,
-        par=PARAMS["PAR"],
-        timeframe=PARAMS["TIMEFRAME"],
-        dias=PARAMS["DIAS"],
-        root=PARAMS["ROOT"]
-    )
+    def transformar():
+        return transformar_dados(
+            raw_path=raw_path,
+            par=PARAMS["PAR"],
+            timeframe=PARAMS["TIMEFRAME"],
+            dias=PARAMS["DIAS"],
+            root=PARAMS["ROOT"],
+            formato=PARAMS["FORMATO"],
+            incremental=PARAMS["INCREMENTAL"]
+        )
+
+    if PARAMS["INCREMENTAL"]:
+        # Arquivo de nome fixo atualizado no lugar: fica fora do cache
+        transformed_path = transformar()
+    else:
+        transformed_path = cache.executar(
+            "transformar", transformar,
+            entradas=[raw_path],
+            parametros={"formato": PARAMS["FORMATO"]},
+            arquivos=lambda caminho: [caminho],
+            codigo=[transformar_dados.__code__.co_filename, CODIGO_ARMAZENAMENTO]
+        )
     print(f"[OK] Dados transformados salvos em: {transformed_path}")
 
     # Etapa 3: Preparação (sequências LSTM)
-    prepared_paths = preparar_dados(
-        transformed_path=transformed_path,
-        seq_len=PARAMS["SEQ_LEN"],
-        test_size=PARAMS["TEST_SIZE"],
-        root=PARAMS["ROOT"]
+    prepared_dir = os.path.join(PARAMS["ROOT"], "data", "prepared")
+    prepared_paths = cache.executar(
+        "preparar",
+        lambda: preparar_dados(
+            transformed_path=transformed_path,
+            seq_len=PARAMS["SEQ_LEN"],
+            test_size=PARAMS["TEST_SIZE"],
+            root=PARAMS["ROOT"],
+            modo=PARAMS["MODO_DADOS"],
+            normalizacao=PARAMS["NORMALIZACAO"]
+        ),
+        entradas=[transformed_path],
+        parametros={
+            "seq_len": PARAMS["SEQ_LEN"],
+            "test_size": PARAMS["TEST_SIZE"],
+            "modo": PARAMS["MODO_DADOS"],
+            "normalizacao": PARAMS["NORMALIZACAO"],
+            "features": definir_features(colunas_tabela(transformed_path)),
+        },
+        arquivos=lambda r: [os.path.join(prepared_dir, v) for k, v in r.items() if k != "versao" and isinstance(v, str)],
+        codigo=[preparar_dados.__code__.co_filename, CODIGO_ARMAZENAMENTO, CODIGO_DATASET,
+                CODIGO_NORMALIZACAO],
+        serializar=lambda r: {k: v for k, v in r.items() if isinstance(v, str)}
     )
     print(f"[OK] Dados preparados salvos em: {prepared_paths}")
 
     # Etapa 4: Treinamento do modelo
     modelo, historico = treinar_modelo(
-        prepared_dir=os.path.join(PARAMS["ROOT"], "data", "prepared"),
+        prepared_dir=prepared_dir,
         models_dir=os.path.join(PARAMS["ROOT"], "models"),
-        parametros=PARAMS["MODELO"]
+        parametros=PARAMS["MODELO"],
+        mmap=PARAMS["MMAP"],
+        versao_dados=prepared_paths["versao"]
     )
     print("[OK] Treinamento concluído.")
 
+    # Etapa 5: Exportação dos pesos para o runtime NumPy do preditor (sem TensorFlow)
+    models_dir = os.path.join(PARAMS["ROOT"], "models")
+    exportar_modelo(
+        modelo_path=os.path.join(models_dir, f"modelo_LSTM_seq{PARAMS['SEQ_LEN']}_{prepared_paths['versao']}.h5"),
+        models_dir=models_dir
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,261 @@
+#@title Indicadores em tempo real (atualização O(1) por candle) ✅
+
+"""
+Script: indicadores.py
+
+Descrição:
+-----------
+Motor de indicadores online para o preditor em tempo real. A cada candle fechado
+recebe (abertura, máxima, mínima, fechamento, volume, from) e devolve o mesmo vetor
+de features gerado em lote por `transformar_dados` (exceto `fechamento_futuro`,
+que é o target), com custo constante por candle:
+
+- SMA, médias de volume e médias do RSI: buffer circular + soma corrente
+  (a soma é recalculada a partir do buffer a cada RESSINCRONIZAR candles para
+  não acumular erro de arredondamento);
+- EMA: mesma recorrência do `ewm(adjust=False)` do pandas;
+- suporte/resistência: deques monotônicos (máximo/mínimo da janela);
+- volatilidade: média e soma dos quadrados dos desvios (Welford) na janela deslizante.
+
+Os candles chegam pelo stream `candle-generated` do WebSocket (ver `AlimentadorCandles`),
+que envia várias atualizações do candle em aberto; o candle é considerado fechado
+quando chega a primeira mensagem com um `from` novo.
+"""
+
+import math
+from collections import deque
+
+import pandas as pd
+
+from scripts.transformar_dados import (PERIODOS_MEDIAS, JANELA_SR, JANELA_RSI, JANELAS_VOLUME,
+                                       JANELA_VOLATILIDADE)
+
+RESSINCRONIZAR = 1000  # candles entre recálculos completos das somas correntes
+
+# Ordem das colunas de features (igual à do arquivo transformado, sem o target)
+COLUNAS = (
+    ["abertura", "maxima", "minima", "fechamento", "volume", "pressao_compradora", "pressao_vendedora"]
+    + [c for p in PERIODOS_MEDIAS for c in (f"SMA_{p}", f"EMA_{p}")]
+    + ["resistencia", "suporte", "dist_resistencia", "dist_suporte", "var_fechamento", "RSI_14"]
+    + [f"vol_media_{p}" for p in JANELAS_VOLUME]
+    + ["hora_num", "minuto", "dia_semana", "retorno", "volatilidade"]
+)
+
+
+class MediaMovel:
+    """Média móvel com min_periods=1 (valores NaN não entram na janela)."""
+
+    def __init__(self, p):
+        self.p = p
+        self.janela = deque()
+        self.soma = 0.0
+        self.cont = 0
+        self.atualizacoes = 0
+
+    def atualizar(self, x):
+        self.janela.append(x)
+        if not math.isnan(x):
+            self.soma += x
+            self.cont += 1
+        if len(self.janela) > self.p:
+            velho = self.janela.popleft()
+            if not math.isnan(velho):
+                self.soma -= velho
+                self.cont -= 1
+
+        self.atualizacoes += 1
+        if self.atualizacoes % RESSINCRONIZAR == 0:
+            self.soma = math.fsum(v for v in self.janela if not math.isnan(v))
+
+        return self.soma / self.cont if self.cont else math.nan
+
+
+class ExtremoMovel:
+    """Máximo (ou mínimo) da janela com deque monotônico: O(1) amortizado."""
+
+    def __init__(self, p, maior=True):
+        self.p = p
+        self.maior = maior
+        self.domina = (lambda a, b: a >= b) if maior else (lambda a, b: a <= b)
+        self.deque = deque()  # (índice, valor), valores monotônicos
+        self.i = 0
+
+    def atualizar(self, x):
+        while self.deque and self.domina(x, self.deque[-1][1]):
+            self.deque.pop()
+        self.deque.append((self.i, x))
+        if self.deque[0][0] <= self.i - self.p:
+            self.deque.popleft()
+        self.i += 1
+        return self.deque[0][1]
+
+
+class DesvioMovel:
+    """Desvio padrão amostral (ddof=1) da janela, com atualização de Welford para entrada/saída."""
+
+    def __init__(self, p):
+        self.p = p
+        self.janela = deque()
+        self.media = 0.0
+        self.m2 = 0.0
+        self.atualizacoes = 0
+
+    def atualizar(self, x):
+        self.janela.append(x)
+        n = len(self.janela)
+        d = x - self.media
+        self.media += d / n
+        self.m2 += d * (x - self.media)
+
+        if n > self.p:
+            velho = self.janela.popleft()
+            n -= 1
+            d = velho - self.media
+            self.media -= d / n
+            self.m2 -= d * (velho - self.media)
+
+        self.atualizacoes += 1
+        if self.atualizacoes % RESSINCRONIZAR == 0:
+            self.media = math.fsum(self.janela) / n
+            self.m2 = math.fsum((v - self.media) ** 2 for v in self.janela)
+
+        return math.sqrt(max(self.m2, 0.0) / (n - 1)) if n > 1 else math.nan
+
+
+class EMA:
+    """EMA com a mesma recorrência do pandas `ewm(span=p, adjust=False).mean()`."""
+
+    def __init__(self, p):
+        alpha = 1.0 / (1.0 + (p - 1) / 2.0)
+        self.fator_antigo = 1.0 - alpha
+        self.peso_novo = alpha
+        self.valor = None
+
+    def atualizar(self, x):
+        if self.valor is None:
+            self.valor = x
+        elif self.valor != x:
+            self.valor = (self.fator_antigo * self.valor + self.peso_novo * x) / (self.fator_antigo + self.peso_novo)
+        return self.valor
+
+
+class IndicadoresOnline:
+    """
+    Mantém o estado de todos os indicadores e devolve as features de cada candle fechado.
+
+    Uso:
+        motor = IndicadoresOnline()
+        motor.aquecer(df_bruto)            # opcional: histórico para preencher as janelas
+        features = motor.atualizar(candle)  # dict {coluna: valor} na ordem de COLUNAS
+    """
+
+    def __init__(self):
+        self.sma = {p: MediaMovel(p) for p in PERIODOS_MEDIAS}
+        self.ema = {p: EMA(p) for p in PERIODOS_MEDIAS}
+        self.resistencia = ExtremoMovel(JANELA_SR, maior=True)
+        self.suporte = ExtremoMovel(JANELA_SR, maior=False)
+        self.up = MediaMovel(JANELA_RSI)
+        self.down = MediaMovel(JANELA_RSI)
+        self.vol_media = {p: MediaMovel(p) for p in JANELAS_VOLUME}
+        self.volatilidade = DesvioMovel(JANELA_VOLATILIDADE)
+        self.fechamento_anterior = math.nan
+        self.ultimo_from = None
+
+    def atualizar(self, candle):
+        """
+        Processa um candle fechado.
+
+        Args:
+            candle (dict): abertura, maxima, minima, fechamento, volume e from
+                (segundos epoch ou datetime; os nomes da API open/max/min/close também são aceitos).
+
+        Returns:
+            dict: Features do candle, na ordem de COLUNAS.
+        """
+        abertura = float(candle.get("abertura", candle.get("open")))
+        maxima = float(candle.get("maxima", candle.get("max")))
+        minima = float(candle.get("minima", candle.get("min")))
+        fechamento = float(candle.get("fechamento", candle.get("close")))
+        volume = candle["volume"]
+        momento = candle.get("from", candle.get("timestamp"))
+        momento = pd.Timestamp(momento, unit="s", tz="UTC") if isinstance(momento, (int, float)) else pd.Timestamp(momento)
+
+        f = {"abertura": abertura, "maxima": maxima, "minima": minima, "fechamento": fechamento, "volume": volume}
+        f["pressao_compradora"] = maxima - fechamento
+        f["pressao_vendedora"] = fechamento - minima
+
+        for p in PERIODOS_MEDIAS:
+            f[f"SMA_{p}"] = self.sma[p].atualizar(fechamento)
+            f[f"EMA_{p}"] = self.ema[p].atualizar(fechamento)
+
+        f["resistencia"] = self.resistencia.atualizar(maxima)
+        f["suporte"] = self.suporte.atualizar(minima)
+        f["dist_resistencia"] = f["resistencia"] - fechamento
+        f["dist_suporte"] = fechamento - f["suporte"]
+
+        delta = fechamento - self.fechamento_anterior
+        f["var_fechamento"] = delta
+        up = self.up.atualizar(max(delta, 0.0) if not math.isnan(delta) else math.nan)
+        down = self.down.atualizar(-1 * min(delta, 0.0) if not math.isnan(delta) else math.nan)
+        if math.isnan(up) or math.isnan(down) or (up == 0 and down == 0):
+            f["RSI_14"] = math.nan
+        elif down == 0:
+            f["RSI_14"] = 100.0
+        else:
+            f["RSI_14"] = 100 - (100 / (1 + up / down))
+
+        for p in JANELAS_VOLUME:
+            f[f"vol_media_{p}"] = self.vol_media[p].atualizar(float(volume))
+
+        f["hora_num"] = momento.hour
+        f["minuto"] = momento.minute
+        f["dia_semana"] = momento.dayofweek
+        retorno = fechamento / self.fechamento_anterior - 1
+        f["retorno"] = 0.0 if math.isnan(retorno) else retorno
+        desvio = self.volatilidade.atualizar(f["retorno"])
+        f["volatilidade"] = 0.0 if math.isnan(desvio) else desvio
+
+        self.fechamento_anterior = fechamento
+        self.ultimo_from = momento
+        return {c: f[c] for c in COLUNAS}
+
+    def aquecer(self, df):
+        """Passa um histórico (DataFrame bruto ou transformado) pelos indicadores e devolve as features da última linha."""
+        tempo = "timestamp" if "timestamp" in df.columns else "from"
+        features = None
+        for linha in df.to_dict("records"):
+            linha["from"] = linha[tempo]
+            features = self.atualizar(linha)
+        return features
+
+
+class AlimentadorCandles:
+    """
+    Recebe as mensagens `candle-generated` (candle em aberto, várias por candle) e repassa
+    ao motor apenas os candles fechados, um por `from`.
+
+    Args:
+        motor (IndicadoresOnline): Motor de indicadores a alimentar.
+        ativo (str): Ativo acompanhado (ex.: "ETHUSD"); mensagens de outros ativos são ignoradas.
+        tamanho (int): Timeframe em segundos; mensagens de outros tamanhos são ignoradas.
+        ao_fechar (callable): Opcional, chamado com (candle, features) a cada candle fechado.
+    """
+
+    def __init__(self, motor, ativo, tamanho, ao_fechar=None):
+        self.motor = motor
+        self.ativo = ativo
+        self.tamanho = tamanho
+        self.ao_fechar = ao_fechar
+        self.aberto = None
+
+    def __call__(self, ativo, msg):
+        if ativo != self.ativo or int(msg["size"]) != self.tamanho:
+            return
+        if self.aberto is not None and msg["from"] != self.aberto["from"]:
+            if msg["from"] < self.aberto["from"]:
+                return  # mensagem atrasada de um candle já fechado
+            fechado = self.aberto
+            features = self.motor.atualizar(fechado)
+            if self.ao_fechar is not None:
+                self.ao_fechar(fechado, features)
+        self.aberto = dict(msg)
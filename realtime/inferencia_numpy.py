@@ -0,0 +1,136 @@
+#@title Inferência do LSTM em NumPy (sem TensorFlow) ✅
+
+"""
+Script: inferencia_numpy.py
+
+Descrição:
+-----------
+Reproduz em NumPy o forward pass do modelo treinado em `treinar_modelo`
+(LSTM -> LSTM -> Dense relu -> Dense), a partir dos pesos exportados por
+`scripts/exportar_modelo.py` (`modelo_LSTM_seq*_{versao}.npz`).
+
+O processo do preditor não precisa importar o TensorFlow: carrega em milissegundos
+e ocupa só a memória dos pesos. As equações são as da camada LSTM do Keras, com os
+blocos de gates na ordem i, f, c, o:
+
+    z = x_t @ kernel + h_{t-1} @ recurrent_kernel + bias
+    i, f, o = sigmoid(z_i), sigmoid(z_f), sigmoid(z_o)
+    c_t = f * c_{t-1} + i * tanh(z_c)
+    h_t = o * tanh(c_t)
+
+A projeção da entrada (x @ kernel) é feita para todos os passos de uma vez; só a
+parte recorrente fica no laço sobre o tempo. Dropout não atua na inferência.
+
+`executar(x, estados)` também aceita e devolve os estados (h, c) de cada LSTM, o que
+permite avançar o modelo um passo por candle (x com T=1) em vez de rodar a janela inteira.
+"""
+
+import json
+
+import numpy as np
+
+
+ATIVACOES = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0, 1),
+}
+
+
+class CamadaLSTM:
+    """Camada LSTM do Keras (pesos kernel, recurrent_kernel e bias, gates i, f, c, o)."""
+
+    def __init__(self, kernel, recorrente, bias, ativacao="tanh", ativacao_recorrente="sigmoid",
+                 retorna_sequencia=False):
+        self.kernel = kernel
+        self.recorrente = recorrente
+        self.bias = bias
+        self.unidades = recorrente.shape[0]
+        self.ativacao = ATIVACOES[ativacao]
+        self.ativacao_recorrente = ATIVACOES[ativacao_recorrente]
+        self.retorna_sequencia = retorna_sequencia
+
+    # Um passo da recorrência: z já contém x_t @ kernel + bias
+    def passo(self, z, h, c):
+        u = self.unidades
+        z = z + h @ self.recorrente
+        i = self.ativacao_recorrente(z[:, :u])
+        f = self.ativacao_recorrente(z[:, u:2 * u])
+        g = self.ativacao(z[:, 2 * u:3 * u])
+        o = self.ativacao_recorrente(z[:, 3 * u:])
+        c = f * c + i * g
+        h = o * self.ativacao(c)
+        return h, c
+
+    # Sequência completa a partir do estado (h, c) informado (None = zeros); devolve a saída e o estado final
+    def executar(self, x, estado=None):
+        lote, passos, _ = x.shape
+        z = x @ self.kernel + self.bias  # (B, T, 4U) de uma vez
+        if estado is None:
+            h = np.zeros((lote, self.unidades), dtype=x.dtype)
+            c = np.zeros((lote, self.unidades), dtype=x.dtype)
+        else:
+            h, c = estado
+        saidas = np.empty((lote, passos, self.unidades), dtype=x.dtype) if self.retorna_sequencia else None
+        for t in range(passos):
+            h, c = self.passo(z[:, t], h, c)
+            if saidas is not None:
+                saidas[:, t] = h
+        return (saidas if saidas is not None else h), (h, c)
+
+    def __call__(self, x):
+        return self.executar(x)[0]
+
+
+class CamadaDensa:
+    """Camada Dense do Keras."""
+
+    def __init__(self, kernel, bias, ativacao="linear"):
+        self.kernel = kernel
+        self.bias = bias
+        self.ativacao = ATIVACOES[ativacao]
+
+    def __call__(self, x):
+        return self.ativacao(x @ self.kernel + self.bias)
+
+
+class ModeloNumpy:
+    """
+    Modelo sequencial carregado do .npz exportado.
+
+    Uso:
+        modelo = ModeloNumpy("models/modelo_LSTM_seq288_20250101_000000.npz")
+        y = modelo(X)  # X (B, SEQ_LEN, F) float32 -> y (B, 1)
+    """
+
+    def __init__(self, caminho):
+        with np.load(caminho) as pesos:
+            arquitetura = json.loads(str(pesos["arquitetura"]))
+            self.camadas = []
+            for k, camada in enumerate(arquitetura):
+                w = [pesos[f"camada{k}_{nome}"].astype(np.float32) for nome in camada["pesos"]]
+                if camada["tipo"] == "LSTM":
+                    self.camadas.append(CamadaLSTM(*w, ativacao=camada["ativacao"],
+                                                   ativacao_recorrente=camada["ativacao_recorrente"],
+                                                   retorna_sequencia=camada["retorna_sequencia"]))
+                elif camada["tipo"] == "Dense":
+                    self.camadas.append(CamadaDensa(*w, ativacao=camada["ativacao"]))
+                else:
+                    raise ValueError(f"Camada não suportada no runtime NumPy: {camada['tipo']}")
+
+    def executar(self, x, estados=None):
+        """Forward a partir dos estados [(h, c), ...] de cada LSTM (None = zeros); devolve (y, estados finais)."""
+        x = np.asarray(x, dtype=np.float32)
+        novos = []
+        for camada in self.camadas:
+            if isinstance(camada, CamadaLSTM):
+                x, estado = camada.executar(x, estados[len(novos)] if estados is not None else None)
+                novos.append(estado)
+            else:
+                x = camada(x)
+        return x, novos
+
+    def __call__(self, x):
+        return self.executar(x)[0]
@@ -0,0 +1,557 @@
+#@title Preditor em tempo real (LSTM sobre o stream de candles) ✅
+
+"""
+Script: predictor.py
+
+Descrição:
+-----------
+Serviço de longa duração que usa o modelo `modelo_LSTM_seq*.h5` treinado offline
+para prever o fechamento futuro a cada candle fechado, em tempo real.
+
+Fluxo de execução:
+-------------------
+1. Localiza o modelo mais recente em /models e o `y_scaler_{versao}.npz` dos dados
+   preparados com que ele foi treinado (a versão vem do nome do modelo). Se existir o
+   `.npz` exportado por `exportar_modelo`, a inferência roda em NumPy
+   (`inferencia_numpy.py`) e o TensorFlow nem é importado.
+2. Para cada ativo, aquece o motor de indicadores (`IndicadoresOnline`) com o histórico
+   recente (SEQ_LEN + AQUECIMENTO candles fechados, buscados em páginas de até 1000) e
+   preenche a janela de features.
+3. Assina o stream `candle-generated` (`start_candles_stream_v2`); o `AlimentadorCandles`
+   detecta o fechamento de cada candle e atualiza os indicadores em O(1).
+4. A linha de features entra num buffer circular (SEQ_LEN x F) com escrita dupla, de modo
+   que a janela atual é sempre uma fatia contígua, sem cópia.
+5. A janela é normalizada exatamente como em `preparar_dados` (min-max / z-score por janela,
+   escalas fixas de hora/minuto/dia), o modelo é chamado e a saída é desescalonada.
+   Se o modelo foi treinado com `normalizacao="global"` (existe `x_scaler_{versao}.npz`),
+   cada linha nova já entra normalizada na janela e nada mais é recalculado.
+6. A previsão é publicada (callback `ao_prever` ou log) com a latência medida desde a
+   detecção do fechamento e o atraso desde o fechamento nominal do candle (horário do servidor).
+
+Com vários ativos, os candles fecham todos no mesmo segundo: as janelas que chegam dentro
+de ESPERA_MAX_MS são agrupadas (`MicroLote`) num único lote (B, SEQ_LEN, F) e o modelo roda
+uma só vez, em vez de pagar o custo fixo da chamada por ativo. O lote sai antes do prazo
+quando já tem uma janela por ativo acompanhado.
+
+Modo com estado (`ressincronizar=N`, requer o runtime NumPy): em vez de rodar as SEQ_LEN
+etapas do LSTM a cada candle, o estado (h, c) de cada camada é levado adiante e o modelo
+avança um só passo com a linha nova (normalizada com as estatísticas da janela atual).
+Como a normalização por janela muda as linhas antigas a cada candle, o estado acumulado
+se afasta do resultado da janela completa; a cada N passos a janela inteira é recalculada
+a partir do estado zero, limitando esse desvio. Com a normalização global as linhas antigas
+não mudam e o único desvio é o início da janela (o estado carrega mais que SEQ_LEN candles).
+
+Se o stream pular candles (reconexão, atraso), o ativo é reaquecido com o histórico
+da API antes de voltar a prever, para que a janela nunca tenha buracos.
+
+Parâmetros configuráveis:
+--------------------------
+ATIVOS      -> Ativos acompanhados (ex: ["ETHUSD"]).
+TIMEFRAME   -> Timeframe em segundos (mesmo do treino).
+AQUECIMENTO -> Candles extras antes da primeira janela (várias vezes o maior período das médias).
+ESPERA_MAX_MS -> Espera máxima para completar um lote de inferência (None = sem micro-lotes).
+TAMANHO_MAX_LOTE -> Janelas por chamada do modelo.
+RESSINCRONIZAR_ESTADO -> Passos com estado entre recálculos da janela completa (modo com estado).
+ROOT        -> Diretório raiz do projeto.
+
+Saídas:
+--------
+- Dicionário por previsão: ativo, from, fechamento, previsao, latencia_ms, atraso_ms.
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+import iqoptionaapi.constants as OP_code
+from realtime.indicadores import COLUNAS, IndicadoresOnline, AlimentadorCandles
+from realtime.inferencia_numpy import ModeloNumpy
+from scripts.transformar_dados import PERIODOS_MEDIAS
+from scripts.normalizacao_LSTM import (definir_features, indices_features, normalizar_janelas,
+                                       aplicar_escala_global)
+
+# Parâmetros padrão
+ATIVOS = ["ETHUSD"]
+TIMEFRAME = 300
+# A EMA carrega todo o histórico: com 5x o span o peso do valor inicial cai para ~e^-10,
+# e as médias ficam iguais às calculadas sobre o arquivo completo em transformar_dados
+AQUECIMENTO = 5 * max(PERIODOS_MEDIAS)
+MAX_POR_CHAMADA = 1000  # limite de candles por get_candles
+ROOT = "/content/indicador-preditivo"
+HISTORICO_LATENCIAS = 1000  # latências guardadas por ativo para as estatísticas
+ESPERA_MAX_MS = 5  # prazo para juntar as janelas que fecham no mesmo instante
+TAMANHO_MAX_LOTE = 64
+RESSINCRONIZAR_ESTADO = 12  # 1 hora em M5
+
+# Escalas fixas aplicadas em preparar_dados antes das janelas
+ESCALAS_FIXAS = {"hora_num": 23.0, "minuto": 59.0, "dia_semana": 6.0}
+
+
+# Busca os últimos `total` candles em páginas de até MAX_POR_CHAMADA, em ordem cronológica e sem repetições
+def buscar_historico(iq, ativo, tamanho, total, agora):
+    paginas = []
+    fim = agora
+    while total > 0:
+        qtd = min(MAX_POR_CHAMADA, total)
+        candles = iq.get_candles(ativo, tamanho, qtd, fim)
+        if not candles:
+            print(f"[AVISO] {ativo}: histórico da API terminou antes do aquecimento completo.")
+            break
+        paginas.append(candles)
+        fim = candles[0]["from"] - 1  # retrocede para evitar sobreposição
+        total -= qtd
+
+    vistos = {}
+    for candles in reversed(paginas):
+        for candle in candles:
+            vistos[candle["from"]] = candle
+    return [vistos[k] for k in sorted(vistos)]
+
+
+# Localiza o modelo mais recente (ou o informado, .h5 ou .npz exportado) e extrai SEQ_LEN e versão dos dados do nome
+def localizar_modelo(models_dir, modelo_path=None):
+    if modelo_path is None:
+        modelos = sorted(glob.glob(os.path.join(models_dir, "modelo_LSTM_seq*_*.h5")) +
+                         glob.glob(os.path.join(models_dir, "modelo_LSTM_seq*_*.npz")), key=os.path.getmtime)
+        if not modelos:
+            raise FileNotFoundError(f"Nenhum modelo_LSTM_seq*.h5 encontrado em {models_dir}. Execute treinar_modelo primeiro.")
+        modelo_path = modelos[-1]
+
+    nome = re.match(r"modelo_LSTM_seq(\d+)_(.+)\.(h5|npz)$", os.path.basename(modelo_path))
+    if nome is None:
+        raise ValueError(f"Nome de modelo fora do padrão modelo_LSTM_seq{{SEQ_LEN}}_{{versao}}.h5: {modelo_path}")
+    return modelo_path, int(nome.group(1)), nome.group(2)
+
+
+# Caminho de um escalonador salvo (ao lado do modelo ou nos dados preparados); None se não existir
+def localizar_scaler(nome, diretorios):
+    for diretorio in diretorios:
+        caminho = os.path.join(diretorio, nome)
+        if os.path.exists(caminho):
+            return caminho
+    return None
+
+
+# Lê o escalonador do target salvo por preparar_dados (mean/scale)
+def carregar_y_scaler(diretorios, versao):
+    caminho = localizar_scaler(f"y_scaler_{versao}.npz", diretorios)
+    if caminho is None:
+        raise FileNotFoundError(f"Scaler do target y_scaler_{versao}.npz não encontrado em {diretorios}")
+    s = np.load(caminho)
+    return float(s["mean"].ravel()[0]), float(s["scale"].ravel()[0])
+
+
+# Lê as estatísticas da normalização global (x_scaler); None se o modelo usa normalização por janela
+def carregar_x_scaler(diretorios, versao):
+    caminho = localizar_scaler(f"x_scaler_{versao}.npz", diretorios)
+    if caminho is None:
+        return None
+    with np.load(caminho) as s:
+        x_scaler = {k: s[k] for k in ("min", "max", "media", "desvio")}
+        x_scaler["features"] = s["features"].tolist()
+        x_scaler["idx_norm"] = s["idx_norm"].tolist()
+        x_scaler["idx_std"] = s["idx_std"].tolist()
+    return x_scaler
+
+
+# Ordem das features do treino: metadados do modo janelas, se existirem, ou a mesma regra de preparar_dados
+def carregar_features(prepared_dir, versao):
+    caminho = os.path.join(prepared_dir, f"janelas_{versao}.json")
+    if os.path.exists(caminho):
+        with open(caminho) as f:
+            meta = json.load(f)
+        return meta["features"], meta["idx_norm"], meta["idx_std"]
+
+    features_norm, features_std, features_keep, features_fixed = definir_features(COLUNAS)
+    features = features_norm + features_std + features_keep + features_fixed
+    idx_norm, idx_std = indices_features(features, features_norm, features_std)
+    return features, idx_norm, idx_std
+
+
+class JanelaFeatures:
+    """
+    Buffer circular das últimas SEQ_LEN linhas de features (float32).
+
+    Cada linha é escrita duas vezes (i e i + seq_len), então a janela mais recente
+    é sempre a fatia contígua [pos + 1, pos + 1 + seq_len) e `janela()` não copia dados.
+    """
+
+    def __init__(self, seq_len, n_features):
+        self.seq_len = seq_len
+        self.dados = np.zeros((2 * seq_len, n_features), dtype=np.float32)
+        self.pos = -1
+        self.cont = 0
+
+    def adicionar(self, linha):
+        self.pos = (self.pos + 1) % self.seq_len
+        self.dados[self.pos] = linha
+        self.dados[self.pos + self.seq_len] = linha
+        self.cont = min(self.cont + 1, self.seq_len)
+
+    def cheia(self):
+        return self.cont == self.seq_len
+
+    def janela(self):
+        ini = self.pos + 1
+        return self.dados[ini:ini + self.seq_len]
+
+
+class EstadoAtivo:
+    """Motor de indicadores, janela de features e alimentador de um ativo."""
+
+    def __init__(self, motor, janela, alimentador):
+        self.motor = motor
+        self.janela = janela
+        self.alimentador = alimentador
+        self.ultimo_from = None  # `from` do último candle fechado já processado
+        self.t_fechamento = None  # perf_counter da mensagem que fechou o candle
+        self.estado_lstm = None  # [(h, c), ...] por camada LSTM após o último candle (modo com estado)
+        self.passos = 0  # passos com estado desde a última janela completa
+        self.geracao = 0  # incrementada a cada reaquecimento: descarta estados de pedidos anteriores
+        self.latencias = deque(maxlen=HISTORICO_LATENCIAS)
+
+
+class MicroLote:
+    """
+    Agrupa os pedidos de inferência submetidos por vários ativos numa só chamada do modelo.
+
+    O primeiro item abre o lote; ele é executado quando atinge `tamanho_max` pedidos ou
+    quando passam `espera_max_ms` desde o primeiro item. `inferir_lote(pedidos)` devolve
+    uma saída por pedido, que volta a cada ativo pelo callback `ao_concluir(y)`, na thread do lote.
+    """
+
+    def __init__(self, inferir_lote, espera_max_ms=ESPERA_MAX_MS, tamanho_max=TAMANHO_MAX_LOTE):
+        self.inferir_lote = inferir_lote
+        self.espera_max = espera_max_ms / 1000.0
+        self.tamanho_max = max(1, int(tamanho_max))
+        self.fila = queue.Queue()
+        self.thread = None
+        self.lotes = 0
+        self.janelas = 0
+
+    def iniciar(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.executar, name="preditor-lote", daemon=True)
+            self.thread.start()
+
+    def parar(self):
+        if self.thread is not None:
+            self.fila.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def submeter(self, pedido, ao_concluir):
+        self.fila.put((pedido, ao_concluir))
+
+    # Coleta um lote (até o prazo ou tamanho máximo), roda o modelo uma vez e distribui os resultados
+    def executar(self):
+        rodando = True
+        while rodando:
+            item = self.fila.get()
+            if item is None:
+                return
+            lote = [item]
+            prazo = time.perf_counter() + self.espera_max
+            while len(lote) < self.tamanho_max:
+                try:
+                    item = self.fila.get(timeout=max(prazo - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    rodando = False  # roda o lote em andamento e encerra
+                    break
+                lote.append(item)
+
+            try:
+                y = self.inferir_lote([pedido for pedido, _ in lote])
+            except Exception as e:
+                print(f"[ERRO] Inferência do lote falhou: {e}")
+                continue
+            self.lotes += 1
+            self.janelas += len(lote)
+            for (_, ao_concluir), yi in zip(lote, y):
+                try:
+                    ao_concluir(float(yi))
+                except Exception as e:
+                    print(f"[ERRO] Publicação da previsão falhou: {e}")
+
+
+class Preditor:
+    """
+    Mantém a janela de features de cada ativo a partir do stream de candles e roda o
+    modelo LSTM a cada candle fechado.
+
+    Uso:
+        preditor = Preditor(iq, ["ETHUSD"], 300)
+        preditor.iniciar()             # aquece e assina o stream
+        ...
+        preditor.estatisticas()        # latências por ativo
+        preditor.parar()
+
+    Args:
+        iq (IQ_Option): Sessão conectada.
+        ativos (list): Ativos acompanhados.
+        tamanho (int): Timeframe em segundos (mesmo do treino).
+        root (str): Diretório raiz do projeto (models/ e data/prepared/).
+        modelo_path (str): Modelo a usar; None usa o mais recente.
+        ao_prever (callable): Chamado com o dict de cada previsão; None imprime no log.
+        espera_max_ms (float): Prazo do micro-lote entre ativos; None roda o modelo por ativo.
+        ressincronizar (int): Modo com estado: passos entre recálculos da janela completa;
+            None roda a janela completa a cada candle.
+    """
+
+    def __init__(self, iq, ativos=ATIVOS, tamanho=TIMEFRAME, root=ROOT, modelo_path=None, ao_prever=None,
+                 espera_max_ms=ESPERA_MAX_MS, ressincronizar=None):
+        self.iq = iq
+        self.ativos = list(ativos)
+        self.tamanho = int(tamanho)
+        self.root = root
+        self.ao_prever = ao_prever or self.publicar
+        self.estados = {}
+        self.carregar_modelo(modelo_path)
+        self.ressincronizar = ressincronizar
+        if ressincronizar is not None and not isinstance(self.inferir, ModeloNumpy):
+            print("[AVISO] Modo com estado requer o modelo exportado (.npz); usando a janela completa.")
+            self.ressincronizar = None
+        self.execucoes = {"janelas": 0, "passos": 0}
+        self.trava_estado = threading.Lock()  # estado_lstm/geracao: thread do stream x thread do lote
+        self.lote = None
+        if espera_max_ms is not None:
+            # Lote fecha antes do prazo quando já tem um pedido de cada ativo
+            self.lote = MicroLote(self.inferir_lote, espera_max_ms, min(TAMANHO_MAX_LOTE, len(self.ativos)))
+
+    # Carrega modelo, scaler do target e a ordem/normalização das features
+    def carregar_modelo(self, modelo_path=None):
+        prepared_dir = os.path.join(self.root, "data", "prepared")
+        self.modelo_path, self.seq_len, self.versao = localizar_modelo(os.path.join(self.root, "models"), modelo_path)
+        diretorios = [os.path.dirname(self.modelo_path), prepared_dir]
+        self.y_media, self.y_escala = carregar_y_scaler(diretorios, self.versao)
+        self.x_scaler = carregar_x_scaler(diretorios, self.versao)
+        if self.x_scaler is not None:
+            self.features, self.idx_norm, self.idx_std = (
+                self.x_scaler["features"], self.x_scaler["idx_norm"], self.x_scaler["idx_std"])
+        else:
+            self.features, self.idx_norm, self.idx_std = carregar_features(prepared_dir, self.versao)
+        self.escalas = np.array([ESCALAS_FIXAS.get(c, 1.0) for c in self.features], dtype=np.float32)
+
+        # self.inferir: (B, SEQ_LEN, F) float32 -> ndarray (B, 1)
+        exportado = os.path.splitext(self.modelo_path)[0] + ".npz"
+        if os.path.exists(exportado):
+            self.modelo_path = exportado
+            self.inferir = ModeloNumpy(exportado)
+        else:
+            import tensorflow as tf
+
+            modelo = tf.keras.models.load_model(self.modelo_path, compile=False)
+            # Grafo com assinatura fixa: evita o overhead do predict() e retraçados a cada chamada
+            grafo = tf.function(
+                lambda x: modelo(x, training=False),
+                input_signature=[tf.TensorSpec((None, self.seq_len, len(self.features)), tf.float32)])
+            self.inferir = lambda x: grafo(x).numpy()
+        self.inferir(np.zeros((1, self.seq_len, len(self.features)), dtype=np.float32))  # aquece (compila o grafo)
+        normalizacao = "global" if self.x_scaler is not None else "janela"
+        print(f"[OK] Modelo carregado: {os.path.basename(self.modelo_path)} "
+              f"(SEQ_LEN={self.seq_len}, F={len(self.features)}, normalização {normalizacao})")
+
+    # Linha de features na ordem do treino, com as escalas fixas de hora/minuto/dia
+    # (e, na normalização global, já normalizada: a janela guarda as linhas prontas)
+    def linha_features(self, features):
+        linha = np.array([features[c] for c in self.features], dtype=np.float32) / self.escalas
+        if self.x_scaler is not None:
+            linha = aplicar_escala_global(linha, self.x_scaler, self.idx_norm, self.idx_std)
+        return linha
+
+    # Reconstrói motor e janela de um ativo a partir do histórico da API (só candles fechados)
+    def aquecer(self, ativo):
+        agora = self.iq.get_server_timestamp()
+        candles = buscar_historico(self.iq, ativo, self.tamanho, self.seq_len + AQUECIMENTO, agora)
+        fechados = [c for c in candles if c["from"] + self.tamanho <= agora]
+
+        estado = self.estados.get(ativo)
+        motor = IndicadoresOnline()
+        janela = JanelaFeatures(self.seq_len, len(self.features))
+        if estado is None:
+            alimentador = AlimentadorCandles(motor, ativo, self.tamanho,
+                                             ao_fechar=lambda candle, features: self.ao_fechar(ativo, candle, features))
+            estado = self.estados[ativo] = EstadoAtivo(motor, janela, alimentador)
+        else:
+            estado.motor, estado.janela, estado.alimentador.motor = motor, janela, motor
+            with self.trava_estado:
+                # próxima previsão recalcula a janela completa; pedidos em voo não gravam mais o estado
+                estado.geracao += 1
+                estado.estado_lstm = None
+
+        for candle in fechados:
+            janela.adicionar(self.linha_features(motor.atualizar(candle)))
+        estado.ultimo_from = fechados[-1]["from"] if fechados else None
+        print(f"[INFO] {ativo}: {len(fechados)} candles de aquecimento (janela {janela.cont}/{self.seq_len})")
+        return estado
+
+    # Aquece todos os ativos e assina o stream de candles
+    def iniciar(self):
+        for ativo in self.ativos:
+            self.aquecer(ativo)
+        if self.lote is not None:
+            self.lote.iniciar()
+        self.iq.set_candle_generated_callback(self.receber)
+        for ativo in self.ativos:
+            self.iq.start_candles_stream_v2(ativo, self.tamanho)
+        print(f"[OK] Stream assinado: {', '.join(self.ativos)} (M{self.tamanho // 60})")
+
+    # Cancela as assinaturas e remove o callback
+    def parar(self):
+        self.iq.set_candle_generated_callback(None)
+        for ativo in self.ativos:
+            self.iq.api.unsubscribe(OP_code.ACTIVES[ativo], self.tamanho)
+        if self.lote is not None:
+            self.lote.parar()
+        print("[OK] Preditor parado.")
+
+    # Callback do stream (executado em ordem por ativo no executor de callbacks da API)
+    def receber(self, ativo, msg):
+        estado = self.estados.get(ativo)
+        if estado is None:
+            return
+        if estado.ultimo_from is not None and msg["from"] <= estado.ultimo_from:
+            return  # candle já incluído no aquecimento
+        estado.t_fechamento = time.perf_counter()
+        estado.alimentador(ativo, msg)
+
+    # Candle fechado: motor já atualizado pelo alimentador; entra na janela e dispara a previsão
+    def ao_fechar(self, ativo, candle, features):
+        estado = self.estados[ativo]
+        if estado.ultimo_from is not None and candle["from"] != estado.ultimo_from + self.tamanho:
+            print(f"[AVISO] {ativo}: stream pulou candles ({estado.ultimo_from} -> {candle['from']}), reaquecendo.")
+            estado = self.aquecer(ativo)
+        else:
+            estado.janela.adicionar(self.linha_features(features))
+            estado.ultimo_from = candle["from"]
+        if estado.janela.cheia():
+            self.prever(ativo, estado, candle)
+
+    # Normaliza a janela como no treino e roda o modelo (direto ou no micro-lote)
+    def prever(self, ativo, estado, candle):
+        # Modo com estado: só a linha nova entra no LSTM, até a próxima ressincronização
+        passo = (self.ressincronizar is not None and estado.estado_lstm is not None
+                 and estado.passos < self.ressincronizar)
+        janela = estado.janela.janela()[None]
+        if self.x_scaler is not None:
+            x = janela[:, -1:].copy() if passo else janela.copy()  # linhas já normalizadas
+        else:
+            x = normalizar_janelas(janela, self.idx_norm, self.idx_std)
+            x = x[:, -1:] if passo else x
+        if not np.isfinite(x).all():
+            print(f"[AVISO] {ativo}: janela com valores inválidos, previsão ignorada.")
+            return
+        with self.trava_estado:
+            anterior = estado.estado_lstm if passo else None
+            pedido = (estado, x, anterior, estado.geracao)
+        t_fechamento = estado.t_fechamento
+        if self.lote is None:
+            self.concluir(ativo, estado, candle, t_fechamento, float(self.inferir_lote([pedido])[0]))
+        else:
+            self.lote.submeter(pedido, lambda y: self.concluir(ativo, estado, candle, t_fechamento, y))
+
+    # Roda pedidos (estado, x, estado anterior ou None, geração): janelas completas numa chamada
+    # e passos com estado em outra
+    def inferir_lote(self, pedidos):
+        y = np.empty(len(pedidos), dtype=np.float32)
+        for passo in (False, True):
+            idx = [k for k, (_, _, anterior, _) in enumerate(pedidos) if (anterior is not None) == passo]
+            if not idx:
+                continue
+            x = np.concatenate([pedidos[k][1] for k in idx])
+            self.execucoes["passos" if passo else "janelas"] += len(idx)
+            if self.ressincronizar is None:
+                y[idx] = self.inferir(x)[:, 0]
+                continue
+
+            anteriores = None
+            if passo:
+                estados = [pedidos[k][2] for k in idx]
+                anteriores = [(np.concatenate([e[j][0] for e in estados]), np.concatenate([e[j][1] for e in estados]))
+                              for j in range(len(estados[0]))]
+            saida, novos = self.inferir.executar(x, anteriores)
+            y[idx] = saida[:, 0]
+            with self.trava_estado:
+                for b, k in enumerate(idx):
+                    estado, geracao = pedidos[k][0], pedidos[k][3]
+                    if estado.geracao != geracao:
+                        continue  # ativo reaquecido enquanto o pedido estava no lote
+                    estado.estado_lstm = [(h[b:b + 1], c[b:b + 1]) for h, c in novos]
+                    estado.passos = estado.passos + 1 if passo else 0
+        return y
+
+    # Desescalona a saída do modelo e publica a previsão
+    def concluir(self, ativo, estado, candle, t_fechamento, y_norm):
+        y = y_norm * self.y_escala + self.y_media
+        latencia_ms = (time.perf_counter() - t_fechamento) * 1000
+        estado.latencias.append(latencia_ms)
+        fechamento_nominal = candle["from"] + self.tamanho
+        self.ao_prever({
+            "ativo": ativo,
+            "from": candle["from"],
+            "fechamento": float(candle["close"]),
+            "previsao": y,
+            "latencia_ms": latencia_ms,
+            "atraso_ms": (self.iq.get_server_timestamp() - fechamento_nominal) * 1000,
+        })
+
+    # Publicação padrão: log de uma linha por previsão
+    @staticmethod
+    def publicar(previsao):
+        print(f"[PREVISÃO] {previsao['ativo']} from={previsao['from']} fechamento={previsao['fechamento']:.5f} "
+              f"previsto={previsao['previsao']:.5f} | latência={previsao['latencia_ms']:.2f} ms "
+              f"| atraso={previsao['atraso_ms']:.0f} ms")
+
+    # Latência (ms) desde o fechamento detectado até a previsão, por ativo
+    def estatisticas(self):
+        resumo = {}
+        for ativo, estado in self.estados.items():
+            if not estado.latencias:
+                continue
+            lat = np.array(estado.latencias)
+            resumo[ativo] = {"previsoes": len(lat), "p50": float(np.percentile(lat, 50)),
+                             "p95": float(np.percentile(lat, 95)), "max": float(lat.max())}
+        if self.lote is not None and self.lote.lotes:
+            resumo["lotes"] = {"lotes": self.lote.lotes, "janelas_por_lote": self.lote.janelas / self.lote.lotes}
+        if self.ressincronizar is not None:
+            resumo["execucoes"] = dict(self.execucoes)
+        return resumo
+
+
+# Conecta, inicia o preditor e mostra as estatísticas de latência periodicamente
+def executar(ativos=ATIVOS, tamanho=TIMEFRAME, root=ROOT, modelo_path=None, espera_max_ms=ESPERA_MAX_MS,
+             ressincronizar=None, intervalo_stats=300):
+    from scripts.extrair_dados import conectar_api
+
+    iq = conectar_api()
+    preditor = Preditor(iq, ativos, tamanho, root=root, modelo_path=modelo_path, espera_max_ms=espera_max_ms,
+                        ressincronizar=ressincronizar)
+    preditor.iniciar()
+    try:
+        while True:
+            time.sleep(intervalo_stats)
+            for ativo, s in preditor.estatisticas().items():
+                if ativo == "lotes":
+                    print(f"[INFO] Micro-lotes: {s['lotes']} | janelas por lote={s['janelas_por_lote']:.1f}")
+                    continue
+                if ativo == "execucoes":
+                    print(f"[INFO] Execuções: {s['janelas']} janelas completas | {s['passos']} passos com estado")
+                    continue
+                print(f"[INFO] {ativo}: {s['previsoes']} previsões | latência p50={s['p50']:.2f} ms "
+                      f"p95={s['p95']:.2f} ms max={s['max']:.2f} ms")
+    except KeyboardInterrupt:
+        preditor.parar()
+    return preditor
+
+
+if __name__ == "__main__":
+    executar()
@@ -0,0 +1,117 @@
+#@title Script de armazenamento das tabelas do pipeline (CSV / Parquet) ✅
+
+"""
+Script: armazenamento.py
+
+Descrição:
+-----------
+Leitura e escrita das tabelas do pipeline (candles brutos e dados transformados)
+em CSV ou Parquet.
+
+No Parquet as colunas ficam tipadas (timestamps nativos em UTC, inteiros em int64
+e, quando `compactar=True`, floats em float32) e a leitura aceita projeção de
+colunas (`colunas=[...]`), de modo que cada etapa lê só o que precisa, sem o
+custo de formatar/parsear texto. O CSV continua disponível como opção de exportação.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+FORMATOS = {"csv": ".csv", "parquet": ".parquet"}
+COLUNAS_TEMPO = ["from", "datetime", "timestamp", "time"]
+
+
+# Caminho da tabela com a extensão do formato escolhido
+def caminho_tabela(diretorio, nome, formato="csv"):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}. Use um de {list(FORMATOS)}.")
+    return os.path.join(diretorio, nome + FORMATOS[formato])
+
+
+# Formato deduzido pela extensão do arquivo
+def formato_do_arquivo(caminho):
+    return "parquet" if caminho.endswith(FORMATOS["parquet"]) else "csv"
+
+
+# Converte colunas para tipos fixos: float64 -> float32 (se compactar) e inteiros -> int64
+def tipar_colunas(df, compactar=True):
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_float_dtype(df[col]) and compactar:
+            df[col] = df[col].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(np.int64)
+    return df
+
+
+# Salva a tabela no formato indicado pela extensão do caminho
+def salvar_tabela(df, caminho, compactar=True):
+    if formato_do_arquivo(caminho) == "parquet":
+        tipar_colunas(df, compactar).to_parquet(caminho, index=False)
+    else:
+        df.to_csv(caminho, index=False)
+    return caminho
+
+
+# Remove a última linha de um CSV (truncando o arquivo, sem reescrever o restante)
+def remover_ultima_linha_csv(caminho):
+    with open(caminho, "rb+") as f:
+        fim = f.seek(0, os.SEEK_END)
+        bloco = 4096
+        while True:
+            inicio = max(0, fim - bloco)
+            f.seek(inicio)
+            trecho = f.read(fim - inicio)
+            # ignora a quebra de linha final e procura a que encerra a penúltima linha
+            pos = trecho.rstrip(b"\r\n").rfind(b"\n")
+            if pos >= 0 or inicio == 0:
+                f.truncate(inicio + pos + 1)
+                return
+            bloco *= 2
+
+
+# Acrescenta linhas ao fim da tabela existente, sem reordenar o histórico
+# (substituir_ultima=True troca a última linha salva pela primeira linha de df)
+def anexar_tabela(df, caminho, compactar=True, substituir_ultima=False):
+    if not os.path.exists(caminho):
+        return salvar_tabela(df, caminho, compactar)
+    if formato_do_arquivo(caminho) == "parquet":
+        # Parquet não aceita append no mesmo arquivo: regrava o histórico + cauda nova
+        antigo = pd.read_parquet(caminho)
+        if substituir_ultima:
+            antigo = antigo.iloc[:-1]
+        tipar_colunas(pd.concat([antigo, df], ignore_index=True), compactar).to_parquet(caminho, index=False)
+    else:
+        if substituir_ultima:
+            remover_ultima_linha_csv(caminho)
+        df.to_csv(caminho, mode="a", header=False, index=False)
+    return caminho
+
+
+# Nomes das colunas da tabela sem carregar os dados
+def colunas_tabela(caminho):
+    if formato_do_arquivo(caminho) == "parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(caminho).names)
+    return list(pd.read_csv(caminho, nrows=0).columns)
+
+
+# Lê a tabela (apenas as colunas pedidas, se informadas) com as colunas de tempo já em datetime UTC
+def ler_tabela(caminho, colunas=None):
+    if formato_do_arquivo(caminho) == "parquet":
+        return pd.read_parquet(caminho, columns=colunas)
+
+    disponiveis = colunas if colunas is not None else colunas_tabela(caminho)
+    datas = [c for c in COLUNAS_TEMPO if c in disponiveis]
+    df = pd.read_csv(caminho, usecols=colunas)
+    for col in datas:
+        df[col] = pd.to_datetime(df[col], utc=True, errors="coerce")
+    return df
+
+
+# Exporta uma tabela existente (ex.: Parquet) para CSV no mesmo diretório
+def exportar_csv(caminho):
+    destino = os.path.splitext(caminho)[0] + FORMATOS["csv"]
+    ler_tabela(caminho).to_csv(destino, index=False)
+    return destino
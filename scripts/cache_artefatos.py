@@ -0,0 +1,180 @@
+#@title Script de cache de artefatos do pipeline ✅
+
+"""
+Script: cache_artefatos.py
+
+Descrição:
+-----------
+Cache endereçado por conteúdo para as etapas do pipeline (transformação, preparação).
+
+Cada execução de etapa recebe uma chave = sha256 de:
+- nome da etapa;
+- hash do conteúdo de cada arquivo de entrada;
+- parâmetros (SEQ_LEN, TEST_SIZE, listas de features, ...);
+- hash do código da etapa (mudou o script, muda a chave).
+
+Se a chave já existe no manifesto e todos os arquivos de saída ainda estão no disco,
+a etapa não é executada e o resultado salvo é devolvido. O manifesto
+(data/cache/manifesto.json) registra também a linhagem: de qual entrada de cache veio
+cada arquivo de entrada. Artefatos antigos são removidos por idade e por tamanho total
+(os menos usados recentemente saem primeiro).
+"""
+
+import os
+import json
+import hashlib
+import time
+
+BLOCO_HASH = 1 << 20  # 1 MB
+
+
+class CacheArtefatos:
+    """
+    Cache de artefatos do pipeline com manifesto em JSON.
+
+    Args:
+        root (str): Diretório raiz do projeto (manifesto em {root}/data/cache).
+        max_bytes (int): Tamanho máximo somado dos artefatos em cache (None = sem limite).
+        max_idade_dias (float): Idade máxima desde o último uso (None = sem limite).
+    """
+
+    def __init__(self, root, max_bytes=None, max_idade_dias=None):
+        self.dir = os.path.join(root, "data", "cache")
+        os.makedirs(self.dir, exist_ok=True)
+        self.caminho_manifesto = os.path.join(self.dir, "manifesto.json")
+        self.max_bytes = max_bytes
+        self.max_idade_dias = max_idade_dias
+        self.manifesto = self._carregar()
+
+    def _carregar(self):
+        if os.path.exists(self.caminho_manifesto):
+            with open(self.caminho_manifesto) as f:
+                return json.load(f)
+        return {"entradas": {}, "hashes": {}}
+
+    def _salvar(self):
+        temporario = self.caminho_manifesto + ".tmp"
+        with open(temporario, "w") as f:
+            json.dump(self.manifesto, f, indent=2)
+        os.replace(temporario, self.caminho_manifesto)
+
+    # Hash sha256 do conteúdo; reaproveitado enquanto tamanho e mtime não mudarem
+    def hash_arquivo(self, caminho):
+        info = os.stat(caminho)
+        memo = self.manifesto["hashes"].get(caminho)
+        if memo and memo["tamanho"] == info.st_size and memo["mtime_ns"] == info.st_mtime_ns:
+            return memo["sha256"]
+
+        h = hashlib.sha256()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(BLOCO_HASH), b""):
+                h.update(bloco)
+        self.manifesto["hashes"][caminho] = {"tamanho": info.st_size, "mtime_ns": info.st_mtime_ns,
+                                             "sha256": h.hexdigest()}
+        return h.hexdigest()
+
+    # Chave da execução: etapa + conteúdo das entradas + parâmetros + código
+    def chave(self, etapa, entradas, parametros, codigo=()):
+        conteudo = {
+            "etapa": etapa,
+            "entradas": [self.hash_arquivo(c) for c in entradas],
+            "parametros": parametros,
+            "codigo": [self.hash_arquivo(c) for c in codigo],
+        }
+        return hashlib.sha256(json.dumps(conteudo, sort_keys=True, default=str).encode()).hexdigest()
+
+    # Resultado salvo para a chave, se todos os arquivos de saída ainda existirem
+    def obter(self, chave):
+        entrada = self.manifesto["entradas"].get(chave)
+        if entrada is None:
+            return None
+        if not all(os.path.exists(c) for c in entrada["arquivos"]):
+            del self.manifesto["entradas"][chave]
+            self._salvar()
+            return None
+        entrada["ultimo_uso"] = time.time()
+        self._salvar()
+        return entrada["resultado"]
+
+    # Registra uma execução: arquivos gerados, resultado (JSON) e linhagem das entradas
+    def registrar(self, chave, etapa, entradas, parametros, arquivos, resultado):
+        origens = {}
+        for caminho in entradas:
+            for outra_chave, outra in self.manifesto["entradas"].items():
+                if caminho in outra["arquivos"]:
+                    origens[caminho] = outra_chave
+                    break
+
+        agora = time.time()
+        self.manifesto["entradas"][chave] = {
+            "etapa": etapa,
+            "entradas": {c: {"sha256": self.hash_arquivo(c), "origem": origens.get(c)} for c in entradas},
+            "parametros": parametros,
+            "arquivos": list(arquivos),
+            "tamanho_bytes": sum(os.path.getsize(c) for c in arquivos),
+            "resultado": resultado,
+            "criado_em": agora,
+            "ultimo_uso": agora,
+        }
+        self._salvar()
+
+    # Executa a etapa só se a chave não estiver em cache
+    def executar(self, etapa, funcao, entradas, parametros, arquivos, codigo=(), serializar=None):
+        """
+        Args:
+            etapa (str): Nome da etapa (ex.: "transformar", "preparar").
+            funcao (callable): Executa a etapa e devolve o resultado.
+            entradas (list): Arquivos de entrada (o conteúdo entra na chave).
+            parametros (dict): Parâmetros da etapa (entram na chave).
+            arquivos (callable): Recebe o resultado e devolve a lista de arquivos gerados.
+            codigo (list): Arquivos de código da etapa (entram na chave).
+            serializar (callable): Converte o resultado em algo salvável em JSON (padrão: o próprio resultado).
+
+        Returns:
+            Resultado da etapa (do cache, se houver acerto).
+        """
+        chave = self.chave(etapa, entradas, parametros, codigo)
+        resultado = self.obter(chave)
+        if resultado is not None:
+            print(f"[CACHE] {etapa}: reaproveitando artefatos ({chave[:12]})")
+            return resultado
+
+        resultado = funcao()
+        salvo = serializar(resultado) if serializar else resultado
+        self.registrar(chave, etapa, entradas, parametros, arquivos(resultado), salvo)
+        print(f"[CACHE] {etapa}: artefatos registrados ({chave[:12]})")
+        self.despejar(manter={chave})
+        return salvo
+
+    # Remove artefatos por idade e, depois, os menos usados até caber no limite de tamanho
+    def despejar(self, manter=()):
+        entradas = self.manifesto["entradas"]
+        agora = time.time()
+        remover = []
+
+        if self.max_idade_dias is not None:
+            limite = agora - self.max_idade_dias * 86400
+            remover += [c for c, e in entradas.items() if e["ultimo_uso"] < limite and c not in manter]
+
+        if self.max_bytes is not None:
+            restantes = sorted((e["ultimo_uso"], c) for c, e in entradas.items() if c not in remover)
+            total = sum(entradas[c]["tamanho_bytes"] for _, c in restantes)
+            for _, c in restantes:
+                if total <= self.max_bytes:
+                    break
+                if c in manter:
+                    continue
+                remover.append(c)
+                total -= entradas[c]["tamanho_bytes"]
+
+        for c in remover:
+            for caminho in entradas[c]["arquivos"]:
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+                self.manifesto["hashes"].pop(caminho, None)
+            print(f"[CACHE] Removido {entradas[c]['etapa']} ({c[:12]})")
+            del entradas[c]
+
+        if remover:
+            self._salvar()
+        return remover
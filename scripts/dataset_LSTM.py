@@ -0,0 +1,144 @@
+#@title Script dataset_LSTM.py (janelas sob demanda) ✅
+
+"""
+Script: dataset_LSTM.py
+
+Descrição:
+-----------
+Datasets Keras (PyDataset) que montam os lotes de janelas normalizadas sob demanda
+a partir dos arquivos salvos por `preparar_dados(..., modo="janelas")`:
+matriz base de features (linhas x F), índices de início das janelas e targets.
+
+A memória ocupada cresce com o número de linhas, e não com linhas x SEQ_LEN.
+
+Também traz um dataset sobre X_train/X_test materializados abertos com memory-map,
+para que várias rodadas de treino compartilhem o cache de páginas do sistema.
+"""
+
+import os
+import json
+import math
+import numpy as np
+from tensorflow.keras.utils import PyDataset
+
+from scripts.normalizacao_LSTM import janelas_deslizantes, normalizar_janelas
+
+
+class JanelasDataset(PyDataset):
+    """
+    Gera lotes (X, y) montando as janelas da matriz base no momento do uso.
+
+    Args:
+        base (np.ndarray): Matriz de features (linhas x F) em float32.
+        inicios (np.ndarray): Índice da primeira linha de cada janela.
+        y (np.ndarray): Target (já escalonado) de cada janela.
+        seq_len (int): Tamanho da janela.
+        idx_norm (list): Colunas normalizadas por min-max na janela.
+        idx_std (list): Colunas padronizadas por z-score na janela.
+        tamanho_lote (int): Janelas por lote.
+        embaralhar (bool): Embaralha a ordem das janelas a cada época.
+    """
+
+    def __init__(self, base, inicios, y, seq_len, idx_norm, idx_std,
+                 tamanho_lote=128, embaralhar=False, semente=None, **kwargs):
+        super().__init__(**kwargs)
+        self.janelas = janelas_deslizantes(base, seq_len)
+        self.inicios = np.asarray(inicios, dtype=np.int64)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.seq_len = seq_len
+        self.n_features = base.shape[1]
+        self.idx_norm = idx_norm
+        self.idx_std = idx_std
+        self.tamanho_lote = tamanho_lote
+        self.embaralhar = embaralhar
+        self.rng = np.random.default_rng(semente)
+        self.ordem = np.arange(len(self.inicios))
+        if self.embaralhar:
+            self.rng.shuffle(self.ordem)
+
+    def __len__(self):
+        return math.ceil(len(self.inicios) / self.tamanho_lote)
+
+    def __getitem__(self, idx):
+        lote = self.ordem[idx * self.tamanho_lote:(idx + 1) * self.tamanho_lote]
+        X = normalizar_janelas(self.janelas[self.inicios[lote]], self.idx_norm, self.idx_std)
+        return X, self.y[lote]
+
+    def on_epoch_end(self):
+        if self.embaralhar:
+            self.rng.shuffle(self.ordem)
+
+
+class ArraysMapeadosDataset(PyDataset):
+    """
+    Gera lotes (X, y) a partir de arrays .npy abertos com memory-map (np.load(..., mmap_mode="r")).
+
+    Cada lote é uma fatia contígua do arquivo (leitura sequencial de páginas); o embaralhamento
+    troca a ordem dos lotes a cada época e a ordem das amostras dentro do lote já lido,
+    sem acessos aleatórios espalhados pelo arquivo.
+
+    Args:
+        X (np.ndarray | np.memmap): Janelas (N x SEQ_LEN x F).
+        y (np.ndarray): Target de cada janela.
+        tamanho_lote (int): Janelas por lote.
+        embaralhar (bool): Embaralha a ordem dos lotes e das amostras de cada lote.
+    """
+
+    def __init__(self, X, y, tamanho_lote=128, embaralhar=False, semente=None, **kwargs):
+        super().__init__(**kwargs)
+        self.X = X
+        self.y = np.asarray(y, dtype=np.float32)
+        self.seq_len = X.shape[1]
+        self.n_features = X.shape[2]
+        self.tamanho_lote = tamanho_lote
+        self.embaralhar = embaralhar
+        self.rng = np.random.default_rng(semente)
+        self.ordem_lotes = np.arange(len(self))
+        if self.embaralhar:
+            self.rng.shuffle(self.ordem_lotes)
+
+    def __len__(self):
+        return math.ceil(len(self.X) / self.tamanho_lote)
+
+    def __getitem__(self, idx):
+        ini = self.ordem_lotes[idx] * self.tamanho_lote
+        fim = min(ini + self.tamanho_lote, len(self.X))
+        X = np.asarray(self.X[ini:fim], dtype=np.float32)
+        y = self.y[ini:fim]
+        if self.embaralhar:
+            perm = self.rng.permutation(fim - ini)
+            X, y = X[perm], y[perm]
+        return X, y
+
+    def on_epoch_end(self):
+        if self.embaralhar:
+            self.rng.shuffle(self.ordem_lotes)
+
+
+# Abre X_train/X_test materializados com memory-map e monta os datasets de treino/teste
+def carregar_mapeados(prepared_dir, versao_dados, tamanho_lote=128):
+    X_train = np.load(os.path.join(prepared_dir, f"X_train_{versao_dados}.npy"), mmap_mode="r")
+    X_test = np.load(os.path.join(prepared_dir, f"X_test_{versao_dados}.npy"), mmap_mode="r")
+    y_train = np.load(os.path.join(prepared_dir, f"y_train_{versao_dados}.npy"))
+    y_test = np.load(os.path.join(prepared_dir, f"y_test_{versao_dados}.npy"))
+
+    ds_train = ArraysMapeadosDataset(X_train, y_train, tamanho_lote=tamanho_lote, embaralhar=True)
+    ds_test = ArraysMapeadosDataset(X_test, y_test, tamanho_lote=tamanho_lote)
+    return ds_train, ds_test, y_test
+
+
+# Carrega os arquivos de uma versão preparada em modo janelas e monta os datasets de treino/teste
+def carregar_janelas(prepared_dir, versao_dados, tamanho_lote=128, mmap=False):
+    with open(os.path.join(prepared_dir, f"janelas_{versao_dados}.json")) as f:
+        meta = json.load(f)
+
+    base = np.load(os.path.join(prepared_dir, f"base_{versao_dados}.npy"), mmap_mode="r" if mmap else None)
+    inicios_train = np.load(os.path.join(prepared_dir, f"inicios_train_{versao_dados}.npy"))
+    inicios_test = np.load(os.path.join(prepared_dir, f"inicios_test_{versao_dados}.npy"))
+    y_train = np.load(os.path.join(prepared_dir, f"y_train_{versao_dados}.npy"))
+    y_test = np.load(os.path.join(prepared_dir, f"y_test_{versao_dados}.npy"))
+
+    args = (meta["seq_len"], meta["idx_norm"], meta["idx_std"])
+    ds_train = JanelasDataset(base, inicios_train, y_train, *args, tamanho_lote=tamanho_lote, embaralhar=True)
+    ds_test = JanelasDataset(base, inicios_test, y_test, *args, tamanho_lote=tamanho_lote)
+    return ds_train, ds_test, y_test
@@ -0,0 +1,80 @@
+#@title Script de exportação do modelo LSTM para NumPy ✅
+
+"""
+Script: exportar_modelo.py
+
+Descrição:
+-----------
+Converte o checkpoint Keras (`modelo_LSTM_seq*_{versao}.h5`) salvo por `treinar_modelo`
+num arquivo `.npz` com os pesos de cada camada e a arquitetura (JSON), no mesmo
+diretório e com o mesmo nome-base. O `.npz` é lido por `realtime/inferencia_numpy.py`,
+que roda o forward pass só com NumPy: o preditor deixa de importar o TensorFlow.
+
+Camadas suportadas: LSTM e Dense (Dropout é ignorado, pois não atua na inferência).
+Após exportar, a saída do runtime NumPy é comparada à do Keras numa entrada aleatória.
+"""
+
+import os
+import glob
+import json
+import numpy as np
+
+
+# Localiza o modelo .h5 mais recente se nenhum caminho for informado
+def localizar_h5(models_dir):
+    modelos = sorted(glob.glob(os.path.join(models_dir, "modelo_LSTM_seq*_*.h5")), key=os.path.getmtime)
+    if not modelos:
+        raise FileNotFoundError(f"Nenhum modelo_LSTM_seq*.h5 encontrado em {models_dir}.")
+    return modelos[-1]
+
+
+# Extrai pesos e configuração de cada camada em formato independente do Keras
+def extrair_camadas(modelo):
+    arquitetura, pesos = [], {}
+    for camada in modelo.layers:
+        tipo = camada.__class__.__name__
+        config = camada.get_config()
+        if tipo == "Dropout":
+            continue
+        if tipo == "LSTM":
+            nomes = ["kernel", "recorrente", "bias"]
+            arquitetura.append({"tipo": tipo, "pesos": nomes, "ativacao": config["activation"],
+                                "ativacao_recorrente": config["recurrent_activation"],
+                                "retorna_sequencia": config["return_sequences"]})
+        elif tipo == "Dense":
+            nomes = ["kernel", "bias"]
+            arquitetura.append({"tipo": tipo, "pesos": nomes, "ativacao": config["activation"]})
+        else:
+            raise ValueError(f"Camada não suportada na exportação: {tipo}")
+
+        for nome, w in zip(nomes, camada.get_weights()):
+            pesos[f"camada{len(arquitetura) - 1}_{nome}"] = np.asarray(w, dtype=np.float32)
+    return arquitetura, pesos
+
+
+# Exporta o .h5 para .npz e valida a saída do runtime NumPy contra o Keras
+def exportar_modelo(modelo_path=None, models_dir="/content/indicador-preditivo/models", tolerancia=1e-4):
+    import tensorflow as tf
+    from realtime.inferencia_numpy import ModeloNumpy
+
+    if modelo_path is None:
+        modelo_path = localizar_h5(models_dir)
+    modelo = tf.keras.models.load_model(modelo_path, compile=False)
+
+    arquitetura, pesos = extrair_camadas(modelo)
+    npz_path = os.path.splitext(modelo_path)[0] + ".npz"
+    np.savez(npz_path, arquitetura=np.array(json.dumps(arquitetura)), **pesos)
+
+    # Verificação: mesma entrada nos dois runtimes
+    _, seq_len, n_features = modelo.input_shape
+    x = np.random.default_rng(0).standard_normal((4, seq_len, n_features)).astype(np.float32)
+    diferenca = float(np.abs(modelo(x, training=False).numpy() - ModeloNumpy(npz_path)(x)).max())
+    if diferenca > tolerancia:
+        raise RuntimeError(f"Runtime NumPy diverge do Keras (diferença máxima {diferenca:.2e}).")
+
+    print(f"[OK] Modelo exportado em {npz_path} (diferença máxima vs Keras: {diferenca:.2e})")
+    return npz_path
+
+
+if __name__ == "__main__":
+    exportar_modelo()
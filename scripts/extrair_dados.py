@@ -19,11 +19,18 @@ Fluxo de execução:
 -------------------
 1. Carrega credenciais da conta IQ Option a partir do arquivo .env.
 2. Conecta à API da IQ Option.
-3. Busca candles em blocos de até 1000, retrocedendo até atingir a quantidade desejada.
+3. Busca candles em blocos de até 1000, retrocedendo até atingir a quantidade desejada
+   (vários blocos ficam em voo ao mesmo tempo no mesmo WebSocket, com limite de taxa).
 4. Converte os dados em DataFrame pandas, padroniza colunas e remove duplicados.
 5. Descarta qualquer candle futuro (em aberto).
-6. Salva os dados em CSV dentro de /data/raw.
-7. Se já existir CSV anterior, mescla e mantém apenas candles únicos.
+6. Salva os dados em CSV ou Parquet dentro de /data/raw.
+7. Se já existir arquivo anterior, mescla e mantém apenas candles únicos.
+
+Modo incremental (`incremental=True`):
+---------------------------------------
+Se o arquivo já existir, lê só o último `from` salvo, pede à API apenas os candles
+que faltam até o último candle fechado (uma chamada para atualizações curtas) e
+acrescenta essa cauda ao fim do arquivo, sem reordenar o histórico.
 
 Parâmetros configuráveis:
 --------------------------
@@ -31,11 +38,14 @@ PAR        -> Ativo a ser extraído (ex: "ETHUSD").
 TIMEFRAME  -> Timeframe em segundos (ex: 300 = 5 minutos).
 DIAS       -> Quantidade de dias históricos a coletar.
 ROOT   -> Diretório raiz do projeto.
+FORMATO    -> "csv" ou "parquet" (colunas tipadas, leitura por projeção).
+INCREMENTAL -> Baixa apenas a cauda que falta no arquivo existente.
+EM_VOO     -> Requisições de candles mantidas em paralelo no mesmo WebSocket (1 = sequencial).
 
 Saídas:
 --------
 - DataFrame pandas contendo candles ordenados.
-- Arquivo CSV salvo em: {ROOT_DIR}/data/raw/{PAR}_M{TIMEFRAME//60}_{DIAS}d.csv
+- Arquivo salvo em: {ROOT_DIR}/data/raw/{PAR}_M{TIMEFRAME//60}_{DIAS}d.{csv|parquet}
 """
 
 
@@ -49,18 +59,27 @@ IQ_PASSWORD = os.getenv("IQ_PASSWORD")
 # Caminho da API da IQ Option
 sys.path.append("/content/indicador-preditivo/iqoptionaapi")
 from stable_api import IQ_Option
+from scripts.armazenamento import anexar_tabela, caminho_tabela, ler_tabela, salvar_tabela
 
 # Parâmetros padrão
 PAR = "ETHUSD"
 TIMEFRAME = 300   # 5 minutos
 DIAS = 120
 ROOT = "/content/indicador-preditivo"
+FORMATO = "csv"
+INCREMENTAL = False
+EM_VOO = 8        # requisições get-candles simultâneas no backfill
+REQ_POR_SEG = 10  # limite de requisições por segundo
 
 
 
 # Cálculo de quantos candles coletar
-candles_por_dia = int((24 * 60) / (TIMEFRAME / 60))
-TOTAL_CANDLES = DIAS * candles_por_dia
+def total_candles_dias(dias, timeframe):
+    candles_por_dia = int((24 * 60) / (timeframe / 60))
+    return dias * candles_por_dia
+
+
+TOTAL_CANDLES = total_candles_dias(DIAS, TIMEFRAME)
 
 def conectar_api():
     # Conecta à IQ Option usando credenciais
@@ -72,7 +91,7 @@ def conectar_api():
     return api
 
 
-def buscar_candles(api, par=PAR, timeframe=TIMEFRAME, total_candles=TOTAL_CANDLES):
+def buscar_candles(api, par=PAR, timeframe=TIMEFRAME, total_candles=TOTAL_CANDLES, em_voo=EM_VOO):
     # Busca candles em blocos de até 1000, alinhados ao último candle fechado
     max_por_chamada = 1000
     todos_candles = []
@@ -81,6 +100,10 @@ def buscar_candles(api, par=PAR, timeframe=TIMEFRAME, total_candles=TOTAL_CANDLE
     agora = int(time.time())
     agora -= agora % timeframe
 
+    # Vários blocos: mantém até `em_voo` requisições abertas ao mesmo tempo
+    if em_voo > 1 and total_candles > max_por_chamada:
+        return buscar_candles_paralelo(api, par, timeframe, total_candles, agora, em_voo)
+
     while total_candles > 0:
         qtd = min(max_por_chamada, total_candles)
         candles = api.get_candles(par, timeframe, qtd, agora)
@@ -93,8 +116,40 @@ def buscar_candles(api, par=PAR, timeframe=TIMEFRAME, total_candles=TOTAL_CANDLE
         agora = candles[0]["from"] - 1  # retrocede para evitar sobreposição
         total_candles -= qtd
 
+    return candles_para_df(todos_candles, timeframe)
+
+
+def buscar_candles_paralelo(api, par, timeframe, total_candles, agora, em_voo=EM_VOO, req_por_seg=REQ_POR_SEG):
+    # Divide o período em blocos de até 1000 candles sem sobreposição e busca todos em pipeline
+    max_por_chamada = 1000
+    blocos = []
+    fim = agora
+    while total_candles > 0:
+        qtd = min(max_por_chamada, total_candles)
+        blocos.append((qtd, fim))
+        fim -= qtd * timeframe
+        total_candles -= qtd
+
+    print(f"[INFO] {len(blocos)} blocos de candles, até {em_voo} em paralelo...")
+    respostas = api.get_candles_pipelined(par, timeframe, blocos, max_in_flight=em_voo, max_rate=req_por_seg)
+    if respostas is None:
+        # Ativo desconhecido em constants.ACTIVES: não confundir com "nenhum candle novo"
+        raise RuntimeError(f"Falha ao buscar candles de {par}: ativo não encontrado em constants.ACTIVES.")
+
+    # Remonta em ordem cronológica, mantendo de cada bloco só o seu intervalo
+    todos_candles = []
+    for (qtd, fim), candles in zip(reversed(blocos), reversed(respostas)):
+        inicio = fim - (qtd - 1) * timeframe
+        todos_candles.extend(c for c in candles if inicio <= c["from"] <= fim)
+
+    return candles_para_df(todos_candles, timeframe)
+
+
+def candles_para_df(todos_candles, timeframe):
     # Cria DataFrame com candles
     df = pd.DataFrame(todos_candles)
+    if df.empty:
+        return pd.DataFrame(columns=["from", "abertura", "maxima", "minima", "fechamento", "volume"])
     df["from"] = pd.to_datetime(df["from"], unit="s", utc=True)
 
     # Padroniza nomes das colunas
@@ -121,31 +176,68 @@ def buscar_candles(api, par=PAR, timeframe=TIMEFRAME, total_candles=TOTAL_CANDLE
     return df
 
 
-def extrair_dados(par=PAR, timeframe=TIMEFRAME, dias=DIAS, root=ROOT):
-    # Define diretório e nome do CSV
-    raw_dir = os.path.join(root, "data", "raw")
-    os.makedirs(raw_dir, exist_ok=True)
-    caminho_csv = os.path.join(raw_dir, f"{par}_M{timeframe//60}_{dias}d.csv")
+def ultimo_from(caminho_raw):
+    # Lê apenas a coluna "from" do arquivo salvo e devolve o último candle em segundos
+    datas = ler_tabela(caminho_raw, colunas=["from"])["from"]
+    if datas.empty:
+        return None
+    return int(datas.iloc[-1].timestamp())
 
-    print(f"Baixando {dias} dias de dados ({TOTAL_CANDLES} candles em M{timeframe//60})...")
 
-    # Conecta e busca dados
-    api = conectar_api()
-    df = buscar_candles(api, par, timeframe, TOTAL_CANDLES)
+def buscar_cauda(api, par, timeframe, desde, em_voo=EM_VOO):
+    # Busca só os candles posteriores a `desde` (segundos) até o último candle fechado
+    agora = int(time.time())
+    agora -= agora % timeframe
+    faltantes = (agora - desde) // timeframe  # inclui o candle em aberto, descartado em candles_para_df
+    if faltantes <= 1:
+        return candles_para_df([], timeframe)
+
+    df = buscar_candles(api, par, timeframe, faltantes, em_voo)
+    return df[df["from"] > pd.Timestamp(desde, unit="s", tz="UTC")].reset_index(drop=True)
 
-    # Se já existir CSV, mescla com novos dados
-    if os.path.exists(caminho_csv):
-        antigo = pd.read_csv(caminho_csv, parse_dates=["from"])
+
+def extrair_dados(par=PAR, timeframe=TIMEFRAME, dias=DIAS, root=ROOT, formato=FORMATO,
+                  incremental=INCREMENTAL, em_voo=EM_VOO, api=None):
+    # Define diretório e nome do arquivo (CSV ou Parquet)
+    raw_dir = os.path.join(root, "data", "raw")
+    os.makedirs(raw_dir, exist_ok=True)
+    caminho_raw = caminho_tabela(raw_dir, f"{par}_M{timeframe//60}_{dias}d", formato)
+
+    # Modo incremental: baixa só a cauda que falta e acrescenta ao arquivo existente
+    desde = ultimo_from(caminho_raw) if incremental and os.path.exists(caminho_raw) else None
+    if desde is not None:
+        print(f"[INFO] Modo incremental: buscando candles após {pd.Timestamp(desde, unit='s', tz='UTC')}...")
+        api = api or conectar_api()
+        novos = buscar_cauda(api, par, timeframe, desde, em_voo)
+        if novos.empty:
+            print("[INFO] Nenhum candle fechado novo.")
+        else:
+            anexar_tabela(novos, caminho_raw, compactar=False)
+            print(f"[OK] {len(novos)} candles novos anexados em {caminho_raw}.")
+        df = ler_tabela(caminho_raw)
+        print(f"Dados salvos em {caminho_raw} (até {df['from'].max()}).")
+        return df, caminho_raw
+
+    total_candles = total_candles_dias(dias, timeframe)
+    print(f"Baixando {dias} dias de dados ({total_candles} candles em M{timeframe//60})...")
+
+    # Conecta (ou reaproveita a sessão recebida) e busca dados
+    api = api or conectar_api()
+    df = buscar_candles(api, par, timeframe, total_candles, em_voo)
+
+    # Se já existir arquivo, mescla com novos dados
+    if os.path.exists(caminho_raw):
+        antigo = ler_tabela(caminho_raw)
         df = pd.concat([antigo, df]).drop_duplicates(subset=["from"]).sort_values("from").reset_index(drop=True)
 
-    # Salva CSV final
-    df.to_csv(caminho_csv, index=False)
-    print(f"Dados salvos em {caminho_csv} (até {df['from'].max()}).")
+    # Salva arquivo final (preços mantidos em float64, exatamente como vêm da corretora)
+    salvar_tabela(df, caminho_raw, compactar=False)
+    print(f"Dados salvos em {caminho_raw} (até {df['from'].max()}).")
 
-    return df, caminho_csv
+    return df, caminho_raw
 
 
 if __name__ == "__main__":
-    dados, path = extrair_dados(PAR, TIMEFRAME, DIAS, ROOT)
+    dados, path = extrair_dados(PAR, TIMEFRAME, DIAS, ROOT, FORMATO, INCREMENTAL)
     print(dados.tail())
     print(dados.head())
@@ -0,0 +1,91 @@
+#@title Script de Extração em lote (vários ativos e timeframes) ✅
+
+"""
+Script: extrair_lote.py
+
+Descrição:
+-----------
+Extrai candles de vários pares (ativo, timeframe) em uma única execução,
+reaproveitando uma só sessão autenticada da IQ Option.
+
+Fluxo de execução:
+-------------------
+1. Valida os ativos contra `constants.ACTIVES` (ativos desconhecidos são ignorados com aviso).
+2. Conecta uma única vez à API.
+3. Agenda as extrações em paralelo (até TRABALHADORES pares ao mesmo tempo),
+   todas usando a mesma conexão WebSocket.
+4. Cada par é salvo no seu próprio arquivo em /data/raw (mesmo formato de extrair_dados).
+5. Mostra o progresso por par e um resumo final.
+
+Parâmetros configuráveis:
+--------------------------
+PARES         -> Lista de tuplas (ativo, timeframe em segundos).
+DIAS          -> Quantidade de dias históricos por par.
+TRABALHADORES -> Pares baixados simultaneamente.
+
+Saídas:
+--------
+- Dicionário {(ativo, timeframe): caminho do arquivo salvo}.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import iqoptionaapi.constants as OP_code
+from scripts.extrair_dados import (conectar_api, extrair_dados, DIAS, ROOT, FORMATO,
+                                   INCREMENTAL, EM_VOO)
+
+# Parâmetros padrão
+PARES = [("ETHUSD", 300), ("BTCUSD", 300), ("EURUSD", 300), ("EURUSD", 60)]
+TRABALHADORES = 4
+
+
+# Mantém apenas os pares cujo ativo existe em constants.ACTIVES
+def validar_pares(pares):
+    validos = []
+    for par, timeframe in pares:
+        if par not in OP_code.ACTIVES:
+            print(f"[AVISO] Ativo {par} não encontrado em constants.ACTIVES, ignorado.")
+            continue
+        validos.append((par, timeframe))
+    return validos
+
+
+# Extrai todos os pares com uma única sessão e salva um arquivo por par
+def extrair_lote(pares=PARES, dias=DIAS, root=ROOT, formato=FORMATO, incremental=INCREMENTAL,
+                 trabalhadores=TRABALHADORES, em_voo=EM_VOO, api=None):
+    pares = validar_pares(pares)
+    if not pares:
+        raise ValueError("Nenhum par válido para extrair.")
+
+    api = api or conectar_api()
+    print(f"[INFO] Extraindo {len(pares)} pares com {trabalhadores} trabalhadores...")
+
+    caminhos, falhas = {}, {}
+    inicio = time.time()
+
+    with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+        futuros = {
+            executor.submit(extrair_dados, par, timeframe, dias, root, formato,
+                            incremental, em_voo, api): (par, timeframe)
+            for par, timeframe in pares
+        }
+        for i, futuro in enumerate(as_completed(futuros), 1):
+            par, timeframe = futuros[futuro]
+            try:
+                df, caminho = futuro.result()
+                caminhos[(par, timeframe)] = caminho
+                print(f"[OK] ({i}/{len(pares)}) {par} M{timeframe//60}: {len(df)} candles -> {caminho}")
+            except Exception as e:
+                falhas[(par, timeframe)] = e
+                print(f"[ERRO] ({i}/{len(pares)}) {par} M{timeframe//60}: {e}")
+
+    print(f"[INFO] Lote concluído em {time.time() - inicio:.1f}s: "
+          f"{len(caminhos)} ok, {len(falhas)} com erro.")
+    return caminhos
+
+
+if __name__ == "__main__":
+    resultado = extrair_lote(PARES, DIAS, ROOT, FORMATO, INCREMENTAL)
+    for (par, timeframe), caminho in resultado.items():
+        print(par, timeframe, caminho)
@@ -0,0 +1,96 @@
+#@title Script normalizacao_LSTM.py (janelas e normalização das features) ✅
+
+"""
+Script: normalizacao_LSTM.py
+
+Descrição:
+-----------
+Funções em NumPy puro para montar e normalizar as janelas de features, usadas no
+preparo dos dados (`preparar_dados_LSTM.py`), no treino sob demanda (`dataset_LSTM.py`)
+e no preditor em tempo real (`realtime/predictor.py`).
+
+Não depende de pandas, sklearn nem matplotlib: o processo do preditor importa só
+o que precisa para normalizar cada janela e sobe rápido.
+"""
+
+import numpy as np
+
+
+# Grupos de features a partir das colunas do arquivo transformado
+def definir_features(colunas):
+    features_norm = [
+        "abertura", "maxima", "minima", "fechamento",
+        "pressao_compradora", "pressao_vendedora", "var_fechamento",
+        "resistencia", "suporte", "dist_resistencia", "dist_suporte",
+    ] + [c for c in colunas if c.startswith(("SMA_", "EMA_"))]
+
+    features_std = ["volume", "vol_media_5", "vol_media_20", "retorno", "volatilidade"]
+    features_keep = ["RSI_14"]  # já está em escala padronizada
+    features_fixed = ["hora_num", "minuto", "dia_semana"]  # escalas fixas
+    return features_norm, features_std, features_keep, features_fixed
+
+
+# Posições (colunas) das features normalizadas por min-max e por z-score, na ordem de `features`
+def indices_features(features, features_norm, features_std):
+    idx_norm = [i for i, col in enumerate(features) if col in features_norm]
+    idx_std = [i for i, col in enumerate(features) if col in features_std and col not in features_norm]
+    return idx_norm, idx_std
+
+
+# Gera uma visão (N, seq_len, F) de todas as janelas sem copiar dados (stride tricks)
+def janelas_deslizantes(base, seq_len):
+    janelas = np.lib.stride_tricks.sliding_window_view(base, seq_len, axis=0)
+    return janelas.transpose(0, 2, 1)  # (N, F, seq_len) -> (N, seq_len, F)
+
+
+# Calcula de uma vez as estatísticas por janela: min/max (features_norm) e média/desvio (features_std)
+def estatisticas_janelas(janelas, idx_norm, idx_std):
+    # Janelas no formato (N, seq_len, F); estatísticas saem no formato (N, len(idx))
+    bloco_norm = janelas[:, :, idx_norm]
+    col_min = bloco_norm.min(axis=1)
+    col_max = bloco_norm.max(axis=1)
+
+    # Mesma sequência de operações do StandardScaler (acumulação em float64, soma par a par)
+    bloco_std = np.ascontiguousarray(janelas[:, :, idx_std].transpose(0, 2, 1), dtype=np.float64)
+    n = bloco_std.shape[-1]
+    media = bloco_std.sum(axis=-1) / n
+    desvio_bruto = bloco_std - media[..., None]
+    correcao = desvio_bruto.sum(axis=-1)
+    variancia = ((desvio_bruto ** 2).sum(axis=-1) - correcao ** 2 / n) / n
+
+    # Features constantes na janela recebem escala 1 (igual ao sklearn)
+    eps = np.finfo(np.float64).eps
+    constante = variancia <= n * eps * variancia + (n * media * eps) ** 2
+    desvio = np.sqrt(variancia)
+    desvio[constante] = 1.0
+
+    return {"min": col_min, "max": col_max, "media": media, "desvio": desvio}
+
+
+# Aplica a normalização por janela em lote, reproduzindo exatamente normalizar_seq
+def normalizar_janelas(janelas, idx_norm, idx_std, stats=None):
+    if stats is None:
+        stats = estatisticas_janelas(janelas, idx_norm, idx_std)
+    X = np.array(janelas, dtype=np.float32, copy=True)
+
+    # Normalização min-max dentro da janela
+    col_min, col_max = stats["min"], stats["max"]
+    denom = np.where(col_max > col_min, col_max - col_min, np.float32(1.0))
+    X[:, :, idx_norm] = (X[:, :, idx_norm] - col_min[:, None, :]) / denom[:, None, :]
+
+    # Padronização z-score (média e desvio convertidos para float32, como no transform do sklearn)
+    media = stats["media"].astype(np.float32)[:, None, :]
+    desvio = stats["desvio"].astype(np.float32)[:, None, :]
+    X[:, :, idx_std] = (X[:, :, idx_std] - media) / desvio
+
+    return X
+
+
+# Aplica a escala global a linhas de features (matriz base inteira ou uma só linha, em tempo real)
+def aplicar_escala_global(base, x_scaler, idx_norm, idx_std):
+    X = np.array(base, dtype=np.float32, copy=True)
+    col_min, col_max = x_scaler["min"], x_scaler["max"]
+    denom = np.where(col_max > col_min, col_max - col_min, np.float32(1.0))
+    X[..., idx_norm] = (X[..., idx_norm] - col_min) / denom
+    X[..., idx_std] = (X[..., idx_std] - x_scaler["media"]) / x_scaler["desvio"]
+    return X
@@ -8,26 +8,49 @@ Descrição:
 Prepara dados transformados em janelas temporais para treino de modelos LSTM.
 Normaliza/padroniza features por janela, escalona o target com StandardScaler
 ajustado apenas no treino, e salva X/y em .npy e o scaler do target em .npz.
+
+As janelas são montadas de forma vetorizada (NumPy stride tricks), com as
+estatísticas de cada janela calculadas em lote. Use `vetorizado=False` para
+rodar o laço original janela a janela (verificação).
+
+Com `modo="janelas"`, em vez do tensor X completo (N x SEQ_LEN x F), salva só a
+matriz base de features e os índices de início das janelas; as janelas
+normalizadas são geradas sob demanda no treino (ver dataset_LSTM.py).
+
+Com `normalizacao="global"`, min/max e média/desvio de cada feature são ajustados uma
+única vez nas linhas do treino e aplicados à matriz inteira antes das janelas (que não
+são mais normalizadas uma a uma). As estatísticas vão para x_scaler_{ts}.npz, ao lado
+do y_scaler; na inferência em tempo real só a linha nova precisa ser normalizada.
 """
 
 import os
 import glob
+import json
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, timezone
 from sklearn.preprocessing import StandardScaler
 
+from scripts.armazenamento import colunas_tabela, ler_tabela
+from scripts.normalizacao_LSTM import (definir_features, indices_features, janelas_deslizantes,
+                                       normalizar_janelas, aplicar_escala_global)
+
 
-# Carrega o CSV transformado mais recente ou o caminho informado
-def carregar_csv(transformed_path, transformed_dir):    
+# Localiza o arquivo transformado mais recente (CSV ou Parquet) ou usa o caminho informado
+def localizar_transformado(transformed_path, transformed_dir):
     if transformed_path is None:
-        arquivos = sorted(glob.glob(os.path.join(transformed_dir, "ETHUSD_*_transformed_*.csv")))
+        arquivos = sorted(glob.glob(os.path.join(transformed_dir, "ETHUSD_*_transformed_*.csv")) +
+                          glob.glob(os.path.join(transformed_dir, "ETHUSD_*_transformed_*.parquet")))
         if not arquivos:
             raise FileNotFoundError("Nenhum arquivo transformado encontrado.")
         transformed_path = arquivos[-1]
+    return transformed_path
 
-    df = pd.read_csv(transformed_path, parse_dates=["timestamp"])
+
+# Carrega o arquivo transformado (só as colunas pedidas, se informadas)
+def carregar_transformado(transformed_path, colunas=None):
+    df = ler_tabela(transformed_path, colunas=colunas)
 
     # Garante que a coluna de target exista
     if "fechamento_futuro" not in df.columns:
@@ -57,8 +80,8 @@ def normalizar_seq(seq_array, features, features_norm, features_std):
     return seq_norm
 
 
-# Cria janelas deslizantes (X) e o target correspondente (y)
-def criar_sequencias(df, seq_len, features, features_norm, features_std, target):    
+# Cria janelas deslizantes (X) e o target correspondente (y) com o laço original, janela a janela
+def criar_sequencias_legado(df, seq_len, features, features_norm, features_std, target):    
     X, y = [], []
     descartadas = 0
     limite = len(df) - seq_len  # garante apenas janelas completas
@@ -87,25 +110,121 @@ def criar_sequencias(df, seq_len, features, features_norm, features_std, target)
     return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
 
 
+# Índices de início das janelas completas sem valores inválidos (nem na janela, nem no target)
+def inicios_validos(base, alvo, seq_len):
+    limite = len(base) - seq_len
+    if limite <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Janela válida = nenhuma linha com valor inválido (contagem acumulada de linhas ruins)
+    linhas_ruins = np.concatenate([[0], np.cumsum(~np.isfinite(base).all(axis=1))])
+    validas = (linhas_ruins[seq_len:seq_len + limite] - linhas_ruins[:limite]) == 0
+    validas &= np.isfinite(alvo[seq_len:seq_len + limite])
+    return np.flatnonzero(validas)
+
+
+# Cria janelas deslizantes (X) e o target correspondente (y) de forma vetorizada
+def criar_sequencias_vetorizado(df, seq_len, features, features_norm, features_std, target, tamanho_bloco=2048):
+    base = df[features].to_numpy(dtype=np.float32)
+    alvo = df[target].to_numpy(dtype=np.float64)
+    limite = len(df) - seq_len  # garante apenas janelas completas
+    if limite <= 0:
+        print("[INFO] Sequências criadas: 0 | Descartadas: 0")
+        return np.empty((0, seq_len, len(features)), dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    idx_norm, idx_std = indices_features(features, features_norm, features_std)
+    inicios = inicios_validos(base, alvo, seq_len)
+
+    janelas = janelas_deslizantes(base, seq_len)
+    X = np.empty((len(inicios), seq_len, len(features)), dtype=np.float32)
+    finitas = np.ones(len(inicios), dtype=bool)
+
+    # Processa em blocos para limitar a memória temporária
+    for ini in range(0, len(inicios), tamanho_bloco):
+        idx = inicios[ini:ini + tamanho_bloco]
+        bloco = normalizar_janelas(janelas[idx], idx_norm, idx_std)
+        X[ini:ini + len(idx)] = bloco
+        finitas[ini:ini + len(idx)] = np.isfinite(bloco).all(axis=(1, 2))
+
+    # Descarta se após normalização ainda houver valores inválidos
+    if not finitas.all():
+        X = X[finitas]
+    y = alvo[seq_len + inicios[finitas]].astype(np.float32)
+
+    descartadas = limite - len(X)
+    print(f"[INFO] Sequências criadas: {len(X)} | Descartadas: {descartadas}")
+    return X, y
+
+
+# Ajusta min/max (features_norm) e média/desvio (features_std) globais nas linhas de treino
+def ajustar_escala_global(base_treino, idx_norm, idx_std):
+    # Valores inválidos (NaN/inf) ficam fora das estatísticas
+    base_treino = np.where(np.isfinite(base_treino), base_treino, np.nan)
+    bloco_norm = base_treino[:, idx_norm].astype(np.float64)
+    col_min = np.nanmin(bloco_norm, axis=0)
+    col_max = np.nanmax(bloco_norm, axis=0)
+
+    bloco_std = base_treino[:, idx_std].astype(np.float64)
+    media = np.nanmean(bloco_std, axis=0)
+    desvio = np.nanstd(bloco_std, axis=0)
+    desvio[~(desvio > 0)] = 1.0  # features constantes recebem escala 1 (igual ao sklearn)
+
+    return {"min": col_min.astype(np.float32), "max": col_max.astype(np.float32),
+            "media": media.astype(np.float32), "desvio": desvio.astype(np.float32)}
+
+
+# Normalização global: ajusta a escala nas linhas das janelas de treino e a aplica a todas as features do df
+def normalizar_global(df, seq_len, test_size, features, features_norm, features_std, target):
+    base = df[features].to_numpy(dtype=np.float32)
+    idx_norm, idx_std = indices_features(features, features_norm, features_std)
+
+    # Mesmo split temporal das janelas: só as linhas das janelas de treino entram no ajuste
+    inicios = inicios_validos(base, df[target].to_numpy(dtype=np.float64), seq_len)
+    split_idx = int(len(inicios) * (1 - test_size))
+    fim_treino = inicios[split_idx - 1] + seq_len if split_idx > 0 else len(base)
+
+    x_scaler = ajustar_escala_global(base[:fim_treino], idx_norm, idx_std)
+    df = df.copy()
+    df[features] = aplicar_escala_global(base, x_scaler, idx_norm, idx_std)
+    x_scaler.update({"features": features, "idx_norm": idx_norm, "idx_std": idx_std})
+    print(f"[INFO] Normalização global ajustada em {fim_treino} linhas de treino")
+    return df, x_scaler
+
+
+# Salva as estatísticas da normalização global (mesmo padrão do y_scaler)
+def salvar_x_scaler(prepared_dir, ts, x_scaler):
+    np.savez(os.path.join(prepared_dir, f"x_scaler_{ts}.npz"),
+             features=np.array(x_scaler["features"]), idx_norm=np.array(x_scaler["idx_norm"], dtype=np.int64),
+             idx_std=np.array(x_scaler["idx_std"], dtype=np.int64), min=x_scaler["min"], max=x_scaler["max"],
+             media=x_scaler["media"], desvio=x_scaler["desvio"])
+    return f"x_scaler_{ts}.npz"
+
+
+# Cria janelas deslizantes (X) e o target (y); vetorizado=False mantém o laço original para verificação
+def criar_sequencias(df, seq_len, features, features_norm, features_std, target, vetorizado=True):
+    if vetorizado:
+        return criar_sequencias_vetorizado(df, seq_len, features, features_norm, features_std, target)
+    return criar_sequencias_legado(df, seq_len, features, features_norm, features_std, target)
+
+
 # Define diretórios de entrada (transformados) e saída (preparados)
-def preparar_dados(transformed_path=None, seq_len=300, test_size=0.15, root="/content/indicador-preditivo"):  
+# modo="materializado" salva X/y completos; modo="janelas" salva só a matriz base e os índices das janelas
+# normalizacao="janela" normaliza cada janela; normalizacao="global" usa estatísticas fixas do treino (x_scaler)
+def preparar_dados(transformed_path=None, seq_len=300, test_size=0.15, root="/content/indicador-preditivo",
+                   vetorizado=True, modo="materializado", normalizacao="janela"):  
     transformed_dir = os.path.join(root, "data", "transformed")
     prepared_dir = os.path.join(root, "data", "prepared")
     os.makedirs(prepared_dir, exist_ok=True)
 
-    # Carrega o CSV transformado
-    df = carregar_csv(transformed_path, transformed_dir)
+    # Localiza o arquivo transformado (CSV ou Parquet)
+    transformed_path = localizar_transformado(transformed_path, transformed_dir)
 
     # Define os grupos de features
-    features_norm = [
-        "abertura", "maxima", "minima", "fechamento",
-        "pressao_compradora", "pressao_vendedora", "var_fechamento",
-        "resistencia", "suporte", "dist_resistencia", "dist_suporte",
-    ] + [c for c in df.columns if c.startswith(("SMA_", "EMA_"))]
+    features_norm, features_std, features_keep, features_fixed = definir_features(colunas_tabela(transformed_path))
 
-    features_std = ["volume", "vol_media_5", "vol_media_20", "retorno", "volatilidade"]
-    features_keep = ["RSI_14"]  # já está em escala padronizada
-    features_fixed = ["hora_num", "minuto", "dia_semana"]  # escalas fixas
+    # Carrega apenas as colunas usadas (features + target)
+    df = carregar_transformado(transformed_path, features_norm + features_std + features_keep +
+                               features_fixed + ["fechamento_futuro"])
 
     # Normaliza as variáveis temporais entre 0 e 1
     df["hora_num"] /= 23.0
@@ -116,8 +235,20 @@ def preparar_dados(transformed_path=None, seq_len=300, test_size=0.15, root="/co
     features = features_norm + features_std + features_keep + features_fixed
     target = "fechamento_futuro"
 
+    # Normalização global: features já escalonadas, janelas seguem sem normalização própria
+    x_scaler = None
+    if normalizacao == "global":
+        df, x_scaler = normalizar_global(df, seq_len, test_size, features, features_norm, features_std, target)
+        features_norm, features_std = [], []
+    elif normalizacao != "janela":
+        raise ValueError(f"normalizacao deve ser 'janela' ou 'global', não {normalizacao!r}")
+
+    if modo == "janelas":
+        return salvar_janelas(df, seq_len, test_size, features, features_norm, features_std, target, prepared_dir,
+                              x_scaler=x_scaler)
+
     # Cria sequências para treino/teste
-    X, y = criar_sequencias(df, seq_len, features, features_norm, features_std, target)
+    X, y = criar_sequencias(df, seq_len, features, features_norm, features_std, target, vetorizado=vetorizado)
 
     # Split treino/teste preservando ordem temporal
     split_idx = int(len(X) * (1 - test_size))
@@ -139,7 +270,8 @@ def preparar_dados(transformed_path=None, seq_len=300, test_size=0.15, root="/co
              mean=y_scaler.mean_.astype(np.float32), scale=y_scaler.scale_.astype(np.float32))
 
     print(f"[OK] Dados preparados salvos em {prepared_dir}")
-    return {
+    arquivos = {
+        "versao": ts,
         "X_train": f"X_train_{ts}.npy",
         "y_train": f"y_train_{ts}.npy",
         "X_test": f"X_test_{ts}.npy",
@@ -148,6 +280,63 @@ def preparar_dados(transformed_path=None, seq_len=300, test_size=0.15, root="/co
         "y_train_raw": y_train_raw,
         "y_test_raw": y_test_raw
     }
+    if x_scaler is not None:
+        arquivos["x_scaler"] = salvar_x_scaler(prepared_dir, ts, x_scaler)
+    return arquivos
+
+
+# Modo janelas: salva a matriz base (linhas x F) e os índices de início das janelas de treino/teste.
+# As janelas normalizadas são montadas sob demanda no treino (scripts/dataset_LSTM.py).
+def salvar_janelas(df, seq_len, test_size, features, features_norm, features_std, target, prepared_dir,
+                   x_scaler=None):
+    base = df[features].to_numpy(dtype=np.float32)
+    alvo = df[target].to_numpy(dtype=np.float64)
+    idx_norm, idx_std = indices_features(features, features_norm, features_std)
+
+    # Mesmo critério de descarte das janelas do modo materializado (exceto overflow pós-normalização)
+    inicios = inicios_validos(base, alvo, seq_len)
+    y = alvo[inicios + seq_len].astype(np.float32)
+    print(f"[INFO] Janelas válidas: {len(inicios)} | Descartadas: {max(len(df) - seq_len, 0) - len(inicios)}")
+
+    # Split treino/teste preservando ordem temporal
+    split_idx = int(len(inicios) * (1 - test_size))
+    inicios_train, inicios_test = inicios[:split_idx], inicios[split_idx:]
+    y_train_raw, y_test_raw = y[:split_idx], y[split_idx:]
+
+    # Escalonamento do target (fit no treino, transform no teste)
+    y_scaler = StandardScaler()
+    y_train = y_scaler.fit_transform(y_train_raw.reshape(-1, 1)).astype(np.float32).flatten()
+    y_test = y_scaler.transform(y_test_raw.reshape(-1, 1)).astype(np.float32).flatten()
+
+    # Salva matriz base, índices, targets e metadados com timestamp
+    ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    np.save(os.path.join(prepared_dir, f"base_{ts}.npy"), base)
+    np.save(os.path.join(prepared_dir, f"inicios_train_{ts}.npy"), inicios_train)
+    np.save(os.path.join(prepared_dir, f"inicios_test_{ts}.npy"), inicios_test)
+    np.save(os.path.join(prepared_dir, f"y_train_{ts}.npy"), y_train)
+    np.save(os.path.join(prepared_dir, f"y_test_{ts}.npy"), y_test)
+    np.savez(os.path.join(prepared_dir, f"y_scaler_{ts}.npz"),
+             mean=y_scaler.mean_.astype(np.float32), scale=y_scaler.scale_.astype(np.float32))
+    with open(os.path.join(prepared_dir, f"janelas_{ts}.json"), "w") as f:
+        json.dump({"seq_len": seq_len, "features": features, "idx_norm": idx_norm, "idx_std": idx_std,
+                   "normalizacao": "janela" if x_scaler is None else "global"}, f)
+
+    print(f"[OK] Janelas preparadas salvas em {prepared_dir}")
+    arquivos = {
+        "versao": ts,
+        "base": f"base_{ts}.npy",
+        "inicios_train": f"inicios_train_{ts}.npy",
+        "inicios_test": f"inicios_test_{ts}.npy",
+        "y_train": f"y_train_{ts}.npy",
+        "y_test": f"y_test_{ts}.npy",
+        "y_scaler": f"y_scaler_{ts}.npz",
+        "janelas": f"janelas_{ts}.json",
+        "y_train_raw": y_train_raw,
+        "y_test_raw": y_test_raw
+    }
+    if x_scaler is not None:
+        arquivos["x_scaler"] = salvar_x_scaler(prepared_dir, ts, x_scaler)
+    return arquivos
 
 
 # Carrega os arquivos recém-criados e imprime estatísticas resumidas
@@ -163,16 +352,18 @@ def inspecionar_datasets(prepared_dir, arquivos):
             "inf?": bool(np.isinf(arr).any())
         }
 
-    X_train = np.load(os.path.join(prepared_dir, arquivos["X_train"]))
     y_train = np.load(os.path.join(prepared_dir, arquivos["y_train"]))
-    X_test = np.load(os.path.join(prepared_dir, arquivos["X_test"]))
     y_test = np.load(os.path.join(prepared_dir, arquivos["y_test"]))
     s = np.load(os.path.join(prepared_dir, arquivos["y_scaler"]))
 
     print("\n[INSPEÇÃO] Estatísticas dos datasets:")
-    print("X_train:", resumo(X_train))
+    if "base" in arquivos:
+        print("base   :", resumo(np.load(os.path.join(prepared_dir, arquivos["base"]))))
+    else:
+        print("X_train:", resumo(np.load(os.path.join(prepared_dir, arquivos["X_train"]))))
     print("y_train:", resumo(y_train))
-    print("X_test :", resumo(X_test))
+    if "X_test" in arquivos:
+        print("X_test :", resumo(np.load(os.path.join(prepared_dir, arquivos["X_test"]))))
     print("y_test :", resumo(y_test))
     print(f"Scaler -> mean={float(s['mean'])}, scale={float(s['scale'])}")
 
@@ -5,88 +5,243 @@ Script: transformar_dados.py
 Descrição:
 -----------
 Este script lê os dados brutos de candles (extraídos pelo `extrair_dados.py`),
-enriquece com features técnicas e estatísticas, e salva um novo CSV transformado
-para uso em treinamento de modelos preditivos.
+enriquece com features técnicas e estatísticas, e salva um novo arquivo transformado
+(CSV ou Parquet com colunas float32) para uso em treinamento de modelos preditivos.
+
+Modo incremental (`incremental=True`):
+---------------------------------------
+O arquivo transformado passa a ter nome fixo ({PAR}_M{TF}_{DIAS}d_transformed_incremental)
+e ao lado dele é salvo um JSON com o estado das janelas (caudas das séries, último valor
+de cada EMA). Nas execuções seguintes só as linhas novas do arquivo bruto são calculadas
+e anexadas, com resultado idêntico bit a bit ao recálculo completo.
+
+As médias/desvios móveis são calculados sobre a janela de cada linha (soma sequencial
+dos p valores da janela), e não por somas acumuladas, para que o valor de uma linha
+dependa apenas da sua janela, seja no cálculo completo ou no incremental.
 """
 
 import os
+import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
-
-def transformar_dados(raw_path, par="ETHUSD", timeframe=300, dias=30, root="/content/indicador-preditivo"):
-    # Estrutura de diretórios
-    transformed_dir = os.path.join(root, "data", "transformed")
-    log_dir = os.path.join(root, "data", "logs")
-    os.makedirs(transformed_dir, exist_ok=True)
-    os.makedirs(log_dir, exist_ok=True)
-
-    def log(msg):
-        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
-        print(msg)
-        with open(os.path.join(log_dir, f"process_log_{datetime.now(timezone.utc).strftime('%Y%m%d')}.txt"), "a") as f:
-            f.write(f"{ts} - {msg}\n")
-
-    # Leitura do CSV bruto
-    if not os.path.exists(raw_path):
-        raise FileNotFoundError(f"Arquivo bruto não encontrado em {raw_path}")
-
-    log(f"Lendo arquivo bruto: {raw_path}")
-    df = pd.read_csv(raw_path)
-
-    # Garantir coluna de tempo
-    time_col = None
-    for candidate in ["from", "datetime", "timestamp", "time"]:
-        if candidate in df.columns:
-            time_col = candidate
-            break
-    if time_col is None:
-        raise RuntimeError("Nenhuma coluna de tempo encontrada no CSV.")
-
-    df[time_col] = pd.to_datetime(df[time_col], utc=True, errors="coerce")
-    df = df.rename(columns={time_col: "timestamp"}).sort_values("timestamp").reset_index(drop=True)
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scripts.armazenamento import anexar_tabela, caminho_tabela, ler_tabela, salvar_tabela
+
+PERIODOS_MEDIAS = [5, 10, 20, 50, 100, 200]
+JANELA_SR = 20      # suporte/resistência
+JANELA_RSI = 14
+JANELAS_VOLUME = [5, 20]
+JANELA_VOLATILIDADE = 10
+
+# Tamanho da cauda guardada no estado para cada série (janela - 1)
+CAUDAS = {
+    "fechamento": max(PERIODOS_MEDIAS) - 1,
+    "maxima": JANELA_SR - 1,
+    "minima": JANELA_SR - 1,
+    "volume": max(JANELAS_VOLUME) - 1,
+    "up": JANELA_RSI - 1,
+    "down": JANELA_RSI - 1,
+    "retorno": JANELA_VOLATILIDADE - 1,
+}
+
+
+# Prefixa os valores novos com a cauda anterior (NaN onde não havia histórico)
+def com_cauda(valores, cauda, tamanho):
+    if cauda is None:
+        cauda = np.full(tamanho, np.nan)
+    return np.concatenate([np.asarray(cauda, dtype=np.float64), np.asarray(valores, dtype=np.float64)])
+
+
+# Média móvel com min_periods=1: x já vem com p-1 valores de cauda; NaN não conta na janela
+def media_movel(x, p):
+    validos = ~np.isnan(x)
+    v = np.where(validos, x, 0.0)
+    n = len(x) - p + 1
+    soma = np.zeros(n)
+    cont = np.zeros(n)
+    for k in range(p):
+        soma += v[k:k + n]
+        cont += validos[k:k + n]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return soma / cont
+
+
+# Desvio padrão amostral (ddof=1) móvel, mesma convenção de janela da média móvel
+def desvio_movel(x, p):
+    validos = ~np.isnan(x)
+    v = np.where(validos, x, 0.0)
+    n = len(x) - p + 1
+    media = media_movel(x, p)
+    cont = np.zeros(n)
+    acum = np.zeros(n)
+    for k in range(p):
+        d = np.where(validos[k:k + n], v[k:k + n] - media, 0.0)
+        acum += d * d
+        cont += validos[k:k + n]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sqrt(acum / (cont - 1))
+
+
+# Máximo/mínimo móvel ignorando a cauda vazia (NaN)
+def maximo_movel(x, p):
+    return np.fmax.reduce(sliding_window_view(x, p), axis=1)
+
+
+def minimo_movel(x, p):
+    return np.fmin.reduce(sliding_window_view(x, p), axis=1)
+
+
+# Calcula as features das linhas de df continuando do estado (None = desde o início da série)
+def calcular_features(df, estado=None):
+    caudas = estado["caudas"] if estado else {}
+    emas = estado["ema"] if estado else {}
+    n = len(df)
+
+    fechamento = df["fechamento"].to_numpy(dtype=np.float64)
+    series = {
+        "fechamento": com_cauda(fechamento, caudas.get("fechamento"), CAUDAS["fechamento"]),
+        "maxima": com_cauda(df["maxima"], caudas.get("maxima"), CAUDAS["maxima"]),
+        "minima": com_cauda(df["minima"], caudas.get("minima"), CAUDAS["minima"]),
+        "volume": com_cauda(df["volume"], caudas.get("volume"), CAUDAS["volume"]),
+    }
+
+    # Fechamento anterior (NaN na primeira linha da série)
+    anterior = np.concatenate([series["fechamento"][CAUDAS["fechamento"] - 1:CAUDAS["fechamento"]], fechamento[:-1]])
+    delta = fechamento - anterior
+    retorno = fechamento / anterior - 1
+    retorno[np.isnan(retorno)] = 0
+    series["up"] = com_cauda(np.clip(delta, 0, None), caudas.get("up"), CAUDAS["up"])
+    series["down"] = com_cauda(-1 * np.clip(delta, None, 0), caudas.get("down"), CAUDAS["down"])
+    series["retorno"] = com_cauda(retorno, caudas.get("retorno"), CAUDAS["retorno"])
 
     # Features de candle
     df["pressao_compradora"] = df["maxima"] - df["fechamento"]
     df["pressao_vendedora"] = df["fechamento"] - df["minima"]
 
-    # Médias móveis
-    for p in [5, 10, 20, 50, 100, 200]:
-        df[f"SMA_{p}"] = df["fechamento"].rolling(window=p, min_periods=1).mean()
-        df[f"EMA_{p}"] = df["fechamento"].ewm(span=p, adjust=False).mean()
+    # Médias móveis (EMA continua do último valor salvo: recorrência de adjust=False)
+    ema_final = {}
+    for p in PERIODOS_MEDIAS:
+        df[f"SMA_{p}"] = media_movel(series["fechamento"][CAUDAS["fechamento"] - (p - 1):], p)
+        anterior_ema = emas.get(str(p))
+        if anterior_ema is None:
+            ema = pd.Series(fechamento).ewm(span=p, adjust=False).mean().to_numpy()
+        else:
+            ema = pd.Series(np.concatenate([[anterior_ema], fechamento])).ewm(span=p, adjust=False).mean().to_numpy()[1:]
+        df[f"EMA_{p}"] = ema
+        ema_final[str(p)] = float(ema[-2]) if n > 1 else anterior_ema
 
     # Suporte e resistência
-    df["resistencia"] = df["maxima"].rolling(window=20, min_periods=1).max()
-    df["suporte"] = df["minima"].rolling(window=20, min_periods=1).min()
+    df["resistencia"] = maximo_movel(series["maxima"], JANELA_SR)
+    df["suporte"] = minimo_movel(series["minima"], JANELA_SR)
     df["dist_resistencia"] = df["resistencia"] - df["fechamento"]
     df["dist_suporte"] = df["fechamento"] - df["suporte"]
 
     # Variação e indicadores técnicos
-    df["var_fechamento"] = df["fechamento"].diff()
-    delta = df["fechamento"].diff()
-    up = delta.clip(lower=0)
-    down = -1 * delta.clip(upper=0)
-    rs = up.rolling(14, min_periods=1).mean() / down.rolling(14, min_periods=1).mean()
-    df["RSI_14"] = 100 - (100 / (1 + rs))
+    df["var_fechamento"] = delta
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = media_movel(series["up"], JANELA_RSI) / media_movel(series["down"], JANELA_RSI)
+        df["RSI_14"] = 100 - (100 / (1 + rs))
 
     # Volume
-    df["vol_media_5"] = df["volume"].rolling(5, min_periods=1).mean()
-    df["vol_media_20"] = df["volume"].rolling(20, min_periods=1).mean()
+    for p in JANELAS_VOLUME:
+        df[f"vol_media_{p}"] = media_movel(series["volume"][CAUDAS["volume"] - (p - 1):], p)
 
     # Variáveis futuras e temporais
-    df["fechamento_futuro"] = df["fechamento"].shift(-1)
+    df["fechamento_futuro"] = np.concatenate([fechamento[1:], [np.nan]])
     df["hora_num"] = df["timestamp"].dt.hour
     df["minuto"] = df["timestamp"].dt.minute
     df["dia_semana"] = df["timestamp"].dt.dayofweek
-    df["retorno"] = df["fechamento"].pct_change().fillna(0)
-    df["volatilidade"] = df["retorno"].rolling(window=10, min_periods=1).std().fillna(0)
+    df["retorno"] = retorno
+    df["volatilidade"] = np.nan_to_num(desvio_movel(series["retorno"], JANELA_VOLATILIDADE), nan=0.0)
+
+    # Estado até a penúltima linha: a última é recalculada na próxima execução,
+    # pois o seu fechamento_futuro só é conhecido quando chega o candle seguinte
+    novo_estado = {
+        "caudas": {nome: series[nome][:-1][-tamanho:].tolist() for nome, tamanho in CAUDAS.items()},
+        "ema": ema_final,
+        "ultimo_timestamp": str(df["timestamp"].iloc[-2]) if n > 1 else (estado or {}).get("ultimo_timestamp"),
+    }
+    return df, novo_estado
+
 
-    # Salvar dataset transformado
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    transformed_fname = f"{par}_M{timeframe//60}_{dias}d_transformed_{ts}.csv"
-    transformed_path = os.path.join(transformed_dir, transformed_fname)
-    df.to_csv(transformed_path, index=False)
+# Lê o arquivo bruto e padroniza a coluna de tempo como "timestamp"
+def carregar_bruto(raw_path):
+    df = ler_tabela(raw_path)
+
+    # Garantir coluna de tempo
+    time_col = None
+    for candidate in ["from", "datetime", "timestamp", "time"]:
+        if candidate in df.columns:
+            time_col = candidate
+            break
+    if time_col is None:
+        raise RuntimeError("Nenhuma coluna de tempo encontrada no arquivo bruto.")
+
+    df[time_col] = pd.to_datetime(df[time_col], utc=True, errors="coerce")
+    return df.rename(columns={time_col: "timestamp"}).sort_values("timestamp").reset_index(drop=True)
+
+
+def transformar_dados(raw_path, par="ETHUSD", timeframe=300, dias=30, root="/content/indicador-preditivo",
+                      formato="csv", incremental=False):
+    # Estrutura de diretórios
+    transformed_dir = os.path.join(root, "data", "transformed")
+    log_dir = os.path.join(root, "data", "logs")
+    os.makedirs(transformed_dir, exist_ok=True)
+    os.makedirs(log_dir, exist_ok=True)
+
+    def log(msg):
+        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
+        print(msg)
+        with open(os.path.join(log_dir, f"process_log_{datetime.now(timezone.utc).strftime('%Y%m%d')}.txt"), "a") as f:
+            f.write(f"{ts} - {msg}\n")
+
+    # Leitura do arquivo bruto (CSV ou Parquet)
+    if not os.path.exists(raw_path):
+        raise FileNotFoundError(f"Arquivo bruto não encontrado em {raw_path}")
+
+    log(f"Lendo arquivo bruto: {raw_path}")
+    df = carregar_bruto(raw_path)
+
+    if not incremental:
+        df, _ = calcular_features(df)
+
+        # Salvar dataset transformado
+        ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        transformed_path = caminho_tabela(transformed_dir, f"{par}_M{timeframe//60}_{dias}d_transformed_{ts}", formato)
+        salvar_tabela(df, transformed_path)
+
+        log(f"Dados transformados salvos em {transformed_path}")
+        return transformed_path
+
+    # Modo incremental: arquivo de nome fixo + estado das janelas
+    nome = f"{par}_M{timeframe//60}_{dias}d_transformed_incremental"
+    transformed_path = caminho_tabela(transformed_dir, nome, formato)
+    estado_path = os.path.join(transformed_dir, f"{nome}_estado.json")
+
+    estado = None
+    if os.path.exists(transformed_path) and os.path.exists(estado_path):
+        with open(estado_path) as f:
+            estado = json.load(f)
+
+    if estado is None or estado["ultimo_timestamp"] is None:
+        df, novo_estado = calcular_features(df)
+        salvar_tabela(df, transformed_path)
+        log(f"Estado incremental criado; {len(df)} linhas transformadas em {transformed_path}")
+    else:
+        # Última linha já salva (recalculada) + linhas novas
+        df = df[df["timestamp"] > pd.Timestamp(estado["ultimo_timestamp"])].reset_index(drop=True)
+        if len(df) <= 1:
+            log(f"Nenhum candle novo; {transformed_path} já está atualizado.")
+            return transformed_path
+        df, novo_estado = calcular_features(df, estado)
+        anexar_tabela(df, transformed_path, substituir_ultima=True)
+        log(f"{len(df) - 1} linhas novas anexadas em {transformed_path}")
+
+    with open(estado_path, "w") as f:
+        json.dump(novo_estado, f)
 
-    log(f"Dados transformados salvos em {transformed_path}")
     return transformed_path
 
 
@@ -2,6 +2,7 @@
 
 import os
 import glob
+import shutil
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -14,50 +15,90 @@ from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 from tensorflow.keras.losses import Huber
 from tensorflow.keras.optimizers import Adam
 
+from scripts.dataset_LSTM import carregar_janelas, carregar_mapeados
+
 def treinar_modelo(
     prepared_dir="/content/indicador-preditivo/data/prepared",
     models_dir="/content/indicador-preditivo/models",
-    parametros=None
+    parametros=None,
+    mmap=False,
+    versao_dados=None
 ):
     """
     Treina uma rede LSTM com os dados preparados.
 
     Args:
-        prepared_dir (str): Diretório onde estão os .npy preparados.
+        prepared_dir (str): Diretório onde estão os .npy preparados (materializados ou em modo janelas).
         models_dir (str): Diretório onde salvar modelos treinados.
         parametros (dict): Hiperparâmetros do modelo.
+        mmap (bool): Abre os .npy com memory-map e alimenta o treino por lotes lidos do arquivo.
+        versao_dados (str): Versão (timestamp) dos dados preparados a usar; None usa a mais recente.
 
     Returns:
         modelo, historico (obj): Modelo treinado e histórico do treinamento.
     """
     os.makedirs(models_dir, exist_ok=True)
 
-    # Localizar o dataset mais recente
-    arquivos = sorted(glob.glob(os.path.join(prepared_dir, "X_train_*.npy")))
-    if not arquivos:
-        raise FileNotFoundError(f"Nenhum arquivo X_train_*.npy encontrado em {prepared_dir}. Execute preparar_dados primeiro.")
-
-    latest_X_train = arquivos[-1]
-    versao_dados = os.path.basename(latest_X_train).replace("X_train_", "").replace(".npy", "")
-
-    latest_y_train = latest_X_train.replace("X_train", "y_train")
-    latest_X_test  = latest_X_train.replace("X_train", "X_test")
-    latest_y_test  = latest_X_train.replace("X_train", "y_test")
-
-    X_train = np.load(latest_X_train)
-    y_train = np.load(latest_y_train)
-    X_test  = np.load(latest_X_test)
-    y_test  = np.load(latest_y_test)
-
-    print(f"Carregado dataset: {versao_dados}")
-    print(f"X_train: {X_train.shape}, y_train: {y_train.shape}")
-    print(f"X_test:  {X_test.shape}, y_test:  {y_test.shape}")
+    # Localizar as versões disponíveis (X_train_*.npy materializado ou base_*.npy em modo janelas)
+    versoes = {}
+    for caminho in glob.glob(os.path.join(prepared_dir, "X_train_*.npy")):
+        versoes[os.path.basename(caminho).replace("X_train_", "").replace(".npy", "")] = "materializado"
+    for caminho in glob.glob(os.path.join(prepared_dir, "base_*.npy")):
+        versoes[os.path.basename(caminho).replace("base_", "").replace(".npy", "")] = "janelas"
+    if not versoes:
+        raise FileNotFoundError(f"Nenhum arquivo X_train_*.npy ou base_*.npy encontrado em {prepared_dir}. Execute preparar_dados primeiro.")
+
+    if versao_dados is None:
+        versao_dados = sorted(versoes)[-1]
+    elif versao_dados not in versoes:
+        raise FileNotFoundError(f"Versão de dados {versao_dados} não encontrada em {prepared_dir}.")
+    modo_dados = versoes[versao_dados]
+    tamanho_lote = (parametros or {}).get("tamanho_lote", 128)
+
+    if modo_dados == "janelas":
+        # Janelas normalizadas montadas sob demanda a partir da matriz base
+        ds_train, ds_test, y_test = carregar_janelas(prepared_dir, versao_dados, tamanho_lote, mmap=mmap)
+        seq_len, n_features = ds_train.seq_len, ds_train.n_features
+        dados_treino = {"x": ds_train}
+        dados_validacao = ds_test
+        dados_teste = ds_test
+
+        print(f"Carregado dataset (janelas): {versao_dados}")
+        print(f"Janelas treino: {len(ds_train.inicios)}, teste: {len(ds_test.inicios)}, SEQ_LEN={seq_len}, F={n_features}")
+    elif mmap:
+        # Arrays mapeados em memória: lotes lidos direto do arquivo (cache de páginas do SO)
+        ds_train, ds_test, y_test = carregar_mapeados(prepared_dir, versao_dados, tamanho_lote)
+        seq_len, n_features = ds_train.seq_len, ds_train.n_features
+        dados_treino = {"x": ds_train}
+        dados_validacao = ds_test
+        dados_teste = ds_test
+
+        print(f"Carregado dataset (memory-map): {versao_dados}")
+        print(f"X_train: {ds_train.X.shape}, X_test: {ds_test.X.shape}")
+    else:
+        latest_X_train = os.path.join(prepared_dir, f"X_train_{versao_dados}.npy")
+        latest_y_train = latest_X_train.replace("X_train", "y_train")
+        latest_X_test  = latest_X_train.replace("X_train", "X_test")
+        latest_y_test  = latest_X_train.replace("X_train", "y_test")
+
+        X_train = np.load(latest_X_train)
+        y_train = np.load(latest_y_train)
+        X_test  = np.load(latest_X_test)
+        y_test  = np.load(latest_y_test)
+        seq_len, n_features = X_train.shape[1], X_train.shape[2]
+        dados_treino = {"x": X_train, "y": y_train, "batch_size": tamanho_lote}
+        dados_validacao = (X_test, y_test)
+        dados_teste = X_test
+
+        print(f"Carregado dataset: {versao_dados}")
+        print(f"X_train: {X_train.shape}, y_train: {y_train.shape}")
+        print(f"X_test:  {X_test.shape}, y_test:  {y_test.shape}")
 
     # Modelo
     if parametros is None:
         parametros = {
-            "SEQ_LEN": X_train.shape[1],
-            "features": X_train.shape[2],
+            "SEQ_LEN": seq_len,
+            "features": n_features,
             "unidades_lstm_camada1": 256,
             "unidades_lstm_camada2": 128,
             "unidades_dense": 64,
@@ -69,12 +110,16 @@ def treinar_modelo(
             "tamanho_lote": 128
         }
 
+    # Cópia: SEQ_LEN vem dos dados e não deve vazar para o dicionário de quem chamou
+    parametros = dict(parametros)
+    parametros.setdefault("SEQ_LEN", seq_len)
+
     otimizador = Adam(learning_rate=parametros["taxa_aprendizado"])
     funcao_perda = Huber()
 
     modelo = Sequential([
         LSTM(parametros["unidades_lstm_camada1"], return_sequences=True,
-             input_shape=(X_train.shape[1], X_train.shape[2])),
+             input_shape=(seq_len, n_features)),
         Dropout(parametros["taxa_dropout"]),
         LSTM(parametros["unidades_lstm_camada2"], return_sequences=False),
         Dropout(parametros["taxa_dropout"]),
@@ -93,16 +138,15 @@ def treinar_modelo(
 
     print("[INFO] Iniciando treinamento...")
     historico = modelo.fit(
-        X_train, y_train,
-        validation_data=(X_test, y_test),
+        **dados_treino,
+        validation_data=dados_validacao,
         epochs=parametros["epocas_maximas"],
-        batch_size=parametros["tamanho_lote"],
         callbacks=callbacks,
         verbose=1
     )
 
     # Avaliação
-    y_pred = modelo.predict(X_test, verbose=0)
+    y_pred = modelo.predict(dados_teste, verbose=0)
     mae = mean_absolute_error(y_test, y_pred)
     rmse = mean_squared_error(y_test, y_pred, squared=False)
     r2 = r2_score(y_test, y_pred)
@@ -112,6 +156,11 @@ def treinar_modelo(
     print(f"RMSE   = {rmse:.6f}")
     print(f"R²     = {r2:.6f}")
 
+    # Escalonadores dos dados (target e, na normalização global, features) ao lado do modelo
+    for scaler in (f"y_scaler_{versao_dados}.npz", f"x_scaler_{versao_dados}.npz"):
+        if os.path.exists(os.path.join(prepared_dir, scaler)):
+            shutil.copy(os.path.join(prepared_dir, scaler), os.path.join(models_dir, scaler))
+
     # Relatório
     relatorio_path = os.path.join(models_dir, "relatorio_modelos.csv")
     nova_linha = pd.DataFrame([{